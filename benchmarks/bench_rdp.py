@@ -0,0 +1,343 @@
+"""
+Benchmarks for rdp_quick
+
+Runs every entry point over a grid of input sizes, dimensions and shapes and reports the throughput (points/s) and
+the peak memory (the rise of the peak resident set size in untimed runs, see measure_memory, use --isolate so the
+memory of earlier cases is not reused).  Warm runs compile (or load from the cache) first and time the best of several
+repeats, cold runs start a new process with an empty numba cache so the import and compilation are included.
+
+Examples:
+    python benchmarks/bench_rdp.py
+    python benchmarks/bench_rdp.py --sizes 1e3,1e5,1e7 --dims 2,3,6 --shapes spiral,noise --threads 1,4
+    python benchmarks/bench_rdp.py --cold --sizes 1e4
+    python benchmarks/bench_rdp.py --json results.json --compare baseline.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing
+import numpy as np
+import numpy.typing as npt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_shapes_ = ("sine", "spiral", "noise", "line", "random_walk")
+_entry_points_ = ("rdp_single_initial_window", "rdp_num_windows", "rdp_points_per_window",
+                  "rdp_windows_from_curvature", "check_windows_compiled", "numpy_reference")
+# the pure numpy reference is O(n) python calls per window so it is only run on small inputs
+_numpy_reference_max_points_ = 100000
+
+
+def make_points(shape: str, num_points: int, num_dims: int, seed: int = 0) -> npt.NDArray[float]:
+    """
+    Builds the test points
+    :param shape: one of _shapes_
+    :param num_points: the number of points
+    :param num_dims: the number of dimensions (at least 2)
+    :param seed: the random seed
+    :return: the points (float64, num_points x num_dims)
+    """
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0.0, 1.0, num_points)
+    p_array = np.zeros((num_points, num_dims))
+    if shape == "sine":
+        p_array[:, 0] = t * 200.0 * np.pi
+        p_array[:, 1] = np.sin(p_array[:, 0])
+    elif shape == "spiral":
+        # the classic worst case, every split only removes a few points
+        angle = t * 100.0 * np.pi
+        p_array[:, 0] = t * np.cos(angle)
+        p_array[:, 1] = t * np.sin(angle)
+    elif shape == "noise":
+        p_array[:, :2] = rng.normal(size=(num_points, 2))
+    elif shape == "line":
+        p_array[:, 0] = t
+        p_array[:, 1] = 2.0 * t
+    elif shape == "random_walk":
+        p_array[:, :2] = np.cumsum(rng.normal(size=(num_points, 2)), axis=0)
+    else:
+        raise ValueError("unknown shape {}".format(shape))
+    if num_dims > 2:
+        p_array[:, 2:] = np.cumsum(rng.normal(size=(num_points, num_dims - 2)), axis=0) * 0.01
+    return p_array
+
+
+def rdp_numpy_reference(p_array: npt.NDArray[float], epsilon: float) -> npt.NDArray[float]:
+    """
+    A plain numpy Ramer-Douglas-Peucker (one vectorised distance calculation per window) to compare against
+    :param p_array: the data points
+    :param epsilon: the threshold
+    :return: The down sampled points
+    """
+    p_array_ok = np.zeros(len(p_array), dtype=bool)
+    windows = [(0, len(p_array) - 1)]
+    while windows:
+        start, end = windows.pop()
+        p_array_ok[start] = True
+        p_array_ok[end] = True
+        if end - start < 2:
+            continue
+        delta = p_array[end] - p_array[start]
+        diff = p_array[start + 1:end] - p_array[start]
+        norm_sq = np.dot(delta, delta)
+        if norm_sq == 0.0:
+            dists = np.linalg.norm(diff, axis=1)
+        else:
+            dists = np.linalg.norm(diff - np.outer(diff @ delta / norm_sq, delta), axis=1)
+        arg_max = int(np.argmax(dists))
+        if dists[arg_max] > epsilon:
+            windows.append((start, start + 1 + arg_max))
+            windows.append((start + 1 + arg_max, end))
+    return p_array[p_array_ok]
+
+
+def rdp_check_windows_compiled(p_array: npt.NDArray[float], epsilon: float) -> npt.NDArray[float]:
+    """
+    rdp_single_initial_window with check_windows_compiled, which never switches to the hull tree
+    :param p_array: the data points
+    :param epsilon: the threshold
+    :return: The down sampled points
+    """
+    from rdp_quick.check_window import check_windows_compiled
+    p_array_ok = np.zeros(len(p_array), dtype=bool)
+    check_windows_compiled(p_array, epsilon, np.array([[0, len(p_array) - 1]], dtype=np.int64), p_array_ok)
+    return p_array[p_array_ok]
+
+
+def get_entry_point(name: str) -> typing.Callable[[npt.NDArray[float], float], npt.NDArray[float]]:
+    """
+    :param name: one of _entry_points_
+    :return: a function taking the points and epsilon
+    """
+    import rdp_quick
+    if name == "rdp_single_initial_window":
+        return rdp_quick.rdp_single_initial_window
+    if name == "rdp_num_windows":
+        return lambda p_array, epsilon: rdp_quick.rdp_num_windows(p_array, epsilon, max(1, len(p_array) // 1000))
+    if name == "rdp_points_per_window":
+        return lambda p_array, epsilon: rdp_quick.rdp_points_per_window(p_array, epsilon, 1000)
+    if name == "rdp_windows_from_curvature":
+        return rdp_quick.rdp_windows_from_curvature
+    if name == "check_windows_compiled":
+        # the stack kernel without the switch to the hull tree, rdp_single_initial_window should not be slower
+        return rdp_check_windows_compiled
+    if name == "numpy_reference":
+        return rdp_numpy_reference
+    raise ValueError("unknown entry point {}".format(name))
+
+
+def _read_status_mb(field: str) -> typing.Union[float, None]:
+    """
+    :param field: a memory field of /proc/self/status such as VmRSS or VmHWM
+    :return: the value in MB, None where there is no /proc (not Linux)
+    """
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    return None
+
+
+def _max_rss_mb() -> typing.Union[float, None]:
+    """
+    :return: the largest resident set size of this process so far in MB, None where there is no resource module
+             (Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Resets the peak resident set size (VmHWM) of this process to the current one
+    :return: if it was reset (Linux only)
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measure_memory(func: typing.Callable[[npt.NDArray[float], float], npt.NDArray[float]],
+                   p_array: npt.NDArray[float], epsilon: float) -> dict:
+    """
+    Runs func twice more, untimed, to measure its memory.  The first run measures the rise of the peak resident set
+    size, which includes the buffers the numba kernels allocate, and counts the numba (NRT) allocations.  The second
+    run is traced by tracemalloc, which sees the numpy arrays (and the NRT buffers on numba versions that allocate
+    them through python)
+    :param func: the entry point
+    :param p_array: the data points
+    :param epsilon: the threshold
+    :return: peak_rss_mb (None when the peak can not be reset), nrt_allocations (None when numba can not count
+             them) and traced_peak_mb
+    """
+    from numba.core.runtime import _nrt_python
+
+    rss_before = _read_status_mb("VmRSS")
+    peak_rss_mb = None
+    stats_enabled = _nrt_python.memsys_stats_enabled()
+    _nrt_python.memsys_enable_stats()
+    nrt_before = _nrt_python.memsys_get_stats_alloc()
+    if _reset_peak_rss() and rss_before is not None:
+        func(p_array, epsilon)
+        peak_rss_mb = _read_status_mb("VmHWM") - rss_before
+    else:
+        func(p_array, epsilon)
+    nrt_allocations = _nrt_python.memsys_get_stats_alloc() - nrt_before
+    if not stats_enabled:
+        _nrt_python.memsys_disable_stats()
+
+    tracemalloc.start()
+    func(p_array, epsilon)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dict(peak_rss_mb=peak_rss_mb, nrt_allocations=nrt_allocations, traced_peak_mb=traced_peak / 2**20)
+
+
+def run_case(entry_point: str, shape: str, num_points: int, num_dims: int, epsilon: float, num_threads: int,
+             repeats: int, cold: bool) -> dict:
+    """
+    Runs one benchmark in this process
+    :return: the results
+    """
+    import numba
+    if num_threads > 0:
+        numba.set_num_threads(num_threads)
+    p_array = make_points(shape, num_points, num_dims)
+
+    st = time.perf_counter()
+    func = get_entry_point(entry_point)
+    if not cold:
+        # compile (or load from the cache) on a small input first
+        func(make_points(shape, 100, num_dims), epsilon)
+    import_time = time.perf_counter() - st
+    # the memory is measured in separate untimed runs so the tracing does not slow down the timed ones, before them so
+    # the memory they leave resident is not reused (a cold run has to time the first call, so it measures after it)
+    memory = dict() if cold else measure_memory(func, p_array, epsilon)
+
+    times = list()
+    num_kept = 0
+    for _ in range(1 if cold else repeats):
+        st = time.perf_counter()
+        num_kept = len(func(p_array, epsilon))
+        times.append(time.perf_counter() - st)
+    if cold:
+        memory = measure_memory(func, p_array, epsilon)
+
+    best = min(times)
+    return dict(entry_point=entry_point, shape=shape, num_points=num_points, num_dims=num_dims, epsilon=epsilon,
+                num_threads=numba.get_num_threads(), cold=cold, seconds=best,
+                points_per_second=num_points / best if best > 0 else float("inf"),
+                setup_seconds=import_time, num_kept=num_kept, max_rss_mb=_max_rss_mb(), **memory)
+
+
+def run_case_isolated(case: dict, cold: bool) -> dict:
+    """
+    Runs one benchmark in a new process, with an empty numba cache when cold
+    :return: the results
+    """
+    env = dict(os.environ)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        if cold:
+            env["NUMBA_CACHE_DIR"] = cache_dir
+        cmd = [sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)] + (["--cold"] if cold else [])
+        st = time.perf_counter()
+        output = subprocess.run(cmd, env=env, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["process_seconds"] = time.perf_counter() - st
+    return result
+
+
+def parse_list(text: str, cast: typing.Callable) -> list:
+    """
+    :param text: comma separated values
+    :param cast: the type of the values (int values may be written as 1e6)
+    :return: the values
+    """
+    return [cast(float(v)) if cast is int else cast(v) for v in text.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1e3,1e4,1e5,1e6", help="comma separated point counts (up to 1e8)")
+    parser.add_argument("--dims", default="2,3,6", help="comma separated number of dimensions")
+    parser.add_argument("--shapes", default=",".join(_shapes_), help="comma separated shapes")
+    parser.add_argument("--entry-points", default=",".join(_entry_points_), help="comma separated entry points")
+    parser.add_argument("--threads", default="0", help="comma separated numba thread counts (0 for the default)")
+    parser.add_argument("--epsilon", type=float, default=0.01)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--cold", action="store_true", help="time the first call in a new process and empty cache")
+    parser.add_argument("--isolate", action="store_true", help="run every case in its own process")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="compare the throughput with the results in this file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="slow down reported as a regression")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case is not None:
+        case = json.loads(args.case)
+        print(json.dumps(run_case(cold=args.cold, **case)))
+        return
+
+    results = list()
+    header = "{:<28} {:<12} {:>10} {:>4} {:>3} {:>10} {:>14} {:>10} {:>10}".format(
+        "entry point", "shape", "points", "dims", "thr", "seconds", "points/s", "kept", "peak MB")
+    print(header)
+    for num_points in parse_list(args.sizes, int):
+        for num_dims in parse_list(args.dims, int):
+            for shape in parse_list(args.shapes, str):
+                for entry_point in parse_list(args.entry_points, str):
+                    if entry_point == "numpy_reference" and num_points > _numpy_reference_max_points_:
+                        continue
+                    for num_threads in parse_list(args.threads, int):
+                        case = dict(entry_point=entry_point, shape=shape, num_points=num_points, num_dims=num_dims,
+                                    epsilon=args.epsilon, num_threads=num_threads, repeats=args.repeats)
+                        if args.cold or args.isolate:
+                            result = run_case_isolated(case, args.cold)
+                        else:
+                            result = run_case(cold=False, **case)
+                        peak_mb = result["peak_rss_mb"]
+                        if peak_mb is None:
+                            peak_mb = result["traced_peak_mb"]
+                        results.append(result)
+                        print("{:<28} {:<12} {:>10} {:>4} {:>3} {:>10.4f} {:>14.0f} {:>10} {:>10.1f}".format(
+                            entry_point, shape, num_points, num_dims, result["num_threads"], result["seconds"],
+                            result["points_per_second"], result["num_kept"], peak_mb))
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=1)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+
+        def key(r):
+            return r["entry_point"], r["shape"], r["num_points"], r["num_dims"], r["num_threads"], r["cold"]
+        baseline = {key(r): r for r in baseline}
+        regressions = 0
+        for result in results:
+            old = baseline.get(key(result))
+            if old is not None and result["points_per_second"] < old["points_per_second"] * (1.0 - args.tolerance):
+                regressions += 1
+                print("REGRESSION {}: {:.0f} -> {:.0f} points/s".format(
+                    key(result), old["points_per_second"], result["points_per_second"]))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
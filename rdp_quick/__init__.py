@@ -1,37 +1,86 @@
 import numpy as np
 import numpy.typing as npt
-from rdp_quick.check_window import check_windows
-from rdp_quick.curvature import compute_curvature_and_build_windows
+from rdp_quick.check_window import check_windows, check_windows_compiled, check_windows_ragged, check_windows_levels, \
+    check_windows_target_count, check_windows_significance
+from rdp_quick.curvature import compute_curvature_windows
+from rdp_quick.hull import check_windows_auto, check_windows_hull
+from rdp_quick.output import get_mask_buffer, build_output
+from rdp_quick.stream import RdpStream
+from rdp_quick.incremental import RdpIncremental
+from rdp_quick.out_of_core import rdp_file
+from rdp_quick.arrow import rdp_arrow, rdp_parquet
+from rdp_quick.jit import warmup, set_cache_dir
+from rdp_quick.stats import RdpStats, rdp_initial_windows_stats
+from rdp_quick.pool import rdp_threadsafe, rdp_map, rdp_async, get_executor, shutdown_executor
+from rdp_quick.metrics import check_windows_metric, perpendicular_distance, segment_distance, sed_distance
+from rdp_quick.seams import repair_window_seams
+from rdp_quick.auto import plan_rdp, tune_cost_model, load_cost_model, get_tuning_path
 import typing
 
 
 def rdp_initial_windows(p_array: npt.NDArray[float], epsilon: float,
-                        initial_windows: typing.List[typing.Tuple[int, int]]) -> npt.NDArray[float]:
+                        initial_windows: typing.List[typing.Tuple[int, int]],
+                        return_mask: bool = False, return_indices: bool = False,
+                        out: typing.Union[npt.NDArray, None] = None, breadth_first: bool = False,
+                        stats: typing.Union[RdpStats, None] = None,
+                        metric: typing.Union[typing.Callable, None] = None,
+                        repair_seams: bool = False) -> npt.NDArray:
     """
     Computes the new points based starting with the windows given
-    :param p_array: the data points (must be of type float64 and 2D)
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
     :param epsilon: the threshold (must be of type float64)
     :param initial_windows: the initial windows
-    :return: The down sampled points
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :param breadth_first: check each level of windows in one parallel pass (see check_windows_levels)
+    :param stats: an RdpStats to fill in with the statistics of this call
+    :param metric: measure the distances with this numba.njit function (see rdp_quick.metrics), None for the
+                   perpendicular distance
+    :param repair_seams: remove the window end points that are not needed once all the windows are checked
+                         (see repair_window_seams)
+    :return: The down sampled points (or the mask or indices)
     """
-    p_array_ok = np.zeros(p_array.shape[0], dtype=bool)
-    windows = initial_windows
-    num_windows = len(initial_windows)
-    while num_windows > 0:
-        windows = check_windows(p_array, epsilon, windows, p_array_ok)
-        num_windows = len(windows)
-    return p_array[p_array_ok]
+    if metric is not None and (breadth_first or repair_seams):
+        raise ValueError("breadth_first and repair_seams can not be used with a metric")
+    if stats is not None:
+        return rdp_initial_windows_stats(p_array, epsilon, initial_windows, return_mask, return_indices, out,
+                                         breadth_first, stats, metric, repair_seams)
+    p_array_ok = get_mask_buffer(p_array.shape[0], return_mask, return_indices, out)
+    windows = np.asarray(initial_windows, dtype=np.int64).reshape(-1, 2)
+    if metric is not None:
+        check_windows_metric(p_array, epsilon, windows, p_array_ok, metric)
+    elif breadth_first:
+        check_windows_levels(p_array, epsilon, windows, p_array_ok)
+    else:
+        check_windows_auto(p_array, epsilon, windows, p_array_ok)
+    if repair_seams:
+        repair_window_seams(p_array, epsilon, windows, p_array_ok)
+    return build_output(p_array, p_array_ok, return_mask, return_indices, out)
 
 
-def rdp_single_initial_window(p_array: npt.NDArray[float], epsilon: float) -> npt.NDArray[float]:
+def rdp_single_initial_window(p_array: npt.NDArray[float], epsilon: float,
+                              return_mask: bool = False, return_indices: bool = False,
+                              out: typing.Union[npt.NDArray, None] = None, breadth_first: bool = False,
+                              stats: typing.Union[RdpStats, None] = None,
+                              metric: typing.Union[typing.Callable, None] = None) -> npt.NDArray:
     """
     Computes the new points based starting with one window over all the points
-    :param p_array: the data points (must be of type float64 and 2D)
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
     :param epsilon: the threshold (must be of type float64)
-    :return: The down sampled points
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :param breadth_first: check each level of windows in one parallel pass (see check_windows_levels)
+    :param stats: an RdpStats to fill in with the statistics of this call
+    :param metric: measure the distances with this numba.njit function (see rdp_quick.metrics), None for the
+                   perpendicular distance
+    :return: The down sampled points (or the mask or indices)
     """
     windows = [(0, len(p_array)-1)]
-    return rdp_initial_windows(p_array, epsilon, windows)
+    return rdp_initial_windows(p_array, epsilon, windows, return_mask=return_mask,
+                               return_indices=return_indices, out=out, breadth_first=breadth_first, stats=stats,
+                               metric=metric)
 
 
 def get_initial_windows(num_points: int, num_windows: int,
@@ -44,62 +93,257 @@ def get_initial_windows(num_points: int, num_windows: int,
     :return: a list of initial windows
     """
     windows = list()
+    if num_points == 0:
+        return windows
     for i in range(num_windows):
-        si = i * points_per_window
-        ei = si + points_per_window
+        # a rounded up points_per_window can put the last windows past the end of the points
+        si = min(i * points_per_window, num_points - 1)
+        ei = min(si + points_per_window, num_points - 1)
         if i == num_windows - 1:
             ei = num_points - 1
         windows.append((si, ei))
     return windows
 
 
-def rdp_num_windows(p_array: npt.NDArray[float], epsilon: float, num_windows) -> npt.NDArray[float]:
+def rdp_num_windows(p_array: npt.NDArray[float], epsilon: float, num_windows,
+                    return_mask: bool = False, return_indices: bool = False,
+                    out: typing.Union[npt.NDArray, None] = None, breadth_first: bool = False,
+                    stats: typing.Union[RdpStats, None] = None,
+                    metric: typing.Union[typing.Callable, None] = None,
+                    repair_seams: bool = False) -> npt.NDArray:
     """
     Computes the new points starting with the given number of windows
-    :param p_array: the data points (must be of type float64 and 2D)
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
     :param epsilon: the threshold (must be of type float64)
     :param num_windows: the initial number of windows
-    :return: The down sampled points
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :param breadth_first: check each level of windows in one parallel pass (see check_windows_levels)
+    :param stats: an RdpStats to fill in with the statistics of this call
+    :param metric: measure the distances with this numba.njit function (see rdp_quick.metrics), None for the
+                   perpendicular distance
+    :param repair_seams: remove the window end points that are not needed once all the windows are checked
+                         (see repair_window_seams)
+    :return: The down sampled points (or the mask or indices)
     """
     if num_windows <= 1:
-        return rdp_single_initial_window(p_array, epsilon)
+        return rdp_single_initial_window(p_array, epsilon, return_mask=return_mask,
+                                         return_indices=return_indices, out=out, breadth_first=breadth_first,
+                                         stats=stats, metric=metric)
 
-    points_per_window = np.int(np.round(len(p_array)/num_windows))
-    windows = get_initial_windows(len(p_array), num_windows, points_per_window)
-    return rdp_initial_windows(p_array, epsilon, windows)
+    if stats is not None:
+        stats.begin()
+    try:
+        points_per_window = int(np.round(len(p_array)/num_windows))
+        windows = get_initial_windows(len(p_array), num_windows, points_per_window)
+        return rdp_initial_windows(p_array, epsilon, windows, return_mask=return_mask,
+                                   return_indices=return_indices, out=out, breadth_first=breadth_first, stats=stats,
+                                   metric=metric, repair_seams=repair_seams)
+    except BaseException:
+        if stats is not None:
+            stats.end()
+        raise
 
 
-def rdp_points_per_window(p_array: npt.NDArray[float], epsilon: float, points_per_window) -> npt.NDArray[float]:
+def rdp_points_per_window(p_array: npt.NDArray[float], epsilon: float, points_per_window,
+                          return_mask: bool = False, return_indices: bool = False,
+                          out: typing.Union[npt.NDArray, None] = None, breadth_first: bool = False,
+                          stats: typing.Union[RdpStats, None] = None,
+                          metric: typing.Union[typing.Callable, None] = None,
+                          repair_seams: bool = False) -> npt.NDArray:
     """
     Computes the new points starting with windows of length points_per_window
-    :param p_array: the data points (must be of type float64 and 2D)
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
     :param epsilon: the threshold (must be of type float64)
     :param points_per_window: the initial number of points per window
-    :return: The down sampled points
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :param breadth_first: check each level of windows in one parallel pass (see check_windows_levels)
+    :param stats: an RdpStats to fill in with the statistics of this call
+    :param metric: measure the distances with this numba.njit function (see rdp_quick.metrics), None for the
+                   perpendicular distance
+    :param repair_seams: remove the window end points that are not needed once all the windows are checked
+                         (see repair_window_seams)
+    :return: The down sampled points (or the mask or indices)
     """
     if points_per_window >= len(p_array) - 1:
-        return rdp_single_initial_window(p_array, epsilon)
+        return rdp_single_initial_window(p_array, epsilon, return_mask=return_mask,
+                                         return_indices=return_indices, out=out, breadth_first=breadth_first,
+                                         stats=stats, metric=metric)
 
-    num_windows = int(np.round(len(p_array)/points_per_window))
-    windows = get_initial_windows(len(p_array), num_windows, points_per_window)
-    return rdp_initial_windows(p_array, epsilon, windows)
+    if stats is not None:
+        stats.begin()
+    try:
+        num_windows = int(np.round(len(p_array)/points_per_window))
+        windows = get_initial_windows(len(p_array), num_windows, points_per_window)
+        return rdp_initial_windows(p_array, epsilon, windows, return_mask=return_mask,
+                                   return_indices=return_indices, out=out, breadth_first=breadth_first, stats=stats,
+                                   metric=metric, repair_seams=repair_seams)
+    except BaseException:
+        if stats is not None:
+            stats.end()
+        raise
 
 
 def rdp_windows_from_curvature(p_array: npt.NDArray[float], epsilon: float,
                                gradient_nargs: typing.Union[dict, None] = None,
-                               peak_find_nargs: typing.Union[dict, None] = None) -> npt.NDArray[float]:
+                               peak_find_nargs: typing.Union[dict, None] = None,
+                               return_mask: bool = False, return_indices: bool = False,
+                               out: typing.Union[npt.NDArray, None] = None, breadth_first: bool = False,
+                               stats: typing.Union[RdpStats, None] = None,
+                               metric: typing.Union[typing.Callable, None] = None,
+                               repair_seams: bool = False) -> npt.NDArray:
     """
     Computes the new points by first determining the initial windows using the curvature
 
     The curvature calculation will only use the first two columns as x and y, other dimensions will be ignored
 
-    :param p_array: the data points (must be of type float64 and 2D)
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
     :param epsilon: the threshold (must be of type float64)
     :param gradient_nargs: any named arguments to pass to the numpy.gradient function
     :param peak_find_nargs: any named arguments to pass to the scipy.signal.find_peaks function
-    :return: The down sampled points
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :param breadth_first: check each level of windows in one parallel pass (see check_windows_levels)
+    :param stats: an RdpStats to fill in with the statistics of this call
+    :param metric: measure the distances with this numba.njit function (see rdp_quick.metrics), None for the
+                   perpendicular distance
+    :param repair_seams: remove the window end points that are not needed once all the windows are checked
+                         (see repair_window_seams)
+    :return: The down sampled points (or the mask or indices)
     """
-    windows = compute_curvature_and_build_windows(p_array[:, 0], p_array[:, 1],
-                                                  gradient_nargs=gradient_nargs,
-                                                  peak_find_nargs=peak_find_nargs)
-    return rdp_initial_windows(p_array, epsilon, windows)
+    if stats is not None:
+        stats.begin()
+    try:
+        windows = compute_curvature_windows(p_array[:, 0], p_array[:, 1],
+                                            gradient_nargs=gradient_nargs,
+                                            peak_find_nargs=peak_find_nargs)
+        return rdp_initial_windows(p_array, epsilon, windows, return_mask=return_mask,
+                                   return_indices=return_indices, out=out, breadth_first=breadth_first, stats=stats,
+                                   metric=metric, repair_seams=repair_seams)
+    except BaseException:
+        if stats is not None:
+            stats.end()
+        raise
+
+
+def rdp_auto(p_array: npt.NDArray[float], epsilon: float,
+             return_mask: bool = False, return_indices: bool = False,
+             out: typing.Union[npt.NDArray, None] = None, stats: typing.Union[RdpStats, None] = None,
+             cost_model: typing.Union[dict, None] = None) -> npt.NDArray:
+    """
+    Computes the new points with the windows and kernel predicted to be the fastest for these points on this machine
+    (see plan_rdp).  The cost model is loaded from the file saved by tune_cost_model, without one a built in model for
+    the number of threads is used unless RDP_QUICK_AUTOTUNE=1 is set to measure and save it first (see
+    load_cost_model)
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
+    :param epsilon: the threshold (must be of type float64)
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :param stats: an RdpStats to fill in with the statistics of this call (the planning is counted as planning)
+    :param cost_model: the cost model, by default load_cost_model()
+    :return: The down sampled points (or the mask or indices)
+    """
+    if stats is not None:
+        stats.begin()
+    try:
+        plan = plan_rdp(p_array, epsilon, cost_model)
+        if plan["points_per_window"] is None:
+            return rdp_single_initial_window(p_array, epsilon, return_mask=return_mask, return_indices=return_indices,
+                                             out=out, breadth_first=plan["breadth_first"], stats=stats)
+        return rdp_points_per_window(p_array, epsilon, plan["points_per_window"], return_mask=return_mask,
+                                     return_indices=return_indices, out=out, breadth_first=plan["breadth_first"],
+                                     stats=stats, repair_seams=plan["repair_seams"])
+    except BaseException:
+        if stats is not None:
+            stats.end()
+        raise
+
+
+def rdp_target_count(p_array: npt.NDArray[float], num_points: int,
+                     return_mask: bool = False, return_indices: bool = False,
+                     out: typing.Union[npt.NDArray, None] = None) -> typing.Tuple[npt.NDArray, float]:
+    """
+    Computes the new points keeping num_points points.  Instead of testing against a threshold the window with the
+    largest maximum distance is always split next, so the points are accepted in order of how far they are from the
+    down sampled line
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
+    :param num_points: the number of points to keep (the first and last point are always kept)
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :return: The down sampled points (or the mask or indices), the implied epsilon (the largest distance of the
+             points that were not kept)
+    """
+    p_array_ok = get_mask_buffer(p_array.shape[0], return_mask, return_indices, out)
+    epsilon = check_windows_target_count(p_array, num_points, p_array_ok)
+    return build_output(p_array, p_array_ok, return_mask, return_indices, out), epsilon
+
+
+def rdp_significance(p_array: npt.NDArray[float],
+                     initial_windows: typing.Union[typing.List[typing.Tuple[int, int]], None] = None
+                     ) -> npt.NDArray[float]:
+    """
+    Computes the significance of every point, the largest epsilon at which the point is still accepted.
+    This is done once, the points for any epsilon are then found with rdp_from_significance.
+    The significance can be saved with numpy.save
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
+    :param initial_windows: the initial windows, by default one window over all the points
+    :return: the significance of each point (float64, infinity for the window end points)
+    """
+    if initial_windows is None:
+        initial_windows = [(0, len(p_array)-1)]
+    significance = np.zeros(p_array.shape[0], dtype=np.float64)
+    windows = np.asarray(initial_windows, dtype=np.int64).reshape(-1, 2)
+    check_windows_significance(p_array, windows, significance)
+    return significance
+
+
+def rdp_from_significance(p_array: npt.NDArray[float], significance: npt.NDArray[float], epsilon: float,
+                          return_mask: bool = False, return_indices: bool = False,
+                          out: typing.Union[npt.NDArray, None] = None) -> npt.NDArray:
+    """
+    Computes the new points from the significance found by rdp_significance, the result is the same as running
+    rdp_initial_windows with the same windows and epsilon
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
+    :param significance: the significance of each point
+    :param epsilon: the threshold
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :return: The down sampled points (or the mask or indices)
+    """
+    p_array_ok = get_mask_buffer(p_array.shape[0], return_mask, return_indices, out)
+    np.greater(significance, epsilon, out=p_array_ok)
+    return build_output(p_array, p_array_ok, return_mask, return_indices, out)
+
+
+def rdp_ragged(p_array: npt.NDArray[float], epsilon: float,
+               offsets: npt.NDArray[int], return_mask: bool = False, return_indices: bool = False,
+               out: typing.Union[npt.NDArray, None] = None) -> typing.Tuple[npt.NDArray, npt.NDArray[np.int64]]:
+    """
+    Computes the new points for many polylines at once, each polyline is simplified on its own with one window
+    over all of its points.  The polylines are stored one after another in p_array and polyline i is made of the
+    points offsets[i] to offsets[i + 1] - 1
+    :param p_array: the data points of all the polylines (2D, float64, float32, int64 or int32)
+    :param epsilon: the threshold (must be of type float64)
+    :param offsets: the start index of each polyline followed by the total number of points
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :return: The down sampled points (or the mask or indices), the offsets of each polyline in the output
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    if offsets.ndim != 1 or len(offsets) == 0 or offsets[0] != 0 or offsets[-1] != len(p_array) \
+            or np.any(np.diff(offsets) < 0):
+        raise ValueError("offsets must start at 0, be non-decreasing and end at the number of points")
+    p_array_ok = get_mask_buffer(p_array.shape[0], return_mask, return_indices, out)
+    check_windows_ragged(p_array, epsilon, offsets, p_array_ok)
+    if return_mask:
+        return p_array_ok, offsets
+    num_ok = np.append(0, np.cumsum(p_array_ok))
+    return build_output(p_array, p_array_ok, return_mask, return_indices, out), num_ok[offsets]
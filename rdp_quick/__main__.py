@@ -0,0 +1,4 @@
+import sys
+from rdp_quick.cli import main
+
+sys.exit(main())
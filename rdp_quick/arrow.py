@@ -0,0 +1,116 @@
+import numpy as np
+import numpy.typing as npt
+import os
+import typing
+from rdp_quick.check_window import check_windows_ragged
+from rdp_quick.output import build_output
+
+
+def _import_pyarrow():
+    """
+    pyarrow is optional so it is only imported when one of the arrow functions is used
+    :return: the pyarrow module
+    """
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("the arrow functions need pyarrow, install it with pip install rdp-quick[arrow]") from e
+    return pyarrow
+
+
+def _coordinates_to_numpy(coordinates: typing.Any) -> typing.Tuple[npt.NDArray, typing.Callable]:
+    """
+    Reads the coordinates of a GeoArrow interleaved (fixed_size_list) or separated (struct) array
+    :param coordinates: the arrow array of coordinates
+    :return: the points (2D), a function building an arrow array of the same type from a subset of the points
+    """
+    pa = _import_pyarrow()
+    if pa.types.is_fixed_size_list(coordinates.type):
+        num_dims = coordinates.type.list_size
+        values = coordinates.values.slice(coordinates.offset * num_dims, len(coordinates) * num_dims)
+        # one bulk copy, the kernels are compiled for writeable arrays and arrow buffers are read only
+        p_array = np.array(values.to_numpy(zero_copy_only=False)).reshape(-1, num_dims)
+
+        def build(kept):
+            return pa.FixedSizeListArray.from_arrays(pa.array(kept.ravel(), type=coordinates.type.value_type),
+                                                     type=coordinates.type)
+        return p_array, build
+
+    if pa.types.is_struct(coordinates.type):
+        names = [coordinates.type.field(i).name for i in range(coordinates.type.num_fields)]
+        p_array = np.column_stack([coordinates.field(i).to_numpy(zero_copy_only=False) for i in range(len(names))])
+
+        def build(kept):
+            return pa.StructArray.from_arrays([pa.array(kept[:, i], type=coordinates.type.field(i).type)
+                                               for i in range(len(names))], fields=list(coordinates.type))
+        return p_array, build
+
+    raise ValueError("the coordinates must be a fixed_size_list (interleaved) or a struct (separated) array, "
+                     "not {}".format(coordinates.type))
+
+
+def rdp_arrow(linestrings: typing.Any, epsilon: float) -> typing.Any:
+    """
+    Simplifies every linestring of a GeoArrow linestring array on its own (see rdp_ragged).  All the coordinates are
+    read at once from the arrow buffers and the simplified linestrings are written back as one arrow array, there is
+    no conversion per linestring.
+
+    The linestrings are a list (or large_list) of interleaved (fixed_size_list) or separated (struct) coordinates,
+    optionally wrapped in an extension type such as geoarrow.linestring.  Chunked arrays are simplified one chunk at
+    a time.  Null linestrings stay null
+    :param linestrings: the pyarrow array (or chunked array) of linestrings
+    :param epsilon: the threshold
+    :return: the simplified linestrings, with the same type
+    """
+    pa = _import_pyarrow()
+    if isinstance(linestrings, pa.ChunkedArray):
+        return pa.chunked_array([rdp_arrow(chunk, epsilon) for chunk in linestrings.chunks], type=linestrings.type)
+    if isinstance(linestrings.type, pa.ExtensionType):
+        return pa.ExtensionArray.from_storage(linestrings.type, rdp_arrow(linestrings.storage, epsilon))
+    if not (pa.types.is_list(linestrings.type) or pa.types.is_large_list(linestrings.type)):
+        raise ValueError("the linestrings must be a list array of coordinates, not {}".format(linestrings.type))
+
+    offsets = linestrings.offsets.to_numpy().astype(np.int64)
+    coordinates = linestrings.values.slice(offsets[0], offsets[-1] - offsets[0])
+    offsets -= offsets[0]
+    p_array, build = _coordinates_to_numpy(coordinates)
+
+    p_array_ok = np.zeros(p_array.shape[0], dtype=bool)
+    check_windows_ragged(p_array, float(epsilon), offsets, p_array_ok)
+    kept = build_output(p_array, p_array_ok, False, False, None)
+    new_offsets = np.append(0, np.cumsum(p_array_ok))[offsets]
+
+    offsets_type = pa.int64() if pa.types.is_large_list(linestrings.type) else pa.int32()
+    list_class = pa.LargeListArray if pa.types.is_large_list(linestrings.type) else pa.ListArray
+    mask = linestrings.is_null() if linestrings.null_count > 0 else None
+    return list_class.from_arrays(pa.array(new_offsets, type=offsets_type), build(kept), type=linestrings.type,
+                                  mask=mask)
+
+
+def rdp_parquet(source: typing.Union[str, os.PathLike], output_path: typing.Union[str, os.PathLike], epsilon: float,
+                column: str = "geometry") -> int:
+    """
+    Simplifies the linestrings of a (Geo)Parquet file and writes them to a new Parquet file, one row group at a time.
+    The linestrings must use a GeoArrow (native) encoding, the other columns and the metadata are copied
+    :param source: the Parquet file to read
+    :param output_path: the Parquet file to write
+    :param epsilon: the threshold
+    :param column: the name of the linestring column
+    :return: the number of linestrings
+    """
+    _import_pyarrow()
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(source)
+    schema = parquet_file.schema_arrow
+    column_index = schema.get_field_index(column)
+    if column_index < 0:
+        raise ValueError("{} has no column {}".format(os.fspath(source), column))
+    num_rows = 0
+    with pq.ParquetWriter(output_path, schema) as writer:
+        for row_group in range(parquet_file.num_row_groups):
+            table = parquet_file.read_row_group(row_group)
+            table = table.set_column(column_index, schema.field(column_index),
+                                     rdp_arrow(table.column(column_index), epsilon))
+            writer.write_table(table)
+            num_rows += table.num_rows
+    return num_rows
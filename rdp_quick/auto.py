@@ -0,0 +1,280 @@
+import json
+import math
+import os
+import threading
+import time
+import typing
+import warnings
+import numba
+import numpy as np
+import numpy.typing as npt
+import rdp_quick.jit
+from rdp_quick.check_window import check_windows_compiled, check_windows_levels, _check_windows_stack, \
+    _stats_num_evaluations_, _stats_num_levels_, _stats_levels_start_
+from rdp_quick.hull import _hull_switch_factor_
+from rdp_quick.seams import repair_window_seams
+
+# bump when the cost model changes so old tuning files are measured again
+_tuning_version_ = 1
+# inputs with fewer points are always simplified as one window without planning
+_auto_min_points_ = 1 << 14
+# at most this many points (and at most a quarter of them) are simplified from the middle of the input to estimate the
+# work
+_auto_sample_points_ = 1 << 15
+# the smallest window tried and the fewest accepted points expected per window, smaller windows are mostly seams
+_auto_min_points_per_window_ = 1 << 10
+_auto_min_accepted_per_window_ = 8
+# the number of points and dimensions the cost model is measured with
+_tuning_num_points_ = 1 << 18
+_tuning_dims_ = (2, 4)
+
+# set RDP_QUICK_AUTOTUNE=1 to measure the cost model the first time it is needed when there is no tuning file
+_rdp_quick_autotune_ = os.environ.get("RDP_QUICK_AUTOTUNE", "0") == "1"
+# the cost of one distance evaluation and the costs per level and per seam used without a tuning file, measured on one
+# core (the evaluations for 2 and 4 dimensions)
+_default_seconds_per_evaluation_ = [4e-9, 1.7e-8]
+_default_seconds_per_level_ = 1e-5
+_default_seconds_per_seam_ = 1e-5
+# without a tuning file the breadth first kernel is expected to use each thread at this fraction of one core, the depth
+# first kernel is expected to be serial
+_default_parallel_efficiency_ = 0.5
+
+# the cost model loaded (or measured) by load_cost_model
+_cost_model_ = None
+_cost_model_lock_ = threading.Lock()
+
+
+def get_tuning_path() -> str:
+    """
+    :return: the file the cost model is saved to, RDP_QUICK_TUNING_FILE if set, otherwise tuning.json in the cache
+             directory (see set_cache_dir) or in ~/.cache/rdp_quick
+    """
+    path = os.environ.get("RDP_QUICK_TUNING_FILE")
+    if path:
+        return path
+    cache_dir = rdp_quick.jit._rdp_quick_cache_dir_
+    if cache_dir is None:
+        cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "rdp_quick")
+    return os.path.join(cache_dir, "tuning.json")
+
+
+def _random_walk(num_points: int, num_dims: int) -> npt.NDArray[float]:
+    """
+    :param num_points: the number of points
+    :param num_dims: the number of dimensions
+    :return: the points of a random walk, the same every time
+    """
+    return np.cumsum(np.random.default_rng(0).normal(size=(num_points, num_dims)), axis=0)
+
+
+def _best_time(function: typing.Callable[[], typing.Any], repeats: int = 3) -> float:
+    """
+    :param function: the function to time
+    :param repeats: the number of times to run it
+    :return: the shortest time in seconds
+    """
+    best = math.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _measure_work(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                  max_evaluations: int = 1 << 62) -> typing.Tuple[int, int, npt.NDArray[bool]]:
+    """
+    Simplifies the points with the serial stack kernel while counting the work
+    :param p_array: the data points
+    :param epsilon: the threshold
+    :param windows: the initial windows
+    :param max_evaluations: give up after this many distance evaluations
+    :return: the number of distance evaluations (-1 if it gave up), the number of levels, the accepted points
+    """
+    p_array_ok = np.zeros(p_array.shape[0], dtype=bool)
+    buffer = np.zeros(_stats_levels_start_ + 1, dtype=np.int64)
+    _, pending = _check_windows_stack(p_array, epsilon, windows, p_array_ok, p_array.shape[0] + 1, buffer,
+                                      max_evaluations)
+    if pending.shape[0] > 0:
+        return -1, 0, p_array_ok
+    return int(buffer[_stats_num_evaluations_]), int(buffer[_stats_num_levels_]), p_array_ok
+
+
+def _block_windows(num_points: int, points_per_window: int) -> npt.NDArray[np.int64]:
+    """
+    :param num_points: the number of points
+    :param points_per_window: the points per window
+    :return: the windows of rdp_points_per_window
+    """
+    starts = np.arange(0, num_points - 1, points_per_window, dtype=np.int64)
+    return np.stack([starts, np.minimum(starts + points_per_window, num_points - 1)], axis=1)
+
+
+def tune_cost_model(path: typing.Union[str, os.PathLike, None] = None, num_points: int = _tuning_num_points_,
+                    save: bool = True) -> dict:
+    """
+    Measures the cost model on this machine (a few seconds) and saves it for load_cost_model.  Call it once to tune
+    rdp_auto for this machine and again after changing the hardware or the number of threads
+    :param path: the file to save the cost model to, by default get_tuning_path()
+    :param num_points: the number of points to measure with
+    :param save: save the cost model to the file
+    :return: the cost model
+    """
+    one_window = np.array([[0, num_points - 1]], dtype=np.int64)
+    seconds_per_evaluation = {"depth_first": list(), "breadth_first": list()}
+    seconds_per_level = 0.0
+    for num_dims in _tuning_dims_:
+        p_array = _random_walk(num_points, num_dims)
+        epsilon = 3.0
+        num_evaluations, _, _ = _measure_work(p_array, epsilon, one_window)
+        # the first call of each kernel compiles it (or loads it from the cache)
+        check_windows_compiled(p_array[:16], epsilon, np.array([[0, 15]], dtype=np.int64), np.zeros(16, dtype=bool))
+        check_windows_levels(p_array[:16], epsilon, np.array([[0, 15]], dtype=np.int64), np.zeros(16, dtype=bool))
+        depth_first = _best_time(lambda: check_windows_compiled(p_array, epsilon, one_window,
+                                                                np.zeros(num_points, dtype=bool)))
+        breadth_first = _best_time(lambda: check_windows_levels(p_array, epsilon, one_window,
+                                                                np.zeros(num_points, dtype=bool)))
+        seconds_per_evaluation["depth_first"].append(depth_first / num_evaluations)
+        seconds_per_evaluation["breadth_first"].append(breadth_first / num_evaluations)
+
+        # a short walk with a small threshold has many levels and little work, what is left is the cost of a level
+        small = p_array[:1024]
+        small_window = np.array([[0, 1023]], dtype=np.int64)
+        small_evaluations, small_levels, _ = _measure_work(small, 0.1, small_window)
+        small_time = _best_time(lambda: check_windows_levels(small, 0.1, small_window, np.zeros(1024, dtype=bool)),
+                                repeats=10)
+        seconds_per_level = max(seconds_per_level, (small_time - small_evaluations * breadth_first / num_evaluations)
+                                / max(small_levels, 1))
+
+    p_array = _random_walk(num_points, 2)
+    windows = _block_windows(num_points, _auto_min_points_per_window_)
+    _, _, p_array_ok = _measure_work(p_array, 3.0, windows)
+    repair_window_seams(p_array, 3.0, windows[:2], p_array_ok.copy())
+    seam_time = _best_time(lambda: repair_window_seams(p_array, 3.0, windows, p_array_ok.copy()))
+
+    cost_model = dict(version=_tuning_version_, num_threads=numba.get_num_threads(), dims=list(_tuning_dims_),
+                      seconds_per_evaluation=seconds_per_evaluation, seconds_per_level=seconds_per_level,
+                      seconds_per_seam=seam_time / max(len(windows) - 1, 1))
+    if save:
+        path = get_tuning_path() if path is None else os.fspath(path)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(cost_model, f, indent=2)
+        except OSError as e:
+            warnings.warn("could not save the rdp_quick cost model to {}: {}".format(path, e), RuntimeWarning)
+    return cost_model
+
+
+def _default_cost_model(num_threads: int) -> dict:
+    """
+    :param num_threads: the number of numba threads
+    :return: the cost model used without a tuning file (see _default_seconds_per_evaluation_)
+    """
+    speed_up = max(_default_parallel_efficiency_ * num_threads, 1.0)
+    breadth_first = [cost / speed_up for cost in _default_seconds_per_evaluation_]
+    return dict(version=_tuning_version_, num_threads=num_threads, dims=list(_tuning_dims_),
+                seconds_per_evaluation={"depth_first": list(_default_seconds_per_evaluation_),
+                                        "breadth_first": breadth_first},
+                seconds_per_level=_default_seconds_per_level_, seconds_per_seam=_default_seconds_per_seam_)
+
+
+def load_cost_model(path: typing.Union[str, os.PathLike, None] = None) -> dict:
+    """
+    Loads the cost model saved by tune_cost_model.  Without a usable tuning file (none, or made for another number
+    of threads) the built in _default_cost_model for the number of threads is used, or with RDP_QUICK_AUTOTUNE=1 the
+    model is measured and saved first.  The model is kept in memory after the first call
+    :param path: the tuning file, by default get_tuning_path()
+    :return: the cost model
+    """
+    global _cost_model_
+    with _cost_model_lock_:
+        if path is None and _cost_model_ is not None and _cost_model_["num_threads"] == numba.get_num_threads():
+            return _cost_model_
+        tuning_path = get_tuning_path() if path is None else os.fspath(path)
+        cost_model = None
+        try:
+            with open(tuning_path) as f:
+                cost_model = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if cost_model is None or cost_model.get("version") != _tuning_version_ or \
+                cost_model.get("num_threads") != numba.get_num_threads():
+            if _rdp_quick_autotune_:
+                cost_model = tune_cost_model(tuning_path)
+            else:
+                cost_model = _default_cost_model(numba.get_num_threads())
+        if path is None:
+            _cost_model_ = cost_model
+        return cost_model
+
+
+def _seconds_per_evaluation(cost_model: dict, kernel: str, num_dims: int) -> float:
+    """
+    :param cost_model: the cost model
+    :param kernel: depth_first or breadth_first
+    :param num_dims: the number of dimensions
+    :return: the cost of one distance evaluation, linear in the number of dimensions between the measured ones
+    """
+    (dims_low, dims_high), (cost_low, cost_high) = cost_model["dims"], cost_model["seconds_per_evaluation"][kernel]
+    slope = (cost_high - cost_low) / (dims_high - dims_low)
+    return max(cost_low + slope * (num_dims - dims_low), 0.5 * cost_low)
+
+
+def plan_rdp(p_array: npt.NDArray, epsilon: float, cost_model: typing.Union[dict, None] = None) -> dict:
+    """
+    Chooses how rdp_auto simplifies the points.  A block from the middle of the points is simplified to find the
+    work per point, which is scaled to the whole input for one window and for windows of each power of two points
+    (repaired with repair_seams, each window level less is one pass over the points less).  The cost model turns the
+    work into seconds for the depth first and the breadth first kernels and the fastest is chosen
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
+    :param epsilon: the threshold
+    :param cost_model: the cost model, by default load_cost_model()
+    :return: a dict with points_per_window (None for one window), breadth_first, repair_seams, pathological (the
+             sample needed too much work, see check_windows_auto) and the predicted_seconds of every option considered
+    """
+    num_points, num_dims = p_array.shape
+    plan = dict(points_per_window=None, breadth_first=False, repair_seams=False, pathological=False,
+                predicted_seconds=dict())
+    if num_points < _auto_min_points_:
+        return plan
+    cost_model = cost_model if cost_model is not None else load_cost_model()
+
+    num_sample = min(num_points // 4, _auto_sample_points_)
+    sample_start = (num_points - num_sample) // 2
+    sample = p_array[sample_start:sample_start + num_sample]
+    max_evaluations = int(_hull_switch_factor_ * num_sample * np.log2(num_sample))
+    num_evaluations, num_levels, sample_ok = _measure_work(
+        sample, float(epsilon), np.array([[0, num_sample - 1]], dtype=np.int64), max_evaluations)
+    if num_evaluations < 0:
+        # one window depth first, where check_windows_auto switches to the hull engine
+        plan["pathological"] = True
+        return plan
+    evaluations_per_point = num_evaluations / num_sample
+    accepted_per_point = max(np.count_nonzero(sample_ok), 2) / num_sample
+
+    depth_first = _seconds_per_evaluation(cost_model, "depth_first", num_dims)
+    breadth_first = _seconds_per_evaluation(cost_model, "breadth_first", num_dims)
+    options = list()
+    window_sizes = [None] + [1 << k for k in range(int(np.log2(_auto_min_points_per_window_)),
+                                                   int(np.log2(num_points // 4)) + 1)]
+    for points_per_window in window_sizes:
+        window_points = num_points if points_per_window is None else points_per_window
+        if points_per_window is not None and points_per_window * accepted_per_point < _auto_min_accepted_per_window_:
+            continue
+        extra_levels = np.log2(window_points / num_sample)
+        evaluations = num_points * max(evaluations_per_point + extra_levels, 1.0)
+        levels = max(num_levels + extra_levels, 1.0)
+        seams = 0.0 if points_per_window is None else num_points / points_per_window * cost_model["seconds_per_seam"]
+        options.append((evaluations * depth_first + seams, points_per_window, False))
+        options.append((evaluations * breadth_first + levels * cost_model["seconds_per_level"] + seams,
+                        points_per_window, True))
+
+    for seconds, points_per_window, use_breadth_first in options:
+        name = "{}_{}".format("one_window" if points_per_window is None else points_per_window,
+                              "breadth_first" if use_breadth_first else "depth_first")
+        plan["predicted_seconds"][name] = float(seconds)
+    _, points_per_window, use_breadth_first = min(options, key=lambda option: option[0])
+    plan.update(points_per_window=points_per_window, breadth_first=use_breadth_first,
+                repair_seams=points_per_window is not None)
+    return plan
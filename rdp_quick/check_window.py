@@ -1,25 +1,63 @@
+import heapq
 import numpy as np
 import numpy.typing as npt
-from numba import njit, float64, types, boolean, int64
+from numba import njit, prange, float64, types, boolean, int64
 import typing
-from rdp_quick.compute_distance import compute_distance, _rdp_quick_use_cache_
+from rdp_quick.compute_distance import compute_max_distance, _rdp_quick_point_types_
+from rdp_quick.jit import lazy_njit
 
+# windows with at least this many points are checked with the parallel check_window, smaller ones serially
+_parallel_window_min_points_ = 100000
+# check_window and check_windows_levels cut the work into about this many chunks (several per thread) so the threads
+# stay balanced
+_level_num_chunks_ = 256
+# the smallest chunk of a window that is given to one thread
+_level_min_chunk_points_ = 1024
 
-@njit(types.Tuple((boolean, int64))(float64[:, :], float64), parallel=True, cache=_rdp_quick_use_cache_)
+# the layout of the int64 stats buffer filled in by the *_stats functions (see rdp_quick.stats), the windows checked at
+# each level start at _stats_levels_start_ and any levels past the end of the buffer are counted in its last entry
+_stats_num_evaluations_ = 0
+_stats_largest_window_ = 1
+_stats_num_levels_ = 2
+_stats_num_hull_windows_ = 3
+_stats_levels_start_ = 4
+
+# the max_evaluations passed to _check_windows_stack for no limit
+_no_evaluation_limit_ = 1 << 62
+
+
+@lazy_njit([types.Tuple((boolean, int64))(pt[:, :], float64) for pt in _rdp_quick_point_types_], parallel=True)
 def check_window(p_array: npt.NDArray[float], epsilon: float) -> typing.Tuple[bool, int]:
     """
     Check if the given window.  The line is made from the first and last point.
-    :param p_array: the points to check (must be of type float64 and 2D)
+    :param p_array: the points to check (2D, float64, float32, int64 or int32)
     :param epsilon: the threshold to test against (must be of type float64)
     :return: if any distance is greater than epsilon False, max_index, if all withing epsilon then False, 0
     """
-    if p_array.shape[0] <= 2:
+    num_points = p_array.shape[0]
+    if num_points <= 2:
         return True, 0
-    dists = compute_distance(p_array[0, :], p_array[-1, :], p_array[1:-1, :])
-    arg_max = int(np.argmax(dists))
-    val_max = dists[arg_max]
+    # a fused max and argmax of chunks of the inner points in parallel, then of the chunks in order
+    num_inner = num_points - 2
+    chunk_size = max(_level_min_chunk_points_, (num_inner + _level_num_chunks_ - 1) // _level_num_chunks_)
+    num_chunks = (num_inner + chunk_size - 1) // chunk_size
+    chunk_max = np.empty(num_chunks, dtype=np.float64)
+    chunk_arg_max = np.empty(num_chunks, dtype=np.int64)
+    for ci in prange(num_chunks):
+        chunk_start = 1 + ci * chunk_size
+        chunk_end = min(chunk_start + chunk_size, num_points - 1)
+        val_max, arg_max = compute_max_distance(p_array[0, :], p_array[-1, :], p_array[chunk_start:chunk_end, :])
+        chunk_max[ci] = val_max
+        chunk_arg_max[ci] = chunk_start + arg_max
+
+    val_max = -1.0
+    arg_max = 0
+    for ci in range(num_chunks):
+        if chunk_max[ci] > val_max:
+            val_max = chunk_max[ci]
+            arg_max = chunk_arg_max[ci]
     if val_max > epsilon:
-        return False, arg_max + 1
+        return False, arg_max
     else:
         return True, 0
 
@@ -27,7 +65,7 @@ def check_window(p_array: npt.NDArray[float], epsilon: float) -> typing.Tuple[bo
 def check_windows(p_array: npt.NDArray[float], epsilon: float, windows: typing.List[typing.Tuple[int, int]], p_array_ok: npt.NDArray[bool]):
     """
     test all the current windows, if any do not pass the test then create the new windows
-    :param p_array: The data points (must be of type float64 and 2D)
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
     :param epsilon: The threshold (must be of type float64)
     :param windows: the initial windows
     :param p_array_ok: Which points are accepted
@@ -44,3 +82,399 @@ def check_windows(p_array: npt.NDArray[float], epsilon: float, windows: typing.L
             new_windows.append((win[0], win[0] + arg_max))
             new_windows.append((win[0] + arg_max, win[1]))
     return new_windows
+
+
+@njit(inline="always")
+def _record_window_stats(stats: npt.NDArray[np.int64], start: int, end: int, level: int, num_evaluations: int):
+    """
+    Adds a checked window to the stats buffer
+    :param stats: the stats buffer (see _stats_levels_start_)
+    :param start: the start index of the window
+    :param end: the end index of the window
+    :param level: the number of splits above the window, 0 for an initial window
+    :param num_evaluations: the distances computed point by point for the window
+    """
+    stats[_stats_num_evaluations_] += num_evaluations
+    stats[_stats_largest_window_] = max(stats[_stats_largest_window_], end - start + 1)
+    stats[_stats_num_levels_] = max(stats[_stats_num_levels_], level + 1)
+    stats[min(_stats_levels_start_ + level, stats.shape[0] - 1)] += 1
+
+
+@lazy_njit([types.Tuple((int64, int64[:, :]))(pt[:, :], float64, int64[:, :], boolean[:], int64, int64[:], int64)
+            for pt in _rdp_quick_point_types_])
+def _check_windows_stack(p_array: npt.NDArray[float], epsilon: float, windows: npt.NDArray[np.int64],
+                         p_array_ok: npt.NDArray[bool], parallel_min_points: int, stats: npt.NDArray[np.int64],
+                         max_evaluations: int) -> typing.Tuple[int, npt.NDArray[np.int64]]:
+    """
+    Test all the windows and keep splitting them until every window passes.
+    The pending windows are held on a preallocated int64 stack which grows when needed.
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices, or
+                    (num_windows, 3) with the level of each window in the last column
+    :param p_array_ok: Which points are accepted, updated in place
+    :param parallel_min_points: windows with at least this many points use the parallel check_window
+    :param stats: the stats buffer to fill in, or an empty array for no stats
+    :param max_evaluations: stop before a window would take the distances computed past this many
+    :return: the number of windows that were checked and the windows left when it stopped early (start, end and level
+             in the order they would have been checked, empty when every window passed).  Checking the windows left
+             in any way accepts the same points as not stopping
+    """
+    record_stats = stats.shape[0] > _stats_levels_start_
+    num_evaluations = 0
+    num_windows = windows.shape[0]
+    # the start, end and level of each pending window
+    stack = np.empty((max(num_windows, 64), 3), dtype=np.int64)
+    # push in reverse so the windows are processed in the given order
+    stack_size = 0
+    for wi in range(num_windows - 1, -1, -1):
+        # the window of an empty input ends before it starts and has no points to accept
+        if windows[wi, 1] < windows[wi, 0]:
+            continue
+        stack[stack_size, 0] = windows[wi, 0]
+        stack[stack_size, 1] = windows[wi, 1]
+        stack[stack_size, 2] = windows[wi, 2] if windows.shape[1] > 2 else 0
+        stack_size += 1
+
+    num_checked = 0
+    while stack_size > 0:
+        stack_size -= 1
+        start = stack[stack_size, 0]
+        end = stack[stack_size, 1]
+        level = stack[stack_size, 2]
+        if num_evaluations + max(end - start - 1, 0) > max_evaluations:
+            return num_checked, stack[stack_size::-1, :].copy()
+        num_evaluations += max(end - start - 1, 0)
+        num_checked += 1
+        if record_stats:
+            _record_window_stats(stats, start, end, level, max(end - start - 1, 0))
+        if end - start < 2:
+            ok = True
+            arg_max = 0
+        elif end - start + 1 >= parallel_min_points:
+            ok, arg_max = check_window(p_array[start:end + 1, :], epsilon)
+        else:
+            val_max, arg_max = compute_max_distance(p_array[start, :], p_array[end, :], p_array[start + 1:end, :])
+            arg_max += 1
+            ok = not val_max > epsilon
+
+        if ok:
+            p_array_ok[start] = True
+            p_array_ok[end] = True
+        else:
+            if stack_size + 2 > stack.shape[0]:
+                new_stack = np.empty((stack.shape[0] * 2, 3), dtype=np.int64)
+                new_stack[:stack_size, :] = stack[:stack_size, :]
+                stack = new_stack
+            stack[stack_size, 0] = start + arg_max
+            stack[stack_size, 1] = end
+            stack[stack_size, 2] = level + 1
+            stack[stack_size + 1, 0] = start
+            stack[stack_size + 1, 1] = start + arg_max
+            stack[stack_size + 1, 2] = level + 1
+            stack_size += 2
+    return num_checked, stack[:0, :]
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:]) for pt in _rdp_quick_point_types_])
+def check_windows_compiled(p_array: npt.NDArray[float], epsilon: float, windows: npt.NDArray[np.int64],
+                           p_array_ok: npt.NDArray[bool]) -> int:
+    """
+    Test all the windows and keep splitting them until every window passes, all inside one compiled function
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :return: the number of windows that were checked
+    """
+    return _check_windows_stack(p_array, epsilon, windows, p_array_ok, _parallel_window_min_points_,
+                                np.empty(0, dtype=np.int64), _no_evaluation_limit_)[0]
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:], int64[:]) for pt in _rdp_quick_point_types_])
+def check_windows_compiled_stats(p_array: npt.NDArray[float], epsilon: float, windows: npt.NDArray[np.int64],
+                                 p_array_ok: npt.NDArray[bool], stats: npt.NDArray[np.int64]) -> int:
+    """
+    The same as check_windows_compiled while also filling in the stats buffer
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :param stats: the zeroed stats buffer (see _stats_levels_start_)
+    :return: the number of windows that were checked
+    """
+    return _check_windows_stack(p_array, epsilon, windows, p_array_ok, _parallel_window_min_points_, stats,
+                                _no_evaluation_limit_)[0]
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:]) for pt in _rdp_quick_point_types_])
+def check_windows_serial(p_array: npt.NDArray[float], epsilon: float, windows: npt.NDArray[np.int64],
+                         p_array_ok: npt.NDArray[bool]) -> int:
+    """
+    The same as check_windows_compiled but never starts a parallel region, so it can be called from many threads at
+    once with any numba threading layer (the GIL is released while it runs)
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :return: the number of windows that were checked
+    """
+    return _check_windows_stack(p_array, epsilon, windows, p_array_ok, p_array.shape[0] + 1,
+                                np.empty(0, dtype=np.int64), _no_evaluation_limit_)[0]
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:], boolean[:]) for pt in _rdp_quick_point_types_], parallel=True)
+def check_windows_ragged(p_array: npt.NDArray[float], epsilon: float, offsets: npt.NDArray[np.int64],
+                         p_array_ok: npt.NDArray[bool]) -> int:
+    """
+    Simplify many polylines stored one after another in p_array, one polyline per thread.
+    Polyline i is made of the points offsets[i] to offsets[i + 1] - 1
+    :param p_array: The data points of all the polylines (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param offsets: the start index of each polyline followed by the total number of points (must be of type int64)
+    :param p_array_ok: Which points are accepted, updated in place
+    :return: the number of windows that were checked
+    """
+    num_lines = offsets.shape[0] - 1
+    # each polyline already runs on its own thread so never start a nested parallel check
+    no_parallel = p_array.shape[0] + 1
+    no_stats = np.empty(0, dtype=np.int64)
+    num_checked = 0
+    for li in prange(num_lines):
+        start = offsets[li]
+        end = offsets[li + 1] - 1
+        if end >= start:
+            window = np.empty((1, 2), dtype=np.int64)
+            window[0, 0] = start
+            window[0, 1] = end
+            num_checked += _check_windows_stack(p_array, epsilon, window, p_array_ok, no_parallel, no_stats,
+                                                _no_evaluation_limit_)[0]
+    return num_checked
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:], int64[:]) for pt in _rdp_quick_point_types_],
+           parallel=True)
+def _check_windows_levels(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                          p_array_ok: npt.NDArray[bool], stats: npt.NDArray[np.int64]) -> int:
+    """
+    Test all the windows and keep splitting them until every window passes, one level of windows at a time.
+    Every level is checked in one parallel pass.  The windows are cut into chunks of similar length, so a level
+    with a few large windows and a level with many small windows both keep all the threads busy.
+    The accepted points are the same as check_windows_compiled
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :param stats: the stats buffer to fill in, or an empty array for no stats
+    :return: the number of windows that were checked
+    """
+    record_stats = stats.shape[0] > _stats_levels_start_
+    # the window of an empty input ends before it starts and has no points to accept
+    num_initial = 0
+    for wi in range(windows.shape[0]):
+        num_initial += windows[wi, 1] >= windows[wi, 0]
+    level = np.empty((num_initial, 2), dtype=np.int64)
+    li = 0
+    for wi in range(windows.shape[0]):
+        if windows[wi, 1] >= windows[wi, 0]:
+            level[li, 0] = windows[wi, 0]
+            level[li, 1] = windows[wi, 1]
+            li += 1
+    level_index = 0
+    num_checked = 0
+    while level.shape[0] > 0:
+        num_windows = level.shape[0]
+        num_checked += num_windows
+        if record_stats:
+            for wi in range(num_windows):
+                _record_window_stats(stats, level[wi, 0], level[wi, 1], level_index,
+                                     max(level[wi, 1] - level[wi, 0] - 1, 0))
+        level_index += 1
+
+        # cut the inner points of every window into chunks of about chunk_size points
+        total_points = 0
+        for wi in range(num_windows):
+            total_points += max(level[wi, 1] - level[wi, 0] - 1, 0)
+        chunk_size = max(_level_min_chunk_points_, (total_points + _level_num_chunks_ - 1) // _level_num_chunks_)
+        first_chunk = np.empty(num_windows + 1, dtype=np.int64)
+        first_chunk[0] = 0
+        for wi in range(num_windows):
+            num_inner = max(level[wi, 1] - level[wi, 0] - 1, 0)
+            first_chunk[wi + 1] = first_chunk[wi] + (num_inner + chunk_size - 1) // chunk_size
+        num_chunks = first_chunk[num_windows]
+
+        chunk_window = np.empty(num_chunks, dtype=np.int64)
+        for wi in range(num_windows):
+            # an explicit loop, a slice assignment here would become a parallel launch per window
+            for ci in range(first_chunk[wi], first_chunk[wi + 1]):
+                chunk_window[ci] = wi
+
+        # the fused max and argmax of every chunk, all chunks in parallel
+        chunk_max = np.empty(num_chunks, dtype=np.float64)
+        chunk_arg_max = np.empty(num_chunks, dtype=np.int64)
+        for ci in prange(num_chunks):
+            wi = chunk_window[ci]
+            start = level[wi, 0]
+            end = level[wi, 1]
+            chunk_start = start + 1 + (ci - first_chunk[wi]) * chunk_size
+            chunk_end = min(chunk_start + chunk_size, end)
+            val_max, arg_max = compute_max_distance(p_array[start, :], p_array[end, :],
+                                                    p_array[chunk_start:chunk_end, :])
+            chunk_max[ci] = val_max
+            chunk_arg_max[ci] = chunk_start + arg_max
+
+        # reduce the chunks of each window, the first chunk wins a tie so the argmax is the first maximum
+        split = np.full(num_windows, -1, dtype=np.int64)
+        num_split = 0
+        for wi in range(num_windows):
+            val_max = -1.0
+            arg_max = 0
+            for ci in range(first_chunk[wi], first_chunk[wi + 1]):
+                if chunk_max[ci] > val_max:
+                    val_max = chunk_max[ci]
+                    arg_max = chunk_arg_max[ci]
+            if val_max > epsilon:
+                split[wi] = arg_max
+                num_split += 1
+            else:
+                p_array_ok[level[wi, 0]] = True
+                p_array_ok[level[wi, 1]] = True
+
+        next_level = np.empty((2 * num_split, 2), dtype=np.int64)
+        ni = 0
+        for wi in range(num_windows):
+            if split[wi] >= 0:
+                next_level[ni, 0] = level[wi, 0]
+                next_level[ni, 1] = split[wi]
+                next_level[ni + 1, 0] = split[wi]
+                next_level[ni + 1, 1] = level[wi, 1]
+                ni += 2
+        level = next_level
+    return num_checked
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:]) for pt in _rdp_quick_point_types_])
+def check_windows_levels(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                         p_array_ok: npt.NDArray[bool]) -> int:
+    """
+    Test all the windows and keep splitting them until every window passes, one level of windows at a time (see
+    _check_windows_levels).  The accepted points are the same as check_windows_compiled
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :return: the number of windows that were checked
+    """
+    return _check_windows_levels(p_array, epsilon, windows, p_array_ok, np.empty(0, dtype=np.int64))
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:], int64[:]) for pt in _rdp_quick_point_types_])
+def check_windows_levels_stats(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                               p_array_ok: npt.NDArray[bool], stats: npt.NDArray[np.int64]) -> int:
+    """
+    The same as check_windows_levels while also filling in the stats buffer
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :param stats: the zeroed stats buffer (see _stats_levels_start_)
+    :return: the number of windows that were checked
+    """
+    return _check_windows_levels(p_array, epsilon, windows, p_array_ok, stats)
+
+
+@lazy_njit([float64(pt[:, :], int64, boolean[:]) for pt in _rdp_quick_point_types_])
+def check_windows_target_count(p_array: npt.NDArray, num_target: int, p_array_ok: npt.NDArray[bool]) -> float:
+    """
+    Accept num_target points by always splitting the window with the largest maximum distance next.
+    The windows are held in a heap ordered by their maximum distance
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param num_target: the number of points to accept (at least the two end points are accepted)
+    :param p_array_ok: Which points are accepted, updated in place
+    :return: the largest distance of the points that were not accepted (the implied epsilon), 0 if all are accepted
+    """
+    num_points = p_array.shape[0]
+    if num_points == 0:
+        return 0.0
+    p_array_ok[0] = True
+    p_array_ok[num_points - 1] = True
+    num_ok = 1 if num_points == 1 else 2
+
+    # entries are (-max distance, start, end, index of the max) so the largest distance is popped first
+    heap = [(0.0, 0, 0, 0)]
+    heap.pop()
+    if num_points > 2:
+        val_max, arg_max = compute_max_distance(p_array[0, :], p_array[-1, :], p_array[1:-1, :])
+        heapq.heappush(heap, (-val_max, 0, num_points - 1, arg_max + 1))
+
+    while num_ok < num_target and len(heap) > 0:
+        _, start, end, split = heapq.heappop(heap)
+        p_array_ok[split] = True
+        num_ok += 1
+        for win_start, win_end in ((start, split), (split, end)):
+            if win_end - win_start >= 2:
+                val_max, arg_max = compute_max_distance(p_array[win_start, :], p_array[win_end, :],
+                                                        p_array[win_start + 1:win_end, :])
+                heapq.heappush(heap, (-val_max, win_start, win_end, win_start + 1 + arg_max))
+
+    if len(heap) == 0:
+        return 0.0
+    return -heap[0][0]
+
+
+@lazy_njit([int64(pt[:, :], int64[:, :], float64[:]) for pt in _rdp_quick_point_types_])
+def check_windows_significance(p_array: npt.NDArray, windows: npt.NDArray[np.int64],
+                               significance: npt.NDArray[float]) -> int:
+    """
+    Split all the windows down to two points and record the significance of every point, the largest epsilon at which
+    it would still be accepted.  A point is accepted when its own split and all the splits above it have a maximum
+    distance greater than epsilon, so its significance is the smallest of those maximum distances.
+    The window end points get a significance of infinity
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param significance: the significance of each point, updated in place
+    :return: the number of windows that were split
+    """
+    num_windows = windows.shape[0]
+    stack = np.empty((max(num_windows, 64), 2), dtype=np.int64)
+    stack_significance = np.empty(stack.shape[0], dtype=np.float64)
+    stack_size = 0
+    for wi in range(num_windows - 1, -1, -1):
+        # the window of an empty input ends before it starts and has no points to accept
+        if windows[wi, 1] < windows[wi, 0]:
+            continue
+        significance[windows[wi, 0]] = np.inf
+        significance[windows[wi, 1]] = np.inf
+        stack[stack_size, 0] = windows[wi, 0]
+        stack[stack_size, 1] = windows[wi, 1]
+        stack_significance[stack_size] = np.inf
+        stack_size += 1
+
+    num_split = 0
+    while stack_size > 0:
+        stack_size -= 1
+        start = stack[stack_size, 0]
+        end = stack[stack_size, 1]
+        if end - start < 2:
+            continue
+        num_split += 1
+        val_max, arg_max = compute_max_distance(p_array[start, :], p_array[end, :], p_array[start + 1:end, :])
+        split = start + 1 + arg_max
+        split_significance = min(val_max, stack_significance[stack_size])
+        significance[split] = split_significance
+
+        if stack_size + 2 > stack.shape[0]:
+            new_stack = np.empty((stack.shape[0] * 2, 2), dtype=np.int64)
+            new_stack[:stack_size, :] = stack[:stack_size, :]
+            stack = new_stack
+            new_stack_significance = np.empty(stack.shape[0], dtype=np.float64)
+            new_stack_significance[:stack_size] = stack_significance[:stack_size]
+            stack_significance = new_stack_significance
+        stack[stack_size, 0] = split
+        stack[stack_size, 1] = end
+        stack_significance[stack_size] = split_significance
+        stack[stack_size + 1, 0] = start
+        stack[stack_size + 1, 1] = split
+        stack_significance[stack_size + 1] = split_significance
+        stack_size += 2
+    return num_split
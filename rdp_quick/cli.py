@@ -0,0 +1,35 @@
+import argparse
+import typing
+
+
+def main(argv: typing.Union[typing.List[str], None] = None) -> int:
+    """
+    Simplifies a file and writes the result to another file.  Parquet files are simplified one linestring at a time
+    (see rdp_parquet), .npy and raw binary files are treated as one long polyline read in chunks (see rdp_file)
+    :param argv: the command line arguments, by default sys.argv[1:]
+    :return: the exit code
+    """
+    parser = argparse.ArgumentParser(prog="rdp-quick", description="Ramer-Douglas-Peucker simplification of a file")
+    parser.add_argument("source", help="a .parquet, .npy or raw binary file")
+    parser.add_argument("output", help="the file to write, the same format as the source")
+    parser.add_argument("--epsilon", type=float, required=True, help="the threshold")
+    parser.add_argument("--column", default="geometry", help="the linestring column of a parquet file")
+    parser.add_argument("--points-per-window", type=int, default=1 << 16,
+                        help="the points per window of a .npy or raw binary file")
+    parser.add_argument("--num-columns", type=int, help="the number of columns of a raw binary file")
+    parser.add_argument("--dtype", default="float64", help="the dtype of a raw binary file")
+    parser.add_argument("--return-indices", action="store_true",
+                        help="write the indices of the accepted points of a .npy or raw binary file")
+    args = parser.parse_args(argv)
+
+    if args.source.endswith(".parquet"):
+        from rdp_quick.arrow import rdp_parquet
+        num_rows = rdp_parquet(args.source, args.output, args.epsilon, column=args.column)
+        print("simplified {} linestrings".format(num_rows))
+    else:
+        from rdp_quick.out_of_core import rdp_file
+        num_ok = rdp_file(args.source, args.epsilon, args.points_per_window, args.output,
+                          return_indices=args.return_indices, num_columns=args.num_columns, dtype=args.dtype)
+        print("kept {} points".format(num_ok))
+    return 0
+
@@ -1,81 +1,197 @@
 import numpy as np
 import numpy.typing as npt
-from numba import njit, prange, float64
-from numba.np.extensions import cross2d
+import typing
+from numba import njit, prange, float64, float32, int64, int32, types
+from rdp_quick.jit import lazy_njit
 
-_rdp_quick_use_cache_ = True
+# the point dtypes the kernels are compiled for, distances are always computed and returned as float64
+_rdp_quick_point_types_ = (float64, float32, int64, int32)
 
 
-@njit(float64[:](float64[:], float64[:, :]), parallel=True, cache=_rdp_quick_use_cache_)
-def _compute_distance_single_point(p1: npt.NDArray[float], p_array: npt.NDArray[float]) -> npt.NDArray[float]:
+@lazy_njit([float64[:](float64[:], pt[:, :]) for pt in _rdp_quick_point_types_], parallel=True)
+def _compute_distance_single_point(p1: npt.NDArray[float], p_array: npt.NDArray) -> npt.NDArray[float]:
     """
     compute distance from a single point
     :param p1: the point to compute the distance from (must be of type float64)
-    :param p_array: the points to compute the distance to (must be of type float64 and 2D)
+    :param p_array: the points to compute the distance to (2D, any supported dtype)
     :return: the distances
     """
     num_points = len(p_array)
-    out = np.empty(num_points, dtype=p_array.dtype)
+    out = np.empty(num_points, dtype=np.float64)
     for i in prange(num_points):
         p = p_array[i, :]
         out[i] = np.linalg.norm(p - p1)
     return out
 
 
-@njit(float64[:](float64[:], float64[:, :], float64[:], float64), parallel=True, cache=_rdp_quick_use_cache_)
-def _compute_distance_2d(p1: npt.NDArray[float], p_array: npt.NDArray[float], delta_start_end: npt.NDArray[float],
+@lazy_njit([float64[:](float64[:], pt[:, :], float64[:], float64) for pt in _rdp_quick_point_types_],
+           parallel=True)
+def _compute_distance_2d(p1: npt.NDArray[float], p_array: npt.NDArray, delta_start_end: npt.NDArray[float],
                          norm_delta_start_end: float) -> npt.NDArray[float]:
     """
     Compute the distance to the line with 2d points
     :param p1: the initial point (must be of type float64)
-    :param p_array: the point to compute the distance to (must be of type float64 and 2D)
+    :param p_array: the point to compute the distance to (2D, any supported dtype)
     :param delta_start_end: the vector difference between the start and the end point (must be of type float64)
     :param norm_delta_start_end: the normal of the vector between the start and end point (must be of type float64)
     :return: an array of distances
     """
     num_points = len(p_array)
-    out = np.empty(num_points, dtype=p_array.dtype)
+    out = np.empty(num_points, dtype=np.float64)
     for i in prange(num_points):
-        p = p_array[i, :]
-        out[i] = np.abs(cross2d(delta_start_end, p1 - p)) / norm_delta_start_end
+        # cross2d(delta_start_end, p1 - p) written out so the points are promoted to float64 one value at a time
+        out[i] = np.abs(delta_start_end[0] * (p1[1] - p_array[i, 1]) -
+                        delta_start_end[1] * (p1[0] - p_array[i, 0])) / norm_delta_start_end
     return out
 
 
-@njit(float64[:](float64[:], float64[:, :], float64[:], float64), parallel=True, cache=_rdp_quick_use_cache_)
-def _compute_distance_nd(p1: npt.NDArray[float], p_array: npt.NDArray[float], delta_start_end: npt.NDArray[float],
+@njit(inline="always")
+def _perpendicular_distance_sq(p: npt.NDArray, p1: npt.NDArray, p2: npt.NDArray,
+                               norm_sq_delta_start_end: float) -> float:
+    """
+    Compute the squared distance from a point to the line in any number of dimensions by removing the projection of
+    the point onto the line direction.  Nothing is allocated, the values are promoted to float64 as they are read
+    :param p: the point (1D)
+    :param p1: the start point of the line (1D)
+    :param p2: the end point of the line (1D)
+    :param norm_sq_delta_start_end: the squared norm of the vector between the start and end point
+    :return: the squared distance
+    """
+    num_dims = p.shape[0]
+    dot = 0.0
+    for j in range(num_dims):
+        dot += (np.float64(p[j]) - np.float64(p1[j])) * (np.float64(p2[j]) - np.float64(p1[j]))
+    t = dot / norm_sq_delta_start_end
+    dist_sq = 0.0
+    for j in range(num_dims):
+        diff = (np.float64(p[j]) - np.float64(p1[j])) - t * (np.float64(p2[j]) - np.float64(p1[j]))
+        dist_sq += diff * diff
+    return dist_sq
+
+
+@lazy_njit([float64[:](float64[:], float64[:], pt[:, :], float64) for pt in _rdp_quick_point_types_],
+           parallel=True)
+def _compute_distance_nd(p1: npt.NDArray[float], p2: npt.NDArray[float], p_array: npt.NDArray,
                          norm_delta_start_end: float) -> npt.NDArray[float]:
     """
     Compute the distance to the line with nd points
-    :param p1: the initial point (must be of type float64)
-    :param p_array: the point to compute the distance to (must be of type float64 and 2D)
-    :param delta_start_end: the vector difference between the start and the end point (must be of type float64)
+    :param p1: the start point (must be of type float64)
+    :param p2: the end point (must be of type float64)
+    :param p_array: the point to compute the distance to (2D, any supported dtype)
     :param norm_delta_start_end: the normal of the vector between the start and end point (must be of type float64)
     :return: an array of distances
     """
     num_points = len(p_array)
-    out = np.empty(num_points, dtype=p_array.dtype)
+    norm_sq_delta_start_end = norm_delta_start_end * norm_delta_start_end
+    out = np.empty(num_points, dtype=np.float64)
     for i in prange(num_points):
-        p = p_array[i, :]
-        out[i] = np.abs(np.linalg.norm(np.cross(delta_start_end, p1 - p))) / norm_delta_start_end
+        out[i] = np.sqrt(_perpendicular_distance_sq(p_array[i, :], p1, p2, norm_sq_delta_start_end))
     return out
 
 
-@njit(float64[:](float64[:], float64[:], float64[:, :]), parallel=True, cache=_rdp_quick_use_cache_)
-def compute_distance(p1: npt.NDArray[float], p2: npt.NDArray[float], p_array: npt.NDArray[float]) -> npt.NDArray[float]:
+@lazy_njit([float64[:](pt[:], pt[:], pt[:, :]) for pt in _rdp_quick_point_types_], parallel=True)
+def compute_distance(p1: npt.NDArray, p2: npt.NDArray, p_array: npt.NDArray) -> npt.NDArray[float]:
     """
     Compute the distances to the points from a line made from p1 and p1
-    :param p1: The start point (must be of type float64)
-    :param p2: The end point (must be of type float64)
-    :param p_array: The points to compute the distance to (must be of type float64 and 2D)
-    :return: an array of distances
+    :param p1: The start point (same dtype as p_array)
+    :param p2: The end point (same dtype as p_array)
+    :param p_array: The points to compute the distance to (2D, float64, float32, int64 or int32)
+    :return: an array of distances (float64)
     """
-    p1_equal_p2 = np.all(np.equal(p1, p2))
+    p1_64 = p1.astype(np.float64)
+    p2_64 = p2.astype(np.float64)
+    p1_equal_p2 = np.all(np.equal(p1_64, p2_64))
     if p1_equal_p2:
-        return _compute_distance_single_point(p1, p_array)
+        return _compute_distance_single_point(p1_64, p_array)
     else:
-        delta_start_end = p2 - p1
+        delta_start_end = p2_64 - p1_64
         norm_delta_start_end = np.linalg.norm(delta_start_end)
         if p_array.shape[1] == 2:
-            return _compute_distance_2d(p1, p_array, delta_start_end, norm_delta_start_end)
+            return _compute_distance_2d(p1_64, p_array, delta_start_end, norm_delta_start_end)
         else:
-            return _compute_distance_nd(p1, p_array, delta_start_end, norm_delta_start_end)
+            return _compute_distance_nd(p1_64, p2_64, p_array, norm_delta_start_end)
+
+
+@lazy_njit([types.Tuple((float64, int64))(pt[:], pt[:], pt[:, :]) for pt in _rdp_quick_point_types_])
+def compute_max_distance(p1: npt.NDArray, p2: npt.NDArray, p_array: npt.NDArray) -> typing.Tuple[float, int]:
+    """
+    Compute the maximum distance to the points from a line made from p1 and p2 without storing every distance.
+    This runs serially so it is cheap to call many times on small windows from inside other compiled functions.
+
+    Nothing is allocated.  The points are compared with the cross product, its square or the squared distance (when
+    p1 equals p2 or with more than 3 dimensions) so the only square roots and division are done once for the maximum.
+    The maximum is the same as np.max(compute_distance(...)) except where np.linalg.norm (BLAS) and the square root
+    of the sum of squares round differently, which can not happen while the sums are exact (integer coordinates)
+    :param p1: The start point (same dtype as p_array)
+    :param p2: The end point (same dtype as p_array)
+    :param p_array: The points to compute the distance to (2D, float64, float32, int64 or int32)
+    :return: the maximum distance (-1 if there are no points), the index of the first point with the maximum distance
+    """
+    num_points = p_array.shape[0]
+    num_dims = p_array.shape[1]
+    p1_equal_p2 = True
+    for j in range(num_dims):
+        if p1[j] != p2[j]:
+            p1_equal_p2 = False
+
+    val_max = -1.0
+    arg_max = 0
+    if p1_equal_p2:
+        for i in range(num_points):
+            dist_sq = 0.0
+            for j in range(num_dims):
+                diff = np.float64(p_array[i, j]) - np.float64(p1[j])
+                dist_sq += diff * diff
+            if dist_sq > val_max:
+                val_max = dist_sq
+                arg_max = i
+        return (np.sqrt(val_max) if num_points > 0 else -1.0), arg_max
+
+    if num_dims == 2:
+        p1_x = np.float64(p1[0])
+        p1_y = np.float64(p1[1])
+        delta_x = np.float64(p2[0]) - p1_x
+        delta_y = np.float64(p2[1]) - p1_y
+        for i in range(num_points):
+            cross = np.abs(delta_x * (p1_y - p_array[i, 1]) - delta_y * (p1_x - p_array[i, 0]))
+            if cross > val_max:
+                val_max = cross
+                arg_max = i
+        if num_points == 0:
+            return -1.0, arg_max
+        return val_max / np.sqrt(delta_x * delta_x + delta_y * delta_y), arg_max
+
+    if num_dims == 3:
+        p1_x = np.float64(p1[0])
+        p1_y = np.float64(p1[1])
+        p1_z = np.float64(p1[2])
+        delta_x = np.float64(p2[0]) - p1_x
+        delta_y = np.float64(p2[1]) - p1_y
+        delta_z = np.float64(p2[2]) - p1_z
+        for i in range(num_points):
+            diff_x = p1_x - p_array[i, 0]
+            diff_y = p1_y - p_array[i, 1]
+            diff_z = p1_z - p_array[i, 2]
+            cross_x = delta_y * diff_z - delta_z * diff_y
+            cross_y = delta_z * diff_x - delta_x * diff_z
+            cross_z = delta_x * diff_y - delta_y * diff_x
+            cross_sq = cross_x * cross_x + cross_y * cross_y + cross_z * cross_z
+            if cross_sq > val_max:
+                val_max = cross_sq
+                arg_max = i
+        if num_points == 0:
+            return -1.0, arg_max
+        # the two square roots are taken separately, as norm(cross) / norm(delta) in compute_distance, which rounds
+        # differently from sqrt(val_max / norm_sq) and keeps the kept points of integer coordinates the same
+        return np.sqrt(val_max) / np.sqrt(delta_x * delta_x + delta_y * delta_y + delta_z * delta_z), arg_max
+
+    norm_sq_delta_start_end = 0.0
+    for j in range(num_dims):
+        delta = np.float64(p2[j]) - np.float64(p1[j])
+        norm_sq_delta_start_end += delta * delta
+    for i in range(num_points):
+        dist_sq = _perpendicular_distance_sq(p_array[i, :], p1, p2, norm_sq_delta_start_end)
+        if dist_sq > val_max:
+            val_max = dist_sq
+            arg_max = i
+    return (np.sqrt(val_max) if num_points > 0 else -1.0), arg_max
@@ -1,7 +1,83 @@
 import numpy as np
 import numpy.typing as npt
+import numbers
 import typing
-from scipy.signal import find_peaks
+from numba import njit, float64, int64, uint8, void
+from rdp_quick.jit import lazy_njit
+
+# the find_peaks options handled by the compiled peak finding, any other option falls back to scipy
+_compiled_peak_find_nargs_ = ("height", "distance", "prominence")
+
+
+@njit(inline="always", error_model="numpy")
+def _gradient(f: npt.NDArray[float], i: int, last: int) -> float:
+    """
+    The value of numpy.gradient(f) (unit spacing, first order edges) at index i
+    :param f: the values (at least 2)
+    :param i: the index
+    :param last: the last index of f
+    :return: the gradient at i
+    """
+    if i == 0:
+        return (f[1] - f[0]) / 1.0
+    if i == last:
+        return (f[i] - f[i - 1]) / 1.0
+    return (f[i + 1] - f[i - 1]) / 2.0
+
+
+@lazy_njit(void(float64[:], float64[:], float64[:], float64[:]), error_model="numpy")
+def _curvature_terms(x: npt.NDArray[float], y: npt.NDArray[float], numerator: npt.NDArray[float],
+                     base: npt.NDArray[float]):
+    """
+    Fills in both parts of the curvature in one pass, the gradients of x and y are kept for the previous, current and
+    next point so each is computed once and the second gradients come from them
+    :param x: the x-axis points (at least 3)
+    :param y: the y-axis points
+    :param numerator: filled with abs(diff_diff_x * diff_y - diff_x * diff_diff_y)
+    :param base: filled with diff_x * diff_x + diff_y * diff_y
+    """
+    last = x.shape[0] - 1
+    diff_x_prev = 0.0
+    diff_y_prev = 0.0
+    diff_x = _gradient(x, 0, last)
+    diff_y = _gradient(y, 0, last)
+    for i in range(last + 1):
+        diff_x_next = _gradient(x, min(i + 1, last), last)
+        diff_y_next = _gradient(y, min(i + 1, last), last)
+        # numpy.gradient of the gradient, first order at the edges
+        if i == 0:
+            diff_diff_x = (diff_x_next - diff_x) / 1.0
+            diff_diff_y = (diff_y_next - diff_y) / 1.0
+        elif i == last:
+            diff_diff_x = (diff_x - diff_x_prev) / 1.0
+            diff_diff_y = (diff_y - diff_y_prev) / 1.0
+        else:
+            diff_diff_x = (diff_x_next - diff_x_prev) / 2.0
+            diff_diff_y = (diff_y_next - diff_y_prev) / 2.0
+        numerator[i] = np.abs(diff_diff_x * diff_y - diff_x * diff_diff_y)
+        base[i] = diff_x * diff_x + diff_y * diff_y
+        diff_x_prev = diff_x
+        diff_y_prev = diff_y
+        diff_x = diff_x_next
+        diff_y = diff_y_next
+
+
+def _compute_curvature_2d_fused(x: npt.NDArray[float], y: npt.NDArray[float]) -> npt.NDArray[float]:
+    """
+    Computes the same curvature as compute_curvature_2d with the default gradient, without the gradient arrays
+    :param x: the x-axis points (1D float64 array with at least 3 points)
+    :param y: the y-axis points (1D float64 array with at least 3 points)
+    :return: the curvature for each point
+    """
+    curvature = np.empty(x.shape[0], dtype=np.float64)
+    denominator = np.empty(x.shape[0], dtype=np.float64)
+    _curvature_terms(x, y, curvature, denominator)
+    # numpy's power is used (in place) so the result is identical to the numpy implementation, on CPUs with AVX-512
+    # it is vectorised and rounds differently from the pow numba compiles
+    with np.errstate(all="ignore"):
+        np.power(denominator, 1.5, out=denominator)
+        np.divide(curvature, denominator, out=curvature)
+    return curvature
 
 
 def compute_curvature_2d(x: npt.NDArray[float], y: npt.NDArray[float], gradient_nargs: typing.Union[dict, None] = None) -> npt.NDArray[float]:
@@ -12,6 +88,9 @@ def compute_curvature_2d(x: npt.NDArray[float], y: npt.NDArray[float], gradient_
     :param gradient_nargs: any named arguments to pass to the gradient function
     :return: the curvature for each point
     """
+    if not gradient_nargs and x.dtype == np.float64 and y.dtype == np.float64 and len(x) >= 3 and len(x) == len(y) \
+            and x.ndim == 1 and y.ndim == 1:
+        return _compute_curvature_2d_fused(x, y)
     gradient_nargs = gradient_nargs if gradient_nargs is not None else dict()
     diff_x = np.gradient(x, **gradient_nargs)
     diff_y = np.gradient(y, **gradient_nargs)
@@ -21,6 +100,188 @@ def compute_curvature_2d(x: npt.NDArray[float], y: npt.NDArray[float], gradient_
     return curvature
 
 
+@lazy_njit(int64[:](float64[:]))
+def _local_maxima_1d(x: npt.NDArray[float]) -> npt.NDArray[np.int64]:
+    """
+    Finds the local maxima in the same way as scipy.signal.find_peaks, the middle of a flat peak is used
+    :param x: the values
+    :return: the indices of the local maxima
+    """
+    midpoints = np.empty(x.shape[0] // 2, dtype=np.int64)
+    num_peaks = 0
+    i = 1
+    i_max = x.shape[0] - 1
+    while i < i_max:
+        if x[i - 1] < x[i]:
+            i_ahead = i + 1
+            while i_ahead < i_max and x[i_ahead] == x[i]:
+                i_ahead += 1
+            if x[i_ahead] < x[i]:
+                midpoints[num_peaks] = (i + i_ahead - 1) // 2
+                num_peaks += 1
+                i = i_ahead
+        i += 1
+    return midpoints[:num_peaks].copy()
+
+
+@lazy_njit(uint8[:](int64[:], int64[:], float64))
+def _select_by_peak_distance(peaks: npt.NDArray[np.int64], priority_to_position: npt.NDArray[np.int64],
+                             distance: float) -> npt.NDArray[np.uint8]:
+    """
+    Removes the lower peaks that are closer than distance to a higher peak, as scipy.signal.find_peaks does
+    :param peaks: the peak indices
+    :param priority_to_position: numpy.argsort of the peak heights
+    :param distance: the minimum distance between peaks
+    :return: 1 for the peaks to keep
+    """
+    num_peaks = peaks.shape[0]
+    distance_ = np.ceil(distance)
+    keep = np.ones(num_peaks, dtype=np.uint8)
+    for i in range(num_peaks - 1, -1, -1):
+        j = priority_to_position[i]
+        if keep[j] == 0:
+            continue
+        k = j - 1
+        while 0 <= k and peaks[j] - peaks[k] < distance_:
+            keep[k] = 0
+            k -= 1
+        k = j + 1
+        while k < num_peaks and peaks[k] - peaks[j] < distance_:
+            keep[k] = 0
+            k += 1
+    return keep
+
+
+@lazy_njit(float64[:](float64[:], int64[:]))
+def _peak_prominences(x: npt.NDArray[float], peaks: npt.NDArray[np.int64]) -> npt.NDArray[float]:
+    """
+    Computes the prominence of each peak as scipy.signal.peak_prominences does (without a window length)
+    :param x: the values
+    :param peaks: the peak indices
+    :return: the prominence of each peak
+    """
+    prominences = np.empty(peaks.shape[0], dtype=np.float64)
+    for peak_nr in range(peaks.shape[0]):
+        peak = peaks[peak_nr]
+        i = peak
+        left_min = x[peak]
+        while 0 <= i and x[i] <= x[peak]:
+            if x[i] < left_min:
+                left_min = x[i]
+            i -= 1
+        i = peak
+        right_min = x[peak]
+        while i <= x.shape[0] - 1 and x[i] <= x[peak]:
+            if x[i] < right_min:
+                right_min = x[i]
+            i += 1
+        prominences[peak_nr] = x[peak] - max(left_min, right_min)
+    return prominences
+
+
+def _unpack_interval(interval: typing.Any) -> typing.Union[typing.Tuple[typing.Any, typing.Any], None]:
+    """
+    :param interval: a find_peaks condition, a number or a (min, max) tuple of numbers or None
+    :return: the (min, max) of the condition, None if it is not supported by the compiled peak finding
+    """
+    if isinstance(interval, numbers.Number):
+        return interval, None
+    if isinstance(interval, tuple) and len(interval) == 2 and \
+            all(v is None or isinstance(v, numbers.Number) for v in interval):
+        return interval
+    return None
+
+
+def _select_by_interval(values: npt.NDArray[float],
+                        interval: typing.Tuple[typing.Any, typing.Any]) -> npt.NDArray[bool]:
+    """
+    :param values: the peak property
+    :param interval: the (min, max) of the property, either can be None
+    :return: the peaks to keep
+    """
+    keep = np.ones(values.shape[0], dtype=bool)
+    if interval[0] is not None:
+        keep &= interval[0] <= values
+    if interval[1] is not None:
+        keep &= values <= interval[1]
+    return keep
+
+
+def _find_peaks_fused(curvature: npt.NDArray[float],
+                      peak_find_nargs: dict) -> typing.Union[npt.NDArray[np.int64], None]:
+    """
+    Finds the same peaks as scipy.signal.find_peaks for the height, distance and prominence options
+    :param curvature: the curvature
+    :param peak_find_nargs: the find_peaks options
+    :return: the peaks, None if the options are not supported
+    """
+    if any(key not in _compiled_peak_find_nargs_ for key in peak_find_nargs):
+        return None
+    height = peak_find_nargs.get("height")
+    distance = peak_find_nargs.get("distance")
+    prominence = peak_find_nargs.get("prominence")
+    height_interval = None if height is None else _unpack_interval(height)
+    prominence_interval = None if prominence is None else _unpack_interval(prominence)
+    if (height is not None and height_interval is None) or (prominence is not None and prominence_interval is None) \
+            or (distance is not None and not (isinstance(distance, numbers.Number) and distance >= 1)):
+        return None
+
+    peaks = _local_maxima_1d(curvature)
+    if height_interval is not None:
+        peaks = peaks[_select_by_interval(curvature[peaks], height_interval)]
+    if distance is not None:
+        # numpy's argsort is used so peaks of equal height are ordered the same as in scipy
+        priority_to_position = np.argsort(curvature[peaks]).astype(np.int64)
+        peaks = peaks[_select_by_peak_distance(peaks, priority_to_position, float(distance)).view(bool)]
+    if prominence_interval is not None:
+        peaks = peaks[_select_by_interval(_peak_prominences(curvature, peaks), prominence_interval)]
+    return peaks
+
+
+@lazy_njit(int64[:, :](int64[:], int64))
+def _peaks_to_windows(peaks: npt.NDArray[np.int64], num_points: int) -> npt.NDArray[np.int64]:
+    """
+    Builds the windows between the first point, the peaks and the last point
+    :param peaks: the peak indices
+    :param num_points: the total number of points
+    :return: the windows as an (num_windows, 2) int64 array
+    """
+    windows = np.empty((peaks.shape[0] + 1, 2), dtype=np.int64)
+    start = 0
+    for pi in range(peaks.shape[0]):
+        windows[pi, 0] = start
+        windows[pi, 1] = peaks[pi]
+        start = peaks[pi]
+    windows[peaks.shape[0], 0] = start
+    windows[peaks.shape[0], 1] = num_points - 1
+    return windows
+
+
+def compute_curvature_windows(x: npt.NDArray[float], y: npt.NDArray[float],
+                              gradient_nargs: typing.Union[dict, None] = None,
+                              peak_find_nargs: typing.Union[dict, None] = None) -> npt.NDArray[np.int64]:
+    """
+    Computes the curvature and then finds the peaks which are then used to determine the initial windows.
+    With the default gradient and the height, distance and prominence peak options this is done in compiled code
+    with the same result as scipy.signal.find_peaks, other options use numpy.gradient and scipy.signal.find_peaks
+    :param x: the x-axis points (1D array)
+    :param y: the y-axis points (1D array)
+    :param gradient_nargs: any named arguments to pass to the numpy.gradient function
+    :param peak_find_nargs: any named arguments to pass to the scipy.signal.find_peaks function
+    :return: the initial windows as an (num_windows, 2) int64 array
+    """
+    peak_find_nargs = peak_find_nargs if peak_find_nargs is not None else dict()
+    curvature = compute_curvature_2d(x, y, gradient_nargs=gradient_nargs)
+    peaks = None
+    if curvature.dtype == np.float64 and curvature.ndim == 1:
+        peaks = _find_peaks_fused(curvature, peak_find_nargs)
+    if peaks is None:
+        # scipy is only imported when it is needed
+        from scipy.signal import find_peaks
+        peaks = find_peaks(curvature, **peak_find_nargs)[0]
+    return _peaks_to_windows(np.asarray(peaks, dtype=np.int64), len(curvature))
+
+
 def compute_curvature_and_build_windows(x: npt.NDArray[float], y: npt.NDArray[float],
                                         gradient_nargs: typing.Union[dict, None] = None,
                                         peak_find_nargs: typing.Union[dict, None] = None) -> typing.List[typing.Tuple[int, int]]:
@@ -32,12 +293,5 @@ def compute_curvature_and_build_windows(x: npt.NDArray[float], y: npt.NDArray[fl
     :param peak_find_nargs: any named arguments to pass to the scipy.signal.find_peaks function
     :return: the initial windows
     """
-    peak_find_nargs = peak_find_nargs if peak_find_nargs is not None else dict()
-    curvature = compute_curvature_2d(x, y, gradient_nargs=gradient_nargs)
-    peaks = np.array(find_peaks(curvature, **peak_find_nargs)[0])
-    points = np.append(0, peaks)
-    points = np.append(points, len(curvature) - 1)
-    windows = list()
-    for pi, p_val in enumerate(points[0:-1]):
-        windows.append((p_val, points[pi + 1]))
-    return windows
+    windows = compute_curvature_windows(x, y, gradient_nargs=gradient_nargs, peak_find_nargs=peak_find_nargs)
+    return [(start, end) for start, end in windows.tolist()]
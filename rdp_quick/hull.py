@@ -0,0 +1,495 @@
+import numpy as np
+import numpy.typing as npt
+import typing
+from numba import njit, float64, int32, int64, boolean, types
+from rdp_quick.check_window import _check_windows_stack, _record_window_stats, _parallel_window_min_points_, \
+    _no_evaluation_limit_, _stats_num_hull_windows_, _stats_levels_start_
+from rdp_quick.compute_distance import compute_max_distance, _rdp_quick_point_types_
+from rdp_quick.jit import lazy_njit
+
+# the points in each leaf of the hull tree, parts of windows smaller than a leaf are checked point by point
+_hull_leaf_points_ = 32
+# the hull tree stops adding levels once its chains hold more than this many indices per point, windows then use the
+# nodes of the top level kept one by one (a spiral needs about 5, points in convex position about 1 per level)
+_hull_max_chain_points_ = 8
+# windows with fewer inner points than this are checked point by point
+_hull_min_window_points_ = 4 * _hull_leaf_points_
+# check_windows_auto switches to the hull tree once the windows checked point by point have cost more than this many
+# distance evaluations per point per level of a balanced split (n log2 n).  Building the tree costs about as much as
+# 5 to 12 of them, so an input that needs the tree wastes at most about twice that before switching, and smooth inputs
+# (which need up to about 6) never pay for the tree
+_hull_switch_factor_ = 16
+
+
+@njit(inline="always")
+def _point_less(p_array: npt.NDArray, a: int, b: int) -> bool:
+    """
+    :return: if point a comes before point b when sorted by x, then y, then index
+    """
+    ax = np.float64(p_array[a, 0])
+    bx = np.float64(p_array[b, 0])
+    if ax != bx:
+        return ax < bx
+    ay = np.float64(p_array[a, 1])
+    by = np.float64(p_array[b, 1])
+    if ay != by:
+        return ay < by
+    return a < b
+
+
+@njit(inline="always")
+def _turn(p_array: npt.NDArray, o: int, a: int, b: int) -> float:
+    """
+    :return: the cross product of (a - o) and (b - o), positive for a counter clockwise turn
+    """
+    ox = np.float64(p_array[o, 0])
+    oy = np.float64(p_array[o, 1])
+    return ((np.float64(p_array[a, 0]) - ox) * (np.float64(p_array[b, 1]) - oy) -
+            (np.float64(p_array[a, 1]) - oy) * (np.float64(p_array[b, 0]) - ox))
+
+
+@njit(inline="always")
+def _build_chains(p_array: npt.NDArray, sorted_points: npt.NDArray[np.int32], num_sorted: int,
+                  upper: npt.NDArray[np.int32], lower: npt.NDArray[np.int32]) -> typing.Tuple[int, int]:
+    """
+    Builds the upper and lower convex hull chains (Andrew's monotone chain).  Collinear points are kept so every
+    point on an edge of the hull is in a chain, of points at the same position only the lowest index is kept
+    :param p_array: the data points (2D)
+    :param sorted_points: the indices of the points sorted with _point_less
+    :param num_sorted: the number of sorted points
+    :param upper: written with the upper chain from left to right
+    :param lower: written with the lower chain from left to right
+    :return: the number of points in the upper and lower chains
+    """
+    num_upper = 0
+    num_lower = 0
+    for k in range(num_sorted):
+        i = sorted_points[k]
+        if k > 0 and p_array[i, 0] == p_array[sorted_points[k - 1], 0] and \
+                p_array[i, 1] == p_array[sorted_points[k - 1], 1]:
+            continue
+        while num_upper >= 2 and _turn(p_array, upper[num_upper - 2], upper[num_upper - 1], i) > 0.0:
+            num_upper -= 1
+        upper[num_upper] = i
+        num_upper += 1
+        while num_lower >= 2 and _turn(p_array, lower[num_lower - 2], lower[num_lower - 1], i) < 0.0:
+            num_lower -= 1
+        lower[num_lower] = i
+        num_lower += 1
+    return num_upper, num_lower
+
+
+@njit(inline="always")
+def _merge_sorted(p_array: npt.NDArray, a: npt.NDArray[np.int32], num_a: int, b: npt.NDArray[np.int32], num_b: int,
+                  out: npt.NDArray[np.int32]) -> int:
+    """
+    Merges two lists of point indices sorted with _point_less, an index in both lists is written once
+    :return: the number of indices written to out
+    """
+    ia = 0
+    ib = 0
+    num_out = 0
+    while ia < num_a or ib < num_b:
+        if ib >= num_b or (ia < num_a and _point_less(p_array, a[ia], b[ib])):
+            i = a[ia]
+            ia += 1
+        else:
+            i = b[ib]
+            ib += 1
+        if num_out == 0 or out[num_out - 1] != i:
+            out[num_out] = i
+            num_out += 1
+    return num_out
+
+
+@njit(inline="always")
+def _reserve_chains(chains: npt.NDArray[np.int32], num_chains: int, num_needed: int,
+                    max_size: int) -> npt.NDArray[np.int32]:
+    """
+    :param chains: the chain buffer
+    :param num_chains: the number of indices written to it
+    :param num_needed: the number of indices about to be written
+    :param max_size: do not grow the buffer past this size unless num_needed does not fit
+    :return: the chain buffer, or a copy twice as large (or more) when it is too small
+    """
+    if num_chains + num_needed <= chains.shape[0]:
+        return chains
+    grown = np.empty(max(min(2 * chains.shape[0], max_size), num_chains + num_needed), dtype=np.int32)
+    grown[:num_chains] = chains[:num_chains]
+    return grown
+
+
+@lazy_njit([types.Tuple((int32[:], int64[:], int32[:], int32[:], int64[:]))(pt[:, :])
+            for pt in _rdp_quick_point_types_])
+def build_hull_tree(p_array: npt.NDArray) -> typing.Tuple[npt.NDArray[np.int32], npt.NDArray[np.int64],
+                                                          npt.NDArray[np.int32], npt.NDArray[np.int32],
+                                                          npt.NDArray[np.int64]]:
+    """
+    Builds a tree of convex hulls over the points in their path order.  Leaf j holds the points
+    j * _hull_leaf_points_ to (j + 1) * _hull_leaf_points_ - 1 and each level up a node holds the points of two nodes.
+    The hull of a node is built from the hulls of its two children so each level costs O(n) and the tree O(n log n).
+
+    The chains are stored one after another in one buffer sized by their real lengths.  Levels are added until the
+    chains hold _hull_max_chain_points_ indices per point, so the memory is O(n) even when most points are on the
+    hulls (points in convex position).  A spiral needs about 5 indices per point and keeps every level
+    :param p_array: the data points (2D with 2 columns, float64, float32, int64 or int32)
+    :return: the chain buffer, the position in it of the upper chain of every node (the lower chain follows it), the
+             number of points in the upper and lower chain of every node, and the first node of every level kept (the
+             nodes of a level are in path order, with one more entry for the end)
+    """
+    num_points = p_array.shape[0]
+    num_leaves = max((num_points + _hull_leaf_points_ - 1) // _hull_leaf_points_, 1)
+    num_levels = 1
+    while (num_leaves + (1 << (num_levels - 1)) - 1) >> (num_levels - 1) > 1:
+        num_levels += 1
+    level_start = np.zeros(num_levels + 1, dtype=np.int64)
+    for level in range(num_levels):
+        node_points = _hull_leaf_points_ << level
+        level_start[level + 1] = level_start[level] + max((num_points + node_points - 1) // node_points, 1)
+    num_nodes = level_start[num_levels]
+    chain_start = np.zeros(num_nodes, dtype=np.int64)
+    num_upper = np.zeros(num_nodes, dtype=np.int32)
+    num_lower = np.zeros(num_nodes, dtype=np.int32)
+    max_chains = _hull_max_chain_points_ * num_points
+    # the leaves hold every point in at least one chain, the levels above usually much fewer
+    chains = np.empty(max(2 * num_points, 16), dtype=np.int32)
+    num_chains = 0
+    lower = np.empty(max(num_points, 1), dtype=np.int32)
+    merged_a = np.empty(num_points, dtype=np.int32)
+    merged_b = np.empty(num_points, dtype=np.int32)
+    merged = np.empty(num_points, dtype=np.int32)
+
+    for leaf in range(num_leaves):
+        start = leaf * _hull_leaf_points_
+        end = min(start + _hull_leaf_points_, num_points)
+        # insertion sort of the few points in the leaf
+        for k in range(end - start):
+            i = start + k
+            m = k
+            while m > 0 and _point_less(p_array, i, merged[m - 1]):
+                merged[m] = merged[m - 1]
+                m -= 1
+            merged[m] = i
+        chains = _reserve_chains(chains, num_chains, 2 * (end - start), max_chains + 2 * num_points)
+        nu, nl = _build_chains(p_array, merged, end - start, chains[num_chains:], lower)
+        chains[num_chains + nu:num_chains + nu + nl] = lower[:nl]
+        chain_start[leaf] = num_chains
+        num_upper[leaf] = nu
+        num_lower[leaf] = nl
+        num_chains += nu + nl
+
+    num_levels_kept = num_levels
+    for level in range(1, num_levels):
+        node_points = _hull_leaf_points_ << level
+        child_points = node_points >> 1
+        level_chains = num_chains
+        for node in range(level_start[level + 1] - level_start[level]):
+            a = level_start[level - 1] + 2 * node
+            b = a + 1
+            num = _merge_sorted(p_array, chains[chain_start[a]:], num_upper[a],
+                                chains[chain_start[a] + num_upper[a]:], num_lower[a], merged_a)
+            if node * node_points + child_points < num_points:
+                num_b = _merge_sorted(p_array, chains[chain_start[b]:], num_upper[b],
+                                      chains[chain_start[b] + num_upper[b]:], num_lower[b], merged_b)
+                num = _merge_sorted(p_array, merged_a, num, merged_b, num_b, merged)
+            else:
+                merged[:num] = merged_a[:num]
+            chains = _reserve_chains(chains, num_chains, 2 * num, max_chains + 2 * num_points)
+            nu, nl = _build_chains(p_array, merged, num, chains[num_chains:], lower)
+            chains[num_chains + nu:num_chains + nu + nl] = lower[:nl]
+            node_id = level_start[level] + node
+            chain_start[node_id] = num_chains
+            num_upper[node_id] = nu
+            num_lower[node_id] = nl
+            num_chains += nu + nl
+            if num_chains > max_chains:
+                break
+        if num_chains > max_chains:
+            # drop the level, the windows use the nodes of the level below instead
+            num_chains = level_chains
+            num_levels_kept = level
+            break
+    num_nodes = level_start[num_levels_kept]
+    return chains[:num_chains], chain_start[:num_nodes], num_upper[:num_nodes], num_lower[:num_nodes], \
+        level_start[:num_levels_kept + 1]
+
+
+@njit(inline="always")
+def _signed_cross(p_array: npt.NDArray, i: int, p1_x: float, p1_y: float, delta_x: float, delta_y: float) -> float:
+    """
+    :return: the cross product compute_max_distance takes the absolute value of for point i
+    """
+    return delta_x * (p1_y - p_array[i, 1]) - delta_y * (p1_x - p_array[i, 0])
+
+
+@njit(inline="always")
+def _chain_extreme(p_array: npt.NDArray, chain: npt.NDArray[np.int32], num_chain: int, p1_x: float, p1_y: float,
+                   delta_x: float, delta_y: float, sign: float) -> typing.Tuple[float, int]:
+    """
+    Finds the point of a chain furthest on one side of the line.  The signed cross product rises and then falls
+    along the chain so the largest is found with a binary search, then the lowest index with the same value
+    :return: the absolute cross product and the index of the point
+    """
+    lo = 0
+    hi = num_chain - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if sign * _signed_cross(p_array, chain[mid + 1], p1_x, p1_y, delta_x, delta_y) > \
+                sign * _signed_cross(p_array, chain[mid], p1_x, p1_y, delta_x, delta_y):
+            lo = mid + 1
+        else:
+            hi = mid
+    best = sign * _signed_cross(p_array, chain[lo], p1_x, p1_y, delta_x, delta_y)
+    best_index = chain[lo]
+    k = lo + 1
+    while k < num_chain and sign * _signed_cross(p_array, chain[k], p1_x, p1_y, delta_x, delta_y) == best:
+        best_index = min(best_index, chain[k])
+        k += 1
+    i = best_index
+    return np.abs(_signed_cross(p_array, i, p1_x, p1_y, delta_x, delta_y)), i
+
+
+@njit(inline="always")
+def _scan_extreme(p_array: npt.NDArray, start: int, end: int, p1_x: float, p1_y: float, delta_x: float,
+                  delta_y: float, val_max: float, arg_max: int) -> typing.Tuple[float, int]:
+    """
+    Checks the points start to end - 1 one by one, a point replaces the current maximum if it is larger or equal
+    with a lower index
+    :return: the new maximum absolute cross product and its index
+    """
+    for i in range(start, end):
+        cross = np.abs(_signed_cross(p_array, i, p1_x, p1_y, delta_x, delta_y))
+        if cross > val_max or (cross == val_max and i < arg_max):
+            val_max = cross
+            arg_max = i
+    return val_max, arg_max
+
+
+@njit(inline="always")
+def _node_extreme(p_array: npt.NDArray, chains: npt.NDArray[np.int32], chain_start: npt.NDArray[np.int64],
+                  num_upper: npt.NDArray[np.int32], num_lower: npt.NDArray[np.int32], node_id: int,
+                  p1_x: float, p1_y: float, delta_x: float, delta_y: float, val_max: float,
+                  arg_max: int) -> typing.Tuple[float, int]:
+    """
+    Checks the points furthest on each side of the line of one node of the hull tree
+    :return: the new maximum absolute cross product and its index
+    """
+    upper = chains[chain_start[node_id]:]
+    lower = chains[chain_start[node_id] + num_upper[node_id]:]
+    # the signed cross product is the dot product of the points with (delta_y, -delta_x) so the largest is on the
+    # upper chain when that direction points up (or left when it is horizontal) and the smallest on the lower chain
+    positive_on_upper = -delta_x > 0.0 or (delta_x == 0.0 and delta_y < 0.0)
+    if positive_on_upper:
+        cross_a, i_a = _chain_extreme(p_array, upper, num_upper[node_id], p1_x, p1_y, delta_x, delta_y, 1.0)
+        cross_b, i_b = _chain_extreme(p_array, lower, num_lower[node_id], p1_x, p1_y, delta_x, delta_y, -1.0)
+    else:
+        cross_a, i_a = _chain_extreme(p_array, lower, num_lower[node_id], p1_x, p1_y, delta_x, delta_y, 1.0)
+        cross_b, i_b = _chain_extreme(p_array, upper, num_upper[node_id], p1_x, p1_y, delta_x, delta_y, -1.0)
+    if cross_a > val_max or (cross_a == val_max and i_a < arg_max):
+        val_max = cross_a
+        arg_max = i_a
+    if cross_b > val_max or (cross_b == val_max and i_b < arg_max):
+        val_max = cross_b
+        arg_max = i_b
+    return val_max, arg_max
+
+
+@njit(inline="always")
+def _hull_max_distance(p_array: npt.NDArray, chains: npt.NDArray[np.int32], chain_start: npt.NDArray[np.int64],
+                       num_upper: npt.NDArray[np.int32], num_lower: npt.NDArray[np.int32],
+                       level_start: npt.NDArray[np.int64], start: int, end: int) -> typing.Tuple[float, int]:
+    """
+    The same as compute_max_distance(p_array[start], p_array[end], p_array[start + 1:end]) for a window with
+    different end points, using the hull tree for the whole leaves inside the window and checking the points of the
+    partly covered leaves one by one
+    :return: the maximum distance and the index of the first point with the maximum distance (relative to start + 1)
+    """
+    p1_x = np.float64(p_array[start, 0])
+    p1_y = np.float64(p_array[start, 1])
+    delta_x = np.float64(p_array[end, 0]) - p1_x
+    delta_y = np.float64(p_array[end, 1]) - p1_y
+
+    first = start + 1
+    last = end - 1
+    first_leaf = first // _hull_leaf_points_ + 1
+    last_leaf = last // _hull_leaf_points_ - 1
+    val_max, arg_max = _scan_extreme(p_array, first, min(first_leaf * _hull_leaf_points_, last + 1),
+                                     p1_x, p1_y, delta_x, delta_y, -1.0, 0)
+    val_max, arg_max = _scan_extreme(p_array, max((last_leaf + 1) * _hull_leaf_points_, first), last + 1,
+                                     p1_x, p1_y, delta_x, delta_y, val_max, arg_max)
+
+    # the nodes covering the leaves first_leaf to last_leaf, at most two per level below the top level kept
+    lo = first_leaf
+    hi = last_leaf
+    level = 0
+    top_level = level_start.shape[0] - 2
+    while lo <= hi:
+        if level == top_level:
+            for node in range(lo, hi + 1):
+                val_max, arg_max = _node_extreme(p_array, chains, chain_start, num_upper, num_lower,
+                                                 level_start[level] + node, p1_x, p1_y, delta_x, delta_y, val_max,
+                                                 arg_max)
+            break
+        if lo % 2 == 1:
+            val_max, arg_max = _node_extreme(p_array, chains, chain_start, num_upper, num_lower,
+                                             level_start[level] + lo, p1_x, p1_y, delta_x, delta_y, val_max, arg_max)
+            lo += 1
+        if lo <= hi and hi % 2 == 0:
+            val_max, arg_max = _node_extreme(p_array, chains, chain_start, num_upper, num_lower,
+                                             level_start[level] + hi, p1_x, p1_y, delta_x, delta_y, val_max, arg_max)
+            hi -= 1
+        lo //= 2
+        hi //= 2
+        level += 1
+    return val_max / np.sqrt(delta_x * delta_x + delta_y * delta_y), arg_max - first
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:], int64[:]) for pt in _rdp_quick_point_types_])
+def _check_windows_hull(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                        p_array_ok: npt.NDArray[bool], stats: npt.NDArray[np.int64]) -> int:
+    """
+    check_windows_hull, also filling in the stats buffer.  The windows checked with the hull tree are counted in
+    _stats_num_hull_windows_ instead of as distance evaluations
+    :param p_array: The data points (2 columns, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices, or
+                    (num_windows, 3) with the level of each window in the last column
+    :param p_array_ok: Which points are accepted, updated in place
+    :param stats: the stats buffer to fill in, or an empty array for no stats
+    :return: the number of windows that were checked
+    """
+    record_stats = stats.shape[0] > _stats_levels_start_
+    chains, chain_start, num_upper, num_lower, level_start = build_hull_tree(p_array)
+    num_windows = windows.shape[0]
+    # the start, end and level of each pending window
+    stack = np.empty((max(num_windows, 64), 3), dtype=np.int64)
+    # push in reverse so the windows are processed in the given order
+    stack_size = 0
+    for wi in range(num_windows - 1, -1, -1):
+        # the window of an empty input ends before it starts and has no points to accept
+        if windows[wi, 1] < windows[wi, 0]:
+            continue
+        stack[stack_size, 0] = windows[wi, 0]
+        stack[stack_size, 1] = windows[wi, 1]
+        stack[stack_size, 2] = windows[wi, 2] if windows.shape[1] > 2 else 0
+        stack_size += 1
+
+    num_checked = 0
+    while stack_size > 0:
+        stack_size -= 1
+        start = stack[stack_size, 0]
+        end = stack[stack_size, 1]
+        level = stack[stack_size, 2]
+        num_checked += 1
+        if end - start < 2:
+            ok = True
+            arg_max = 0
+            if record_stats:
+                _record_window_stats(stats, start, end, level, 0)
+        else:
+            if end - start - 1 < _hull_min_window_points_ or \
+                    (p_array[start, 0] == p_array[end, 0] and p_array[start, 1] == p_array[end, 1]):
+                val_max, arg_max = compute_max_distance(p_array[start, :], p_array[end, :],
+                                                        p_array[start + 1:end, :])
+                if record_stats:
+                    _record_window_stats(stats, start, end, level, end - start - 1)
+            else:
+                val_max, arg_max = _hull_max_distance(p_array, chains, chain_start, num_upper, num_lower, level_start,
+                                                      start, end)
+                if record_stats:
+                    _record_window_stats(stats, start, end, level, 0)
+                    stats[_stats_num_hull_windows_] += 1
+            arg_max += 1
+            ok = not val_max > epsilon
+
+        if ok:
+            p_array_ok[start] = True
+            p_array_ok[end] = True
+        else:
+            if stack_size + 2 > stack.shape[0]:
+                new_stack = np.empty((stack.shape[0] * 2, 3), dtype=np.int64)
+                new_stack[:stack_size, :] = stack[:stack_size, :]
+                stack = new_stack
+            stack[stack_size, 0] = start + arg_max
+            stack[stack_size, 1] = end
+            stack[stack_size, 2] = level + 1
+            stack[stack_size + 1, 0] = start
+            stack[stack_size + 1, 1] = start + arg_max
+            stack[stack_size + 1, 2] = level + 1
+            stack_size += 2
+    return num_checked
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:]) for pt in _rdp_quick_point_types_])
+def check_windows_hull(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                       p_array_ok: npt.NDArray[bool]) -> int:
+    """
+    Test all the windows and keep splitting them until every window passes, finding the furthest point of each
+    window from a tree of convex hulls (see build_hull_tree) instead of checking every point.  Building the tree is
+    O(n log n) and each window then costs O(log^2 n) whatever the shape of the points, so a path that only splits off
+    a point or two at a time no longer costs O(n^2).
+
+    The points must have 2 columns.  The accepted points are the same as check_windows_compiled (unless two
+    distances differ only by rounding error)
+    :param p_array: The data points (2 columns, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :return: the number of windows that were checked
+    """
+    return _check_windows_hull(p_array, epsilon, windows, p_array_ok, np.empty(0, dtype=np.int64))
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:], int64[:]) for pt in _rdp_quick_point_types_])
+def _check_windows_auto(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                        p_array_ok: npt.NDArray[bool], stats: npt.NDArray[np.int64]) -> int:
+    """
+    check_windows_auto, also filling in the stats buffer
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :param stats: the stats buffer to fill in, or an empty array for no stats
+    :return: the number of windows that were checked
+    """
+    num_points = p_array.shape[0]
+    max_evaluations = _no_evaluation_limit_
+    if p_array.shape[1] == 2 and 2 * _hull_min_window_points_ <= num_points < np.iinfo(np.int32).max:
+        max_evaluations = int(_hull_switch_factor_ * num_points * np.log2(num_points))
+    num_checked, pending = _check_windows_stack(p_array, epsilon, windows, p_array_ok, _parallel_window_min_points_,
+                                                stats, max_evaluations)
+    if pending.shape[0] == 0:
+        return num_checked
+    return num_checked + _check_windows_hull(p_array, epsilon, pending, p_array_ok, stats)
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:]) for pt in _rdp_quick_point_types_])
+def check_windows_auto(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                       p_array_ok: npt.NDArray[bool]) -> int:
+    """
+    The same as check_windows_compiled, but with 2 columns once the windows have cost more than
+    _hull_switch_factor_ * n * log2(n) distance evaluations (a path that keeps splitting off a few points at a time)
+    the windows still to check are handed to check_windows_hull.  The points already accepted are kept, so an input
+    that never reaches the limit costs the same as check_windows_compiled
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :return: the number of windows that were checked
+    """
+    return _check_windows_auto(p_array, epsilon, windows, p_array_ok, np.empty(0, dtype=np.int64))
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:, :], boolean[:], int64[:]) for pt in _rdp_quick_point_types_])
+def check_windows_auto_stats(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                             p_array_ok: npt.NDArray[bool], stats: npt.NDArray[np.int64]) -> int:
+    """
+    The same as check_windows_auto while also filling in the stats buffer
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :param stats: the zeroed stats buffer (see _stats_levels_start_)
+    :return: the number of windows that were checked
+    """
+    return _check_windows_auto(p_array, epsilon, windows, p_array_ok, stats)
@@ -0,0 +1,374 @@
+import numpy as np
+import numpy.typing as npt
+import typing
+from numba import float64, int64, boolean, types
+from rdp_quick.check_window import check_windows_compiled
+from rdp_quick.compute_distance import compute_max_distance, _rdp_quick_point_types_
+from rdp_quick.jit import lazy_njit
+from rdp_quick.output import build_output
+
+# the columns of the split tree of RdpIncremental without points_per_window, one row per checked window in depth first
+# order: the window start and end, the split point (-1 if the window passed), the point furthest from the line (-1 if
+# there are no inner points) and the number of windows in the sub tree of the window (itself included)
+_tree_start_ = 0
+_tree_end_ = 1
+_tree_split_ = 2
+_tree_arg_max_ = 3
+_tree_size_ = 4
+_tree_num_columns_ = 5
+
+
+@lazy_njit(int64(int64[:, :], int64, int64))
+def _find_tree_window(tree: npt.NDArray[np.int64], start: int, end: int) -> int:
+    """
+    :param tree: the split tree (see _tree_start_)
+    :param start: the start of the window
+    :param end: the end of the window
+    :return: the row of the window start to end in the tree, -1 if the tree does not have it
+    """
+    if tree.shape[0] == 0 or start < tree[0, _tree_start_] or end > tree[0, _tree_end_]:
+        return -1
+    row = 0
+    while True:
+        if tree[row, _tree_start_] == start and tree[row, _tree_end_] == end:
+            return row
+        split = tree[row, _tree_split_]
+        if split < 0:
+            return -1
+        if end <= split:
+            row += 1
+        elif start >= split:
+            row += 1 + tree[row + 1, _tree_size_]
+        else:
+            return -1
+
+
+@lazy_njit([types.Tuple((int64, int64[:, :], float64[:]))(pt[:, :], float64, int64, int64, int64[:, :], float64[:],
+                                                            boolean[:])
+            for pt in _rdp_quick_point_types_])
+def _update_split_tree(p_array: npt.NDArray, epsilon: float, edit_start: int, edit_end: int,
+                       tree: npt.NDArray[np.int64], tree_max: npt.NDArray[float],
+                       p_array_ok: npt.NDArray[bool]) -> typing.Tuple[int, npt.NDArray[np.int64], npt.NDArray[float]]:
+    """
+    Simplifies all the points as one window, reusing the split tree of the points before edit_start to edit_end
+    changed.  A window of the old tree that does not contain a changed point is kept with all the windows under it.
+    A window with changed inner points whose end points and furthest point did not change only checks the changed
+    points, the others are checked in full
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param edit_start: the first point that changed
+    :param edit_end: the last point that changed
+    :param tree: the split tree before the change (see _tree_start_), empty for none
+    :param tree_max: the distance of the furthest point of each window of the tree
+    :param p_array_ok: the accepted points before the change, updated in place
+    :return: the number of windows that were checked, the new split tree and the distances of its furthest points
+    """
+    num_points = p_array.shape[0]
+    capacity = max(tree.shape[0] + 16, 64)
+    new_tree = np.empty((capacity, _tree_num_columns_), dtype=np.int64)
+    new_max = np.empty(capacity, dtype=np.float64)
+    num_rows = 0
+    # the old rows kept in the new tree
+    kept = np.zeros(tree.shape[0], dtype=np.bool_)
+    # the start, end and old row (-1 to look it up) of each pending window
+    stack = np.empty((64, 3), dtype=np.int64)
+    stack_size = 0
+    if num_points > 0:
+        stack[0, 0] = 0
+        stack[0, 1] = num_points - 1
+        stack[0, 2] = -1
+        stack_size = 1
+
+    num_checked = 0
+    while stack_size > 0:
+        stack_size -= 1
+        start = stack[stack_size, 0]
+        end = stack[stack_size, 1]
+        row = stack[stack_size, 2]
+        if row < 0:
+            row = _find_tree_window(tree, start, end)
+        changed = start <= edit_end and end >= edit_start
+
+        if row >= 0 and not changed:
+            # nothing in the window changed, keep it and the windows under it
+            size = tree[row, _tree_size_]
+            if num_rows + size > capacity:
+                capacity = max(2 * capacity, num_rows + size)
+                grown_tree = np.empty((capacity, _tree_num_columns_), dtype=np.int64)
+                grown_tree[:num_rows, :] = new_tree[:num_rows, :]
+                new_tree = grown_tree
+                grown_max = np.empty(capacity, dtype=np.float64)
+                grown_max[:num_rows] = new_max[:num_rows]
+                new_max = grown_max
+            new_tree[num_rows:num_rows + size, :] = tree[row:row + size, :]
+            new_max[num_rows:num_rows + size] = tree_max[row:row + size]
+            kept[row:row + size] = True
+            num_rows += size
+            continue
+
+        num_checked += 1
+        val_max = -1.0
+        arg_max = -1
+        if end - start >= 2:
+            old_arg_max = tree[row, _tree_arg_max_] if row >= 0 else -1
+            check_all = True
+            if row >= 0 and start < edit_start and end > edit_end and \
+                    (old_arg_max < edit_start or old_arg_max > edit_end):
+                # only the changed points can beat the old furthest point, check everything again on a tie
+                val_edit, arg_edit = compute_max_distance(p_array[start, :], p_array[end, :],
+                                                          p_array[edit_start:edit_end + 1, :])
+                if val_edit > tree_max[row]:
+                    val_max = val_edit
+                    arg_max = edit_start + arg_edit
+                    check_all = False
+                elif val_edit < tree_max[row]:
+                    val_max = tree_max[row]
+                    arg_max = old_arg_max
+                    check_all = False
+            if check_all:
+                val_max, arg_max = compute_max_distance(p_array[start, :], p_array[end, :],
+                                                        p_array[start + 1:end, :])
+                arg_max += start + 1
+
+        if num_rows + 1 > capacity:
+            capacity = 2 * capacity
+            grown_tree = np.empty((capacity, _tree_num_columns_), dtype=np.int64)
+            grown_tree[:num_rows, :] = new_tree[:num_rows, :]
+            new_tree = grown_tree
+            grown_max = np.empty(capacity, dtype=np.float64)
+            grown_max[:num_rows] = new_max[:num_rows]
+            new_max = grown_max
+        split = arg_max if val_max > epsilon else -1
+        new_tree[num_rows, _tree_start_] = start
+        new_tree[num_rows, _tree_end_] = end
+        new_tree[num_rows, _tree_split_] = split
+        new_tree[num_rows, _tree_arg_max_] = arg_max
+        new_max[num_rows] = val_max
+        num_rows += 1
+
+        if split >= 0:
+            left_row = -1
+            right_row = -1
+            if row >= 0 and tree[row, _tree_split_] == split:
+                left_row = row + 1
+                right_row = row + 1 + tree[row + 1, _tree_size_]
+            if stack_size + 2 > stack.shape[0]:
+                grown_stack = np.empty((stack.shape[0] * 2, 3), dtype=np.int64)
+                grown_stack[:stack_size, :] = stack[:stack_size, :]
+                stack = grown_stack
+            # push the right window first so the tree is built depth first from the left
+            stack[stack_size, 0] = split
+            stack[stack_size, 1] = end
+            stack[stack_size, 2] = right_row
+            stack[stack_size + 1, 0] = start
+            stack[stack_size + 1, 1] = split
+            stack[stack_size + 1, 2] = left_row
+            stack_size += 2
+
+    # the sub tree sizes, the windows under a window come after it
+    for row in range(num_rows - 1, -1, -1):
+        if new_tree[row, _tree_split_] < 0:
+            new_tree[row, _tree_size_] = 1
+        else:
+            new_tree[row, _tree_size_] = 1 + new_tree[row + 1, _tree_size_] + \
+                new_tree[row + 1 + new_tree[row + 1, _tree_size_], _tree_size_]
+
+    # the accepted points are the end points of the windows, a kept window keeps the accepted points inside it
+    for row in range(tree.shape[0]):
+        if not kept[row]:
+            p_array_ok[tree[row, _tree_start_]] = False
+            p_array_ok[tree[row, _tree_end_]] = False
+    for row in range(num_rows):
+        p_array_ok[new_tree[row, _tree_start_]] = True
+        p_array_ok[new_tree[row, _tree_end_]] = True
+    return num_checked, new_tree[:num_rows, :], new_max[:num_rows]
+
+
+class RdpIncremental:
+    """
+    Keeps a polyline and its down sampled points up to date while points are appended or edited.
+
+    The polyline is split into windows of points_per_window points (the same windows as RdpStream: (0, ppw),
+    (ppw, 2 * ppw), ... with the last window ending on the last point).  The accepted points of every window are kept
+    between updates and only the windows containing an appended or edited point are checked again, so the cost of an
+    update depends on the size of the change and not on the length of the polyline.  The result is always the same as
+    rdp_initial_windows with the same windows (see the windows property).
+
+    Without points_per_window the polyline is one window, as rdp_single_initial_window, and the windows it was split
+    into are kept instead.  Only the windows containing a changed point are checked again, and when the end points and
+    the furthest point of such a window did not change only the changed points are.  Editing points inside the
+    polyline then costs about the size of the change times the depth of the split, but appending moves the end of the
+    first window so it and the windows along the end are checked in full (about the cost of the first two levels of
+    rdp_single_initial_window).  The result is the same as rdp_single_initial_window (unless two distances differ only
+    by rounding error)
+    """
+
+    def __init__(self, epsilon: float, points_per_window: typing.Union[int, None] = None,
+                 p_array: typing.Union[npt.NDArray, None] = None):
+        """
+        :param epsilon: the threshold
+        :param points_per_window: the number of points per window (at least 1), None for a single window
+        :param p_array: the initial points (2D, float64, float32, int64 or int32)
+        """
+        if points_per_window is not None and points_per_window < 1:
+            raise ValueError("points_per_window must be at least 1")
+        self.epsilon = float(epsilon)
+        self.points_per_window = None if points_per_window is None else int(points_per_window)
+        self._points = None
+        self._p_array_ok = np.zeros(0, dtype=bool)
+        self._num_points = 0
+        # the split tree without points_per_window (see _update_split_tree)
+        self._tree = np.zeros((0, _tree_num_columns_), dtype=np.int64)
+        self._tree_max = np.zeros(0, dtype=np.float64)
+        if p_array is not None:
+            self.append(p_array)
+
+    @property
+    def num_points(self) -> int:
+        """
+        :return: the number of points in the polyline
+        """
+        return self._num_points
+
+    @property
+    def points(self) -> npt.NDArray:
+        """
+        :return: a read only view of all the points
+        """
+        if self._points is None:
+            return np.empty((0, 0))
+        view = self._points[:self._num_points]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def windows(self) -> npt.NDArray[np.int64]:
+        """
+        :return: the windows of the current points as an (num_windows, 2) int64 array of start and end indices
+        """
+        return self._windows(0, self._num_windows())
+
+    def _num_windows(self) -> int:
+        """
+        :return: the number of windows of the current points
+        """
+        if self._num_points == 0:
+            return 0
+        if self.points_per_window is None:
+            return 1
+        num_full = (self._num_points - 1) // self.points_per_window
+        return num_full + (1 if self._num_points - 1 > num_full * self.points_per_window or num_full == 0 else 0)
+
+    def _windows(self, first: int, last: int) -> npt.NDArray[np.int64]:
+        """
+        :param first: the first window
+        :param last: one past the last window
+        :return: the windows first to last - 1
+        """
+        if self.points_per_window is None:
+            return np.array([[0, self._num_points - 1]], dtype=np.int64)[first:last]
+        starts = np.arange(first, last, dtype=np.int64) * self.points_per_window
+        return np.stack([starts, np.minimum(starts + self.points_per_window, self._num_points - 1)], axis=1)
+
+    def _window_of(self, index: int, last: bool = False) -> int:
+        """
+        :param index: the index of a point
+        :param last: return the last window containing the point instead of the first
+        :return: the first (or last) window containing the point
+        """
+        if self.points_per_window is None:
+            return 0
+        if last or index == 0:
+            return min(index // self.points_per_window, self._num_windows() - 1)
+        # a window boundary is also the end of the window before it
+        return min((index - 1) // self.points_per_window, self._num_windows() - 1)
+
+    def _recheck(self, first_point: int, last_point: int) -> int:
+        """
+        Checks again the windows containing the points first_point to last_point
+        :param first_point: the first point that changed
+        :param last_point: the last point that changed
+        :return: the number of windows that were checked
+        """
+        if self.points_per_window is None:
+            num_checked, self._tree, self._tree_max = _update_split_tree(
+                self._points[:self._num_points], self.epsilon, first_point, last_point, self._tree, self._tree_max,
+                self._p_array_ok[:self._num_points])
+            return num_checked
+        return self._recheck_windows(self._window_of(first_point), self._window_of(last_point, last=True) + 1)
+
+    def _recheck_windows(self, first: int, last: int) -> int:
+        """
+        Checks the windows first to last - 1 again
+        :param first: the first window
+        :param last: one past the last window
+        :return: the number of windows that were checked
+        """
+        windows = self._windows(first, last)
+        if len(windows) == 0:
+            return 0
+        p_array = self._points[:self._num_points]
+        p_array_ok = self._p_array_ok[:self._num_points]
+        p_array_ok[windows[0, 0]:windows[-1, 1] + 1] = False
+        return check_windows_compiled(p_array, self.epsilon, windows, p_array_ok)
+
+    def append(self, new_points: npt.NDArray) -> int:
+        """
+        Adds points to the end of the polyline
+        :param new_points: the new points (2D with the same number of columns as the polyline, converted to its dtype)
+        :return: the number of windows that were checked
+        """
+        new_points = np.asarray(new_points)
+        if self._points is None:
+            self._points = np.empty((max(len(new_points), 16), new_points.shape[1]), dtype=new_points.dtype)
+        num_points = self._num_points + len(new_points)
+        if num_points > len(self._points):
+            # grow by doubling so appending one point at a time is amortised O(1)
+            capacity = max(num_points, 2 * len(self._points))
+            points = np.empty((capacity, self._points.shape[1]), dtype=self._points.dtype)
+            points[:self._num_points] = self._points[:self._num_points]
+            self._points = points
+            p_array_ok = np.zeros(capacity, dtype=bool)
+            p_array_ok[:self._num_points] = self._p_array_ok[:self._num_points]
+            self._p_array_ok = p_array_ok
+        elif len(self._p_array_ok) < len(self._points):
+            self._p_array_ok = np.zeros(len(self._points), dtype=bool)
+        self._points[self._num_points:num_points] = new_points
+        first_point = max(self._num_points - 1, 0)
+        self._num_points = num_points
+        return self._recheck(first_point, num_points - 1)
+
+    def update(self, start: int, new_points: npt.NDArray) -> int:
+        """
+        Replaces the points start to start + len(new_points) - 1
+        :param start: the index of the first point to replace
+        :param new_points: the new values of the points
+        :return: the number of windows that were checked
+        """
+        new_points = np.asarray(new_points)
+        end = start + len(new_points)
+        if start < 0 or end > self._num_points:
+            raise IndexError("points {} to {} are not in the polyline of {} points".format(
+                start, end - 1, self._num_points))
+        if len(new_points) == 0:
+            return 0
+        self._points[start:end] = new_points
+        return self._recheck(start, end - 1)
+
+    def result(self, return_mask: bool = False, return_indices: bool = False,
+               out: typing.Union[npt.NDArray, None] = None) -> npt.NDArray:
+        """
+        :param return_mask: return the mask of the accepted points instead of the points
+        :param return_indices: return the indices of the accepted points instead of the points
+        :param out: optional buffer to write the output to, the returned array is then a view of out
+        :return: The down sampled points (or the mask or indices)
+        """
+        if return_mask and return_indices:
+            raise ValueError("only one of return_mask and return_indices can be set")
+        p_array_ok = self._p_array_ok[:self._num_points]
+        if return_mask:
+            if out is None:
+                return p_array_ok.copy()
+            out[:self._num_points] = p_array_ok
+            return out[:self._num_points]
+        return build_output(self.points, p_array_ok, False, return_indices, out)
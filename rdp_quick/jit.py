@@ -0,0 +1,122 @@
+import functools
+import os
+import threading
+import typing
+import numba
+
+# set RDP_QUICK_CACHE=0 to never write the compiled functions to disk
+_rdp_quick_use_cache_ = os.environ.get("RDP_QUICK_CACHE", "1") != "0"
+# the directory the compiled functions are cached in, None for numba's default (next to the source or NUMBA_CACHE_DIR)
+_rdp_quick_cache_dir_ = os.environ.get("RDP_QUICK_CACHE_DIR") or None
+
+# every lazily compiled function, in the order they were defined
+_lazy_dispatchers_ = list()
+# held while compiling so two threads do not compile the same function and the cache directory is not changed
+# while a function is being compiled
+_compile_lock_ = threading.RLock()
+
+
+def set_cache_dir(cache_dir: typing.Union[str, os.PathLike, None]):
+    """
+    Sets the directory the compiled functions are cached in.  Only the functions not yet compiled in this process
+    are affected so call this before the first simplification (or warmup)
+    :param cache_dir: the directory, None for numba's default
+    """
+    global _rdp_quick_cache_dir_
+    with _compile_lock_:
+        _rdp_quick_cache_dir_ = None if cache_dir is None else os.fspath(cache_dir)
+
+
+class LazyDispatcher:
+    """
+    Holds a function to compile for a list of signatures on first use instead of on import.
+
+    When compiled the function is compiled with numba.njit for all the signatures (exactly as if it was decorated
+    with njit(signatures)), any lazy functions it calls are compiled first and the module global is replaced by the
+    compiled function so later calls go straight to numba
+    """
+
+    def __init__(self, py_func: typing.Callable, signatures: typing.Any, options: dict):
+        """
+        :param py_func: the python function
+        :param signatures: the signatures passed to numba.njit
+        :param options: the other options passed to numba.njit
+        """
+        self.py_func = py_func
+        self.signatures = signatures
+        self.options = options
+        self._dispatcher = None
+        functools.update_wrapper(self, py_func)
+
+    @property
+    def is_compiled(self) -> bool:
+        """
+        :return: if the function has been compiled (or loaded from the cache)
+        """
+        return self._dispatcher is not None
+
+    def compile(self) -> numba.core.registry.CPUDispatcher:
+        """
+        Compiles the function (or loads it from the cache) if not done already
+        :return: the compiled function
+        """
+        if self._dispatcher is not None:
+            return self._dispatcher
+        with _compile_lock_:
+            if self._dispatcher is None:
+                module_globals = self.py_func.__globals__
+                for name in self.py_func.__code__.co_names:
+                    value = module_globals.get(name)
+                    if isinstance(value, LazyDispatcher):
+                        module_globals[name] = value.compile()
+
+                # numba only reads the cache directory when the function is decorated
+                numba_cache_dir = numba.config.CACHE_DIR
+                if _rdp_quick_cache_dir_ is not None:
+                    numba.config.CACHE_DIR = _rdp_quick_cache_dir_
+                try:
+                    dispatcher = numba.njit(self.signatures, cache=_rdp_quick_use_cache_, **self.options)(self.py_func)
+                finally:
+                    numba.config.CACHE_DIR = numba_cache_dir
+                module_globals[self.py_func.__name__] = dispatcher
+                self._dispatcher = dispatcher
+        return self._dispatcher
+
+    def __call__(self, *args, **kwargs):
+        return self.compile()(*args, **kwargs)
+
+
+def lazy_njit(signatures: typing.Any, **options) -> typing.Callable[[typing.Callable], LazyDispatcher]:
+    """
+    Decorator used in place of numba.njit(signatures, cache=...) so nothing is compiled (or loaded from the cache)
+    when rdp_quick is imported.  The GIL is released (nogil=True) unless the options say otherwise
+    :param signatures: a signature or list of signatures
+    :param options: any other numba.njit options
+    :return: the decorator
+    """
+    options.setdefault("nogil", True)
+
+    def decorator(py_func: typing.Callable) -> LazyDispatcher:
+        dispatcher = LazyDispatcher(py_func, signatures, options)
+        _lazy_dispatchers_.append(dispatcher)
+        return dispatcher
+    return decorator
+
+
+def warmup() -> int:
+    """
+    Compiles every function (or loads it from the cache) so the first simplification does not pay for it.  With an
+    empty cache directory this also fills the cache, so it can be run once when building an image for short lived
+    workers
+    :return: the number of functions compiled or loaded
+    """
+    import rdp_quick.check_window
+    import rdp_quick.curvature
+    import rdp_quick.output
+    import rdp_quick.seams
+    num_compiled = 0
+    for dispatcher in list(_lazy_dispatchers_):
+        if not dispatcher.is_compiled:
+            dispatcher.compile()
+            num_compiled += 1
+    return num_compiled
@@ -0,0 +1,319 @@
+import functools
+import numba
+import numpy as np
+import numpy.typing as npt
+import typing
+from numba import njit, prange
+from rdp_quick.check_window import _record_window_stats, _stats_levels_start_, _parallel_window_min_points_, \
+    _level_num_chunks_, _level_min_chunk_points_
+
+# A metric is a numba.njit function metric(p_array, start, end, i) -> float returning the distance of point i from
+# the down sampled line between the points start and end (start < i < end).  It is passed to the window kernels as an
+# argument, numba compiles the kernels for each metric the first time it is used and the metric is inlined into the
+# loop over the points, so it costs no more than writing the distance in the kernel.  The kernels are not cached on
+# disk, numba can not load a kernel compiled for a function argument in another process
+
+
+@njit(inline="always")
+def _distance_to_fraction(p_array: npt.NDArray, start: int, end: int, i: int, t: float, num_dims: int) -> float:
+    """
+    The distance of point i from the point a fraction t of the way from the start point to the end point, using the
+    first num_dims columns
+    :param p_array: the data points (2D, any supported dtype)
+    :param start: the index of the start point
+    :param end: the index of the end point
+    :param i: the index of the point
+    :param t: the fraction of the way from the start point to the end point
+    :param num_dims: the number of columns of the position
+    :return: the distance
+    """
+    dist_sq = 0.0
+    for j in range(num_dims):
+        diff = (np.float64(p_array[i, j]) - np.float64(p_array[start, j])) - \
+            t * (np.float64(p_array[end, j]) - np.float64(p_array[start, j]))
+        dist_sq += diff * diff
+    return np.sqrt(dist_sq)
+
+
+@njit(inline="always")
+def _line_fraction(p_array: npt.NDArray, start: int, end: int, i: int, num_dims: int) -> float:
+    """
+    The projection of point i onto the line through the start and end points, as a fraction of the way from the start
+    point to the end point (0 when they are the same point)
+    :param p_array: the data points (2D, any supported dtype)
+    :param start: the index of the start point
+    :param end: the index of the end point
+    :param i: the index of the point
+    :param num_dims: the number of columns of the position
+    :return: the fraction
+    """
+    dot = 0.0
+    norm_sq = 0.0
+    for j in range(num_dims):
+        delta = np.float64(p_array[end, j]) - np.float64(p_array[start, j])
+        dot += (np.float64(p_array[i, j]) - np.float64(p_array[start, j])) * delta
+        norm_sq += delta * delta
+    return dot / norm_sq if norm_sq > 0.0 else 0.0
+
+
+# The built in metrics are made by these factories.  With num_columns 0 the number of columns is read from p_array
+# (the public metrics), otherwise it is a constant so the loops over the columns are unrolled (see _specialise_metric)
+
+def _make_perpendicular_distance(num_columns: int) -> typing.Callable:
+    @njit(nogil=True)
+    def perpendicular_distance(p_array: npt.NDArray, start: int, end: int, i: int) -> float:
+        """
+        The distance from the (infinite) line through the start and end points, the distance used when there is no
+        metric and computed the same way as compute_max_distance (the cross product with 2 and 3 columns).  When the
+        start and end points are the same it is the distance from the start point
+        :param p_array: the data points (2D, any supported dtype)
+        :param start: the index of the start point of the line
+        :param end: the index of the end point of the line
+        :param i: the index of the point
+        :return: the distance
+        """
+        num_dims = num_columns if num_columns > 0 else p_array.shape[1]
+        if num_dims == 2:
+            # the cross product as in compute_max_distance, so equal distances of integer points stay equal
+            delta_x = np.float64(p_array[end, 0]) - np.float64(p_array[start, 0])
+            delta_y = np.float64(p_array[end, 1]) - np.float64(p_array[start, 1])
+            norm_sq = delta_x * delta_x + delta_y * delta_y
+            if norm_sq > 0.0:
+                cross = delta_x * (np.float64(p_array[start, 1]) - np.float64(p_array[i, 1])) - \
+                    delta_y * (np.float64(p_array[start, 0]) - np.float64(p_array[i, 0]))
+                return np.abs(cross) / np.sqrt(norm_sq)
+        elif num_dims == 3:
+            delta_x = np.float64(p_array[end, 0]) - np.float64(p_array[start, 0])
+            delta_y = np.float64(p_array[end, 1]) - np.float64(p_array[start, 1])
+            delta_z = np.float64(p_array[end, 2]) - np.float64(p_array[start, 2])
+            norm_sq = delta_x * delta_x + delta_y * delta_y + delta_z * delta_z
+            if norm_sq > 0.0:
+                diff_x = np.float64(p_array[start, 0]) - np.float64(p_array[i, 0])
+                diff_y = np.float64(p_array[start, 1]) - np.float64(p_array[i, 1])
+                diff_z = np.float64(p_array[start, 2]) - np.float64(p_array[i, 2])
+                cross_x = delta_y * diff_z - delta_z * diff_y
+                cross_y = delta_z * diff_x - delta_x * diff_z
+                cross_z = delta_x * diff_y - delta_y * diff_x
+                return np.sqrt(cross_x * cross_x + cross_y * cross_y + cross_z * cross_z) / np.sqrt(norm_sq)
+        t = _line_fraction(p_array, start, end, i, num_dims)
+        return _distance_to_fraction(p_array, start, end, i, t, num_dims)
+    return perpendicular_distance
+
+
+def _make_segment_distance(num_columns: int) -> typing.Callable:
+    @njit(nogil=True)
+    def segment_distance(p_array: npt.NDArray, start: int, end: int, i: int) -> float:
+        """
+        The distance from the line segment between the start and end points, points past either end are measured
+        from that end point instead of from the infinite line
+        :param p_array: the data points (2D, any supported dtype)
+        :param start: the index of the start point of the segment
+        :param end: the index of the end point of the segment
+        :param i: the index of the point
+        :return: the distance
+        """
+        num_dims = num_columns if num_columns > 0 else p_array.shape[1]
+        t = min(max(_line_fraction(p_array, start, end, i, num_dims), 0.0), 1.0)
+        return _distance_to_fraction(p_array, start, end, i, t, num_dims)
+    return segment_distance
+
+
+def _make_sed_distance(num_columns: int) -> typing.Callable:
+    @njit(nogil=True)
+    def sed_distance(p_array: npt.NDArray, start: int, end: int, i: int) -> float:
+        """
+        The synchronized Euclidean distance (SED) for time stamped trajectories.  The last column is the time and the
+        other columns the position.  The point is measured from where an object moving at constant speed from the
+        start point to the end point is at the time of the point (the start point when the times are the same)
+        :param p_array: the data points (2D, any supported dtype, the time in the last column)
+        :param start: the index of the start point of the trajectory segment
+        :param end: the index of the end point of the trajectory segment
+        :param i: the index of the point
+        :return: the distance
+        """
+        num_dims = (num_columns if num_columns > 0 else p_array.shape[1]) - 1
+        time_start = np.float64(p_array[start, num_dims])
+        duration = np.float64(p_array[end, num_dims]) - time_start
+        t = (np.float64(p_array[i, num_dims]) - time_start) / duration if duration != 0.0 else 0.0
+        return _distance_to_fraction(p_array, start, end, i, t, num_dims)
+    return sed_distance
+
+
+perpendicular_distance = _make_perpendicular_distance(0)
+segment_distance = _make_segment_distance(0)
+sed_distance = _make_sed_distance(0)
+
+# the factory of each built in metric
+_metric_factories_ = {perpendicular_distance: _make_perpendicular_distance,
+                      segment_distance: _make_segment_distance,
+                      sed_distance: _make_sed_distance}
+# the built in metrics are only specialised for up to this many columns
+_max_specialised_columns_ = 8
+
+
+@functools.lru_cache(maxsize=None)
+def _specialise_metric(metric: typing.Callable, num_columns: int) -> typing.Callable:
+    """
+    :param metric: the metric
+    :param num_columns: the number of columns of the points
+    :return: the built in metric made for num_columns columns, any other metric as it is
+    """
+    factory = _metric_factories_.get(metric)
+    if factory is None or not 0 < num_columns <= _max_specialised_columns_:
+        return metric
+    return factory(num_columns)
+
+
+def check_metric(metric: typing.Any):
+    """
+    Raises a TypeError if the metric can not be passed to the window kernels
+    :param metric: the metric
+    """
+    if not isinstance(metric, numba.core.registry.CPUDispatcher):
+        raise TypeError("the metric must be a numba.njit function metric(p_array, start, end, i), not {}".format(
+            type(metric).__name__))
+
+
+@njit(inline="always")
+def _metric_max_distance(p_array: npt.NDArray, start: int, end: int, first: int, last: int,
+                         metric: typing.Callable) -> typing.Tuple[float, int]:
+    """
+    The largest distance of the points first to last - 1 from the line between the start and end points
+    :param p_array: the data points (2D, any supported dtype)
+    :param start: the index of the start point of the line
+    :param end: the index of the end point of the line
+    :param first: the first point to measure
+    :param last: one past the last point to measure
+    :param metric: the metric
+    :return: the maximum distance (-1 if there are no points), the index of the first point with the maximum distance
+    """
+    val_max = -1.0
+    arg_max = first
+    for i in range(first, last):
+        dist = metric(p_array, start, end, i)
+        if dist > val_max:
+            val_max = dist
+            arg_max = i
+    return val_max, arg_max
+
+
+@njit(nogil=True, parallel=True)
+def _metric_max_distance_parallel(p_array: npt.NDArray, start: int, end: int,
+                                  metric: typing.Callable) -> typing.Tuple[float, int]:
+    """
+    The largest distance of the points between the start and end points, in parallel chunks (see check_window)
+    :param p_array: the data points (2D, any supported dtype)
+    :param start: the index of the start point of the line
+    :param end: the index of the end point of the line
+    :param metric: the metric
+    :return: the maximum distance, the index of the first point with the maximum distance
+    """
+    num_inner = end - start - 1
+    chunk_size = max(_level_min_chunk_points_, (num_inner + _level_num_chunks_ - 1) // _level_num_chunks_)
+    num_chunks = (num_inner + chunk_size - 1) // chunk_size
+    chunk_max = np.empty(num_chunks, dtype=np.float64)
+    chunk_arg_max = np.empty(num_chunks, dtype=np.int64)
+    for ci in prange(num_chunks):
+        chunk_start = start + 1 + ci * chunk_size
+        chunk_end = min(chunk_start + chunk_size, end)
+        val_max, arg_max = _metric_max_distance(p_array, start, end, chunk_start, chunk_end, metric)
+        chunk_max[ci] = val_max
+        chunk_arg_max[ci] = arg_max
+
+    val_max = -1.0
+    arg_max = start + 1
+    for ci in range(num_chunks):
+        if chunk_max[ci] > val_max:
+            val_max = chunk_max[ci]
+            arg_max = chunk_arg_max[ci]
+    return val_max, arg_max
+
+
+@njit(nogil=True)
+def _check_windows_metric(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                          p_array_ok: npt.NDArray[bool], metric: typing.Callable, parallel_min_points: int,
+                          stats: npt.NDArray[np.int64]) -> int:
+    """
+    Test all the windows and keep splitting them until every window passes, with the distances measured by a metric
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :param metric: the metric
+    :param parallel_min_points: windows with at least this many points are measured in parallel
+    :param stats: the stats buffer to fill in, or an empty array for no stats
+    :return: the number of windows that were checked
+    """
+    record_stats = stats.shape[0] > _stats_levels_start_
+    num_windows = windows.shape[0]
+    # the start, end and level of each pending window
+    stack = np.empty((max(num_windows, 64), 3), dtype=np.int64)
+    # push in reverse so the windows are processed in the given order
+    stack_size = 0
+    for wi in range(num_windows - 1, -1, -1):
+        # the window of an empty input ends before it starts and has no points to accept
+        if windows[wi, 1] < windows[wi, 0]:
+            continue
+        stack[stack_size, 0] = windows[wi, 0]
+        stack[stack_size, 1] = windows[wi, 1]
+        stack[stack_size, 2] = 0
+        stack_size += 1
+
+    num_checked = 0
+    while stack_size > 0:
+        stack_size -= 1
+        start = stack[stack_size, 0]
+        end = stack[stack_size, 1]
+        level = stack[stack_size, 2]
+        num_checked += 1
+        if record_stats:
+            _record_window_stats(stats, start, end, level, max(end - start - 1, 0))
+        if end - start < 2:
+            ok = True
+            arg_max = 0
+        elif end - start + 1 >= parallel_min_points:
+            val_max, arg_max = _metric_max_distance_parallel(p_array, start, end, metric)
+            ok = not val_max > epsilon
+        else:
+            val_max, arg_max = _metric_max_distance(p_array, start, end, start + 1, end, metric)
+            ok = not val_max > epsilon
+
+        if ok:
+            p_array_ok[start] = True
+            p_array_ok[end] = True
+        else:
+            if stack_size + 2 > stack.shape[0]:
+                new_stack = np.empty((stack.shape[0] * 2, 3), dtype=np.int64)
+                new_stack[:stack_size, :] = stack[:stack_size, :]
+                stack = new_stack
+            stack[stack_size, 0] = arg_max
+            stack[stack_size, 1] = end
+            stack[stack_size, 2] = level + 1
+            stack[stack_size + 1, 0] = start
+            stack[stack_size + 1, 1] = arg_max
+            stack[stack_size + 1, 2] = level + 1
+            stack_size += 2
+    return num_checked
+
+
+def check_windows_metric(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                         p_array_ok: npt.NDArray[bool], metric: typing.Callable,
+                         stats: typing.Union[npt.NDArray[np.int64], None] = None, parallel: bool = True) -> int:
+    """
+    The same as check_windows_compiled with the distances measured by a metric
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices
+    :param p_array_ok: Which points are accepted, updated in place
+    :param metric: the metric, a numba.njit function metric(p_array, start, end, i) -> float
+    :param stats: the zeroed stats buffer to fill in (see _stats_levels_start_)
+    :param parallel: measure large windows in parallel (as check_windows_compiled), False to stay on the calling
+                     thread (as check_windows_serial)
+    :return: the number of windows that were checked
+    """
+    check_metric(metric)
+    metric = _specialise_metric(metric, p_array.shape[1])
+    parallel_min_points = _parallel_window_min_points_ if parallel else p_array.shape[0] + 1
+    if stats is None:
+        stats = np.empty(0, dtype=np.int64)
+    return _check_windows_metric(p_array, float(epsilon), windows, p_array_ok, metric, parallel_min_points, stats)
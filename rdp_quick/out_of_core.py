@@ -0,0 +1,88 @@
+import numpy as np
+import numpy.typing as npt
+import os
+import struct
+import typing
+from rdp_quick.stream import RdpStream
+
+# the bytes reserved at the start of an output .npy file, large enough for any shape
+_npy_header_size_ = 128
+
+
+def _npy_header(dtype: np.dtype, shape: typing.Tuple[int, ...]) -> bytes:
+    """
+    Builds a version 1.0 .npy header padded to _npy_header_size_ bytes so it can be rewritten once the shape is known
+    :param dtype: the dtype of the array
+    :param shape: the shape of the array
+    :return: the header bytes
+    """
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}".format(
+        np.lib.format.dtype_to_descr(np.dtype(dtype)), tuple(shape))
+    magic = np.lib.format.magic(1, 0)
+    header_len = _npy_header_size_ - len(magic) - 2
+    header = header.ljust(header_len - 1) + "\n"
+    return magic + struct.pack("<H", header_len) + header.encode("latin1")
+
+
+def open_points(source: typing.Union[str, os.PathLike, npt.NDArray], num_columns: typing.Union[int, None] = None,
+                dtype: npt.DTypeLike = np.float64) -> npt.NDArray:
+    """
+    Opens the points without reading them into memory
+    :param source: an array (for example a np.memmap), a path to a .npy file or a path to a raw binary file
+    :param num_columns: the number of columns of a raw binary file
+    :param dtype: the dtype of a raw binary file
+    :return: the points as a memory mapped array (or source if it is already an array)
+    """
+    if isinstance(source, np.ndarray):
+        return source
+    source = os.fspath(source)
+    if source.endswith(".npy"):
+        return np.load(source, mmap_mode="r")
+    if num_columns is None:
+        raise ValueError("num_columns must be given for raw binary files")
+    return np.memmap(source, dtype=dtype, mode="r").reshape(-1, num_columns)
+
+
+def rdp_file(source: typing.Union[str, os.PathLike, npt.NDArray], epsilon: float, points_per_window: int,
+             output_path: typing.Union[str, os.PathLike], return_indices: bool = False,
+             chunk_points: int = 1 << 20, num_columns: typing.Union[int, None] = None,
+             dtype: npt.DTypeLike = np.float64) -> int:
+    """
+    Computes the new points of a data set that does not fit in memory.  The points are read sequentially one chunk
+    at a time and simplified with windows of points_per_window points (see RdpStream), the accepted points are
+    written to output_path as they are found.
+
+    If output_path ends with .npy a .npy file is written, otherwise the raw values are written
+    :param source: an array (for example a np.memmap), a path to a .npy file or a path to a raw binary file
+    :param epsilon: the threshold
+    :param points_per_window: the number of points per window
+    :param output_path: the file to write the accepted points (or indices) to
+    :param return_indices: write the int64 indices of the accepted points instead of the points
+    :param chunk_points: the number of points read at a time
+    :param num_columns: the number of columns of a raw binary source
+    :param dtype: the dtype of a raw binary source
+    :return: the number of accepted points
+    """
+    p_array = open_points(source, num_columns=num_columns, dtype=dtype)
+    out_dtype = np.dtype(np.int64) if return_indices else p_array.dtype
+    write_npy = os.fspath(output_path).endswith(".npy")
+    stream = RdpStream(epsilon, points_per_window, return_indices=return_indices)
+    num_ok = 0
+    with open(output_path, "wb") as fh:
+        if write_npy:
+            fh.write(_npy_header(out_dtype, (0,)))
+
+        def write(kept):
+            fh.write(np.ascontiguousarray(kept, dtype=out_dtype).tobytes())
+            return len(kept)
+
+        for start in range(0, p_array.shape[0], chunk_points):
+            num_ok += write(stream.feed(p_array[start:start + chunk_points]))
+        if p_array.shape[0] > 0:
+            num_ok += write(stream.flush())
+
+        if write_npy:
+            shape = (num_ok,) if return_indices else (num_ok, p_array.shape[1])
+            fh.seek(0)
+            fh.write(_npy_header(out_dtype, shape))
+    return num_ok
@@ -0,0 +1,73 @@
+import numpy as np
+import numpy.typing as npt
+from numba import boolean, int64
+import typing
+from rdp_quick.jit import lazy_njit
+
+
+@lazy_njit(int64(boolean[:], int64[:]))
+def mask_to_indices(p_array_ok: npt.NDArray[bool], out: npt.NDArray[np.int64]) -> int:
+    """
+    Writes the indices of the accepted points into out without any temporary arrays
+    :param p_array_ok: Which points are accepted
+    :param out: the buffer to write the indices to, must be at least as long as the number of accepted points
+    :return: the number of accepted points
+    """
+    num_ok = 0
+    for i in range(p_array_ok.shape[0]):
+        if p_array_ok[i]:
+            out[num_ok] = i
+            num_ok += 1
+    return num_ok
+
+
+def get_mask_buffer(num_points: int, return_mask: bool, return_indices: bool,
+                    out: typing.Union[npt.NDArray, None]) -> npt.NDArray[bool]:
+    """
+    Gets the zeroed accepted points mask, when the mask is the output and out is given out is used as the mask
+    :param num_points: the total number of points
+    :param return_mask: if the mask is the output
+    :param return_indices: if the indices are the output
+    :param out: the caller provided output buffer or None
+    :return: the mask to fill
+    """
+    if return_mask and return_indices:
+        raise ValueError("only one of return_mask and return_indices can be set")
+    if return_mask and out is not None:
+        if out.dtype != np.bool_ or out.shape != (num_points,):
+            raise ValueError("out must be a bool array with one value per point when return_mask is set")
+        out[:] = False
+        return out
+    return np.zeros(num_points, dtype=bool)
+
+
+def build_output(p_array: npt.NDArray, p_array_ok: npt.NDArray[bool], return_mask: bool, return_indices: bool,
+                 out: typing.Union[npt.NDArray, None]) -> npt.NDArray:
+    """
+    Builds the requested output from the accepted points mask
+    :param p_array: the data points
+    :param p_array_ok: Which points are accepted
+    :param return_mask: return the mask
+    :param return_indices: return the indices of the accepted points
+    :param out: the caller provided output buffer or None, the returned array is then a view of out
+    :return: the mask, the indices or the down sampled points
+    """
+    if return_mask:
+        return p_array_ok
+    if return_indices:
+        if out is None:
+            return np.flatnonzero(p_array_ok)
+        if out.dtype != np.int64 or out.ndim != 1:
+            raise ValueError("out must be a 1D int64 array when return_indices is set")
+        num_ok = np.count_nonzero(p_array_ok)
+        if out.shape[0] < num_ok:
+            raise ValueError("out is too small, {} points were accepted".format(num_ok))
+        mask_to_indices(p_array_ok, out)
+        return out[:num_ok]
+    if out is None:
+        return p_array[p_array_ok]
+    num_ok = np.count_nonzero(p_array_ok)
+    if out.dtype != p_array.dtype or out.shape[1:] != p_array.shape[1:] or out.shape[0] < num_ok:
+        raise ValueError("out must have the dtype and columns of p_array and room for {} points".format(num_ok))
+    np.compress(p_array_ok, p_array, axis=0, out=out[:num_ok])
+    return out[:num_ok]
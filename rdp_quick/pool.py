@@ -0,0 +1,100 @@
+import asyncio
+import concurrent.futures
+import numba
+import numpy as np
+import numpy.typing as npt
+import threading
+import typing
+from rdp_quick.check_window import check_windows_serial
+from rdp_quick.output import get_mask_buffer, build_output
+
+# the executor used when none is given, created on first use
+_executor_ = None
+_executor_lock_ = threading.Lock()
+
+
+def get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """
+    :return: the thread pool shared by rdp_map and rdp_async, with one thread per numba thread
+    """
+    global _executor_
+    with _executor_lock_:
+        if _executor_ is None:
+            _executor_ = concurrent.futures.ThreadPoolExecutor(max_workers=numba.config.NUMBA_NUM_THREADS,
+                                                               thread_name_prefix="rdp_quick")
+        return _executor_
+
+
+def shutdown_executor(wait: bool = True):
+    """
+    Shuts down the shared thread pool, a new one is created the next time it is needed
+    :param wait: wait for the running simplifications to finish
+    """
+    global _executor_
+    with _executor_lock_:
+        executor = _executor_
+        _executor_ = None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+def rdp_threadsafe(p_array: npt.NDArray[float], epsilon: float,
+                   initial_windows: typing.Union[typing.List[typing.Tuple[int, int]], None] = None,
+                   return_mask: bool = False, return_indices: bool = False,
+                   out: typing.Union[npt.NDArray, None] = None) -> npt.NDArray:
+    """
+    Computes the new points on the calling thread only (see check_windows_serial).  It can be called from any number
+    of threads at once and the GIL is released while the windows are checked, so independent polylines scale with
+    the number of threads
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
+    :param epsilon: the threshold (must be of type float64)
+    :param initial_windows: the initial windows, by default one window over all the points
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :return: The down sampled points (or the mask or indices)
+    """
+    if initial_windows is None:
+        initial_windows = [(0, len(p_array)-1)]
+    p_array_ok = get_mask_buffer(p_array.shape[0], return_mask, return_indices, out)
+    windows = np.asarray(initial_windows, dtype=np.int64).reshape(-1, 2)
+    check_windows_serial(p_array, epsilon, windows, p_array_ok)
+    return build_output(p_array, p_array_ok, return_mask, return_indices, out)
+
+
+def rdp_map(p_arrays: typing.Iterable[npt.NDArray[float]], epsilon: float,
+            return_mask: bool = False, return_indices: bool = False,
+            executor: typing.Union[concurrent.futures.Executor, None] = None) -> typing.List[npt.NDArray]:
+    """
+    Computes the new points of many independent polylines concurrently, each with one window over all of its points
+    :param p_arrays: the data points of each polyline
+    :param epsilon: the threshold (must be of type float64)
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param executor: the thread pool to use, by default the shared one (see get_executor)
+    :return: The down sampled points (or the mask or indices) of each polyline, in the same order
+    """
+    executor = executor if executor is not None else get_executor()
+    futures = [executor.submit(rdp_threadsafe, p_array, epsilon, return_mask=return_mask,
+                               return_indices=return_indices) for p_array in p_arrays]
+    return [future.result() for future in futures]
+
+
+async def rdp_async(p_array: npt.NDArray[float], epsilon: float,
+                    initial_windows: typing.Union[typing.List[typing.Tuple[int, int]], None] = None,
+                    return_mask: bool = False, return_indices: bool = False,
+                    executor: typing.Union[concurrent.futures.Executor, None] = None) -> npt.NDArray:
+    """
+    Awaitable rdp_threadsafe, run on a thread pool so the event loop is not blocked
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
+    :param epsilon: the threshold (must be of type float64)
+    :param initial_windows: the initial windows, by default one window over all the points
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param executor: the thread pool to use, by default the shared one (see get_executor)
+    :return: The down sampled points (or the mask or indices)
+    """
+    executor = executor if executor is not None else get_executor()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, lambda: rdp_threadsafe(
+        p_array, epsilon, initial_windows=initial_windows, return_mask=return_mask, return_indices=return_indices))
@@ -0,0 +1,128 @@
+import numpy as np
+import numpy.typing as npt
+from numba import prange, float64, int64, boolean
+from rdp_quick.check_window import _check_windows_stack, _no_evaluation_limit_
+from rdp_quick.compute_distance import _rdp_quick_point_types_
+from rdp_quick.jit import lazy_njit
+
+# a seam is simplified again from this many accepted points before it to this many accepted points after it
+_seam_neighbours_ = 4
+
+
+@lazy_njit([int64(pt[:, :], float64, int64, int64, int64, boolean[:]) for pt in _rdp_quick_point_types_])
+def _repair_seam(p_array: npt.NDArray, epsilon: float, seam: int, low: int, high: int,
+                 p_array_ok: npt.NDArray[bool]) -> int:
+    """
+    Simplifies the points around one seam again as a single window, from the _seam_neighbours_-th accepted point
+    before the seam to the one after it (but not past low or high).  The new points are only used if there are fewer
+    of them
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param seam: the index of the seam
+    :param low: the first point that can be part of the window
+    :param high: the last point that can be part of the window
+    :param p_array_ok: Which points are accepted, updated in place
+    :return: the number of accepted points removed
+    """
+    if not p_array_ok[seam]:
+        return 0
+    start = -1
+    num_found = 0
+    for i in range(seam - 1, low - 1, -1):
+        if p_array_ok[i]:
+            start = i
+            num_found += 1
+            if num_found == _seam_neighbours_:
+                break
+    end = -1
+    num_found = 0
+    for i in range(seam + 1, high + 1):
+        if p_array_ok[i]:
+            end = i
+            num_found += 1
+            if num_found == _seam_neighbours_:
+                break
+    if start < 0 or end < 0:
+        return 0
+
+    window = np.empty((1, 2), dtype=np.int64)
+    window[0, 0] = 0
+    window[0, 1] = end - start
+    span_ok = np.zeros(end - start + 1, dtype=np.bool_)
+    _check_windows_stack(p_array[start:end + 1, :], epsilon, window, span_ok, p_array.shape[0] + 1,
+                         np.empty(0, dtype=np.int64), _no_evaluation_limit_)
+    num_before = 0
+    num_after = 0
+    for i in range(end - start + 1):
+        num_before += p_array_ok[start + i]
+        num_after += span_ok[i]
+    if num_after >= num_before:
+        return 0
+    for i in range(end - start + 1):
+        p_array_ok[start + i] = span_ok[i]
+    return num_before - num_after
+
+
+@lazy_njit([int64(pt[:, :], float64, int64[:], int64[:], int64[:], boolean[:]) for pt in _rdp_quick_point_types_],
+           parallel=True)
+def _repair_seams(p_array: npt.NDArray, epsilon: float, seams: npt.NDArray[np.int64], lows: npt.NDArray[np.int64],
+                  highs: npt.NDArray[np.int64], p_array_ok: npt.NDArray[bool]) -> int:
+    """
+    Repairs every seam with _repair_seam in rounds.  Each round repairs every other remaining seam in parallel, with
+    the points around a seam limited to between the remaining seams either side of it (which are not changed in that
+    round), so no two threads touch the same points.  The other half of the seams are left for the next round, where
+    they have twice as much room
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param seams: the sorted seams
+    :param lows: the first point of the windows joined by each seam
+    :param highs: the last point of the windows joined by each seam
+    :param p_array_ok: Which points are accepted, updated in place
+    :return: the number of accepted points removed
+    """
+    num_removed = 0
+    remaining = np.arange(seams.shape[0])
+    while remaining.shape[0] > 0:
+        num_remaining = remaining.shape[0]
+        num_repaired = (num_remaining + 1) // 2
+        round_removed = np.zeros(num_repaired, dtype=np.int64)
+        for ri in prange(num_repaired):
+            si = remaining[2 * ri]
+            low = lows[si]
+            if 2 * ri > 0:
+                low = max(low, seams[remaining[2 * ri - 1]])
+            high = highs[si]
+            if 2 * ri + 1 < num_remaining:
+                high = min(high, seams[remaining[2 * ri + 1]])
+            round_removed[ri] = _repair_seam(p_array, epsilon, seams[si], low, high, p_array_ok)
+        num_removed += round_removed.sum()
+        remaining = remaining[1::2].copy()
+    return num_removed
+
+
+def repair_window_seams(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                        p_array_ok: npt.NDArray[bool]) -> int:
+    """
+    Removes the points that are only accepted because they are a seam, the end of one initial window and the start of
+    the next.  The points around each seam are simplified again as one window, from the _seam_neighbours_-th accepted
+    point before it to the one after it, and the result is kept when it has fewer points.  Every point is still within
+    epsilon of the down sampled line
+    :param p_array: The data points (2D, float64, float32, int64 or int32)
+    :param epsilon: The threshold (must be of type float64)
+    :param windows: the initial windows as an (num_windows, 2) int64 array of start and end indices, already checked
+    :param p_array_ok: Which points are accepted, updated in place
+    :return: the number of accepted points removed
+    """
+    windows = np.asarray(windows, dtype=np.int64).reshape(-1, 2)
+    seams = np.intersect1d(windows[:, 0], windows[:, 1])
+    if len(seams) == 0:
+        return 0
+    # the points around a seam never leave the run of joined windows it is in, points outside the windows stay as
+    # they are
+    windows = windows[np.argsort(windows[:, 0], kind="stable")]
+    run_ends = np.maximum.accumulate(windows[:, 1])
+    run_ids = np.cumsum(np.append(True, windows[1:, 0] > run_ends[:-1])) - 1
+    run_lows = windows[np.searchsorted(run_ids, np.arange(run_ids[-1] + 1)), 0]
+    run_highs = np.maximum.reduceat(windows[:, 1], np.searchsorted(run_ids, np.arange(run_ids[-1] + 1)))
+    seam_runs = run_ids[np.searchsorted(windows[:, 0], seams)]
+    return int(_repair_seams(p_array, float(epsilon), seams, run_lows[seam_runs], run_highs[seam_runs], p_array_ok))
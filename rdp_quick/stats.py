@@ -0,0 +1,148 @@
+import numpy as np
+import numpy.typing as npt
+import time
+import typing
+from rdp_quick.check_window import check_windows_levels_stats, _stats_num_evaluations_, _stats_largest_window_, \
+    _stats_num_levels_, _stats_num_hull_windows_, _stats_levels_start_
+from rdp_quick.hull import check_windows_auto_stats
+from rdp_quick.metrics import check_windows_metric
+from rdp_quick.output import get_mask_buffer, build_output
+from rdp_quick.seams import repair_window_seams
+
+# the most levels counted one by one, the windows of any deeper levels are added to the last level
+_stats_max_levels_ = 1 << 16
+
+
+class RdpStats:
+    """
+    The statistics of one simplification.  Pass an instance as the stats argument of the rdp_* functions and it is
+    filled in by the call, when stats is not given nothing is measured.
+
+    A level is the number of splits above a window, the initial windows are level 0.  The depth first path uses the
+    same engines as without stats (see check_windows_auto), the windows checked with the hull tree are counted in
+    num_hull_windows and not in num_distance_evaluations
+    """
+
+    def __init__(self, callback: typing.Union[typing.Callable[[dict], typing.Any], None] = None):
+        """
+        :param callback: called with to_dict() at the end of every call the stats are passed to
+        """
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the statistics
+        """
+        self.num_points = 0
+        self.num_dims = 0
+        self.num_initial_windows = 0
+        self.num_windows_checked = 0
+        self.num_levels = 0
+        self.windows_per_level = list()
+        self.num_distance_evaluations = 0
+        self.num_hull_windows = 0
+        self.largest_window = 0
+        self.num_accepted = 0
+        self.num_seam_points_removed = 0
+        self.planning_seconds = 0.0
+        self.kernel_seconds = 0.0
+        self.gather_seconds = 0.0
+        self._start = None
+
+    def begin(self):
+        """
+        Starts timing the window planning, does nothing if already started by the calling function
+        """
+        if self._start is None:
+            self.reset()
+            self._start = time.perf_counter()
+
+    def end(self):
+        """
+        Stops timing at the end of a call (or when it raised), the next call starts again from begin
+        """
+        self._start = None
+
+    @property
+    def total_seconds(self) -> float:
+        """
+        :return: the time spent in planning, the distance kernels and gathering the output
+        """
+        return self.planning_seconds + self.kernel_seconds + self.gather_seconds
+
+    def to_dict(self) -> dict:
+        """
+        :return: the statistics as a dict of plain python values (for example to log as json)
+        """
+        return dict(num_points=self.num_points, num_dims=self.num_dims,
+                    num_initial_windows=self.num_initial_windows, num_windows_checked=self.num_windows_checked,
+                    num_levels=self.num_levels, windows_per_level=list(self.windows_per_level),
+                    num_distance_evaluations=self.num_distance_evaluations, num_hull_windows=self.num_hull_windows,
+                    largest_window=self.largest_window,
+                    num_accepted=self.num_accepted, num_seam_points_removed=self.num_seam_points_removed,
+                    planning_seconds=self.planning_seconds,
+                    kernel_seconds=self.kernel_seconds, gather_seconds=self.gather_seconds,
+                    total_seconds=self.total_seconds)
+
+    def __repr__(self) -> str:
+        return "RdpStats({})".format(", ".join("{}={!r}".format(k, v) for k, v in self.to_dict().items()))
+
+
+def rdp_initial_windows_stats(p_array: npt.NDArray, epsilon: float, windows: npt.NDArray[np.int64],
+                              return_mask: bool, return_indices: bool, out: typing.Union[npt.NDArray, None],
+                              breadth_first: bool, stats: RdpStats,
+                              metric: typing.Union[typing.Callable, None] = None,
+                              repair_seams: bool = False) -> npt.NDArray:
+    """
+    rdp_initial_windows with the statistics measured
+    :param p_array: the data points (2D, float64, float32, int64 or int32)
+    :param epsilon: the threshold (must be of type float64)
+    :param windows: the initial windows
+    :param return_mask: return the mask of the accepted points instead of the points
+    :param return_indices: return the indices of the accepted points instead of the points
+    :param out: optional buffer to write the output to, the returned array is then a view of out
+    :param breadth_first: check each level of windows in one parallel pass (see check_windows_levels)
+    :param stats: the statistics to fill in
+    :param metric: measure the distances with this numba.njit function (see rdp_quick.metrics)
+    :param repair_seams: remove the window end points that are not needed (see repair_window_seams)
+    :return: The down sampled points (or the mask or indices)
+    """
+    stats.begin()
+    try:
+        p_array_ok = get_mask_buffer(p_array.shape[0], return_mask, return_indices, out)
+        windows = np.asarray(windows, dtype=np.int64).reshape(-1, 2)
+        buffer = np.zeros(_stats_levels_start_ + min(max(p_array.shape[0], 1), _stats_max_levels_), dtype=np.int64)
+
+        kernel_start = time.perf_counter()
+        if metric is not None:
+            num_checked = check_windows_metric(p_array, epsilon, windows, p_array_ok, metric, buffer)
+        elif breadth_first:
+            num_checked = check_windows_levels_stats(p_array, epsilon, windows, p_array_ok, buffer)
+        else:
+            num_checked = check_windows_auto_stats(p_array, epsilon, windows, p_array_ok, buffer)
+        num_seam_points_removed = repair_window_seams(p_array, epsilon, windows, p_array_ok) if repair_seams else 0
+        gather_start = time.perf_counter()
+        result = build_output(p_array, p_array_ok, return_mask, return_indices, out)
+        end = time.perf_counter()
+
+        num_levels = int(buffer[_stats_num_levels_])
+        stats.num_points = p_array.shape[0]
+        stats.num_dims = p_array.shape[1]
+        stats.num_initial_windows = windows.shape[0]
+        stats.num_windows_checked = int(num_checked)
+        stats.num_levels = num_levels
+        stats.windows_per_level = buffer[_stats_levels_start_:_stats_levels_start_ + num_levels].tolist()
+        stats.num_distance_evaluations = int(buffer[_stats_num_evaluations_])
+        stats.num_hull_windows = int(buffer[_stats_num_hull_windows_])
+        stats.largest_window = int(buffer[_stats_largest_window_])
+        stats.num_accepted = int(np.count_nonzero(p_array_ok))
+        stats.num_seam_points_removed = num_seam_points_removed
+        stats.planning_seconds = kernel_start - stats._start
+        stats.kernel_seconds = gather_start - kernel_start
+        stats.gather_seconds = end - gather_start
+    finally:
+        stats.end()
+    if stats.callback is not None:
+        stats.callback(stats.to_dict())
+    return result
@@ -0,0 +1,105 @@
+import numpy as np
+import numpy.typing as npt
+import typing
+from rdp_quick.check_window import check_windows_compiled
+
+
+class RdpStream:
+    """
+    Simplifies an unbounded stream of points with bounded memory.
+
+    The stream is split into windows of points_per_window points (the window boundaries are always kept, as with
+    rdp_points_per_window).  Once a window is complete it is simplified and its accepted points are returned, so only
+    the points of the current unfinished window are held between calls to feed.
+
+    The accepted points are the same as calling rdp_initial_windows on the whole stream with the windows
+    (0, points_per_window), (points_per_window, 2 * points_per_window), ... with the last window ending on the
+    last point
+    """
+
+    def __init__(self, epsilon: float, points_per_window: int, return_indices: bool = False):
+        """
+        :param epsilon: the threshold
+        :param points_per_window: the number of points per window (must be at least 1)
+        :param return_indices: return the indices of the accepted points in the stream instead of the points
+        """
+        if points_per_window < 1:
+            raise ValueError("points_per_window must be at least 1")
+        self.epsilon = float(epsilon)
+        self.points_per_window = int(points_per_window)
+        self.return_indices = return_indices
+        self._tail = None
+        self._tail_start = 0
+
+    @property
+    def num_pending(self) -> int:
+        """
+        :return: the number of points held that are not yet finalised
+        """
+        return 0 if self._tail is None else len(self._tail)
+
+    def _emit(self, p_array: npt.NDArray[float], p_array_ok: npt.NDArray[bool]) -> npt.NDArray:
+        """
+        :param p_array: the finalised points starting at the start of the tail
+        :param p_array_ok: Which of the points are accepted
+        :return: the accepted points or their indices in the stream
+        """
+        if self.return_indices:
+            return np.flatnonzero(p_array_ok) + self._tail_start
+        return p_array[p_array_ok]
+
+    def feed(self, chunk: npt.NDArray[float]) -> npt.NDArray:
+        """
+        Adds points to the stream
+        :param chunk: the new points (2D with the same number of columns and dtype for every chunk)
+        :return: the points (or indices) that are now finalised and accepted
+        """
+        # always copied so read only chunks (for example from a memory mapped file) can be used
+        if self._tail is None:
+            p_array = np.array(chunk)
+        else:
+            p_array = np.concatenate([self._tail, np.asarray(chunk, dtype=self._tail.dtype)])
+        num_windows = (len(p_array) - 1) // self.points_per_window
+        if num_windows < 1:
+            self._tail = p_array
+            return self._emit(p_array[:0], np.zeros(0, dtype=bool))
+
+        last_boundary = num_windows * self.points_per_window
+        starts = np.arange(num_windows, dtype=np.int64) * self.points_per_window
+        windows = np.stack([starts, starts + self.points_per_window], axis=1)
+        p_array_ok = np.zeros(last_boundary + 1, dtype=bool)
+        check_windows_compiled(p_array, self.epsilon, windows, p_array_ok)
+
+        # the last boundary is also the start of the next window so it is emitted with that window
+        kept = self._emit(p_array[:last_boundary], p_array_ok[:last_boundary])
+        self._tail = np.ascontiguousarray(p_array[last_boundary:])
+        self._tail_start += last_boundary
+        return kept
+
+    def flush(self) -> npt.NDArray:
+        """
+        Finishes the stream by simplifying the points still held, the stream can then be reused
+        :return: the remaining accepted points (or indices)
+        """
+        if self._tail is None or len(self._tail) == 0:
+            self._tail = None
+            self._tail_start = 0
+            return np.empty(0, dtype=np.int64) if self.return_indices else np.empty((0, 0))
+        p_array = self._tail
+        p_array_ok = np.zeros(len(p_array), dtype=bool)
+        windows = np.array([[0, len(p_array) - 1]], dtype=np.int64)
+        check_windows_compiled(p_array, self.epsilon, windows, p_array_ok)
+        kept = self._emit(p_array, p_array_ok)
+        self._tail = None
+        self._tail_start = 0
+        return kept
+
+    def simplify(self, chunks: typing.Iterable[npt.NDArray[float]]) -> typing.Iterator[npt.NDArray]:
+        """
+        Generator over an iterable of chunks yielding the accepted points as soon as they are finalised
+        :param chunks: the chunks of points
+        :return: an iterator over the accepted points (or indices) of each chunk and finally of the flush
+        """
+        for chunk in chunks:
+            yield self.feed(chunk)
+        yield self.flush()
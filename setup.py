@@ -18,5 +18,7 @@ setuptools.setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    install_requires=["numpy", "numba", "scipy"]                     # Install other dependencies if any
+    install_requires=["numpy", "numba", "scipy"],                    # Install other dependencies if any
+    extras_require={"arrow": ["pyarrow"]},
+    entry_points={"console_scripts": ["rdp-quick=rdp_quick.cli:main"]}
 )
\ No newline at end of file
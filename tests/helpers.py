@@ -0,0 +1,29 @@
+import numpy as np
+from rdp_quick.compute_distance import compute_max_distance
+
+
+def random_walk(num_points, num_dims=2, seed=0):
+    return np.cumsum(np.random.default_rng(seed).normal(size=(num_points, num_dims)), axis=0)
+
+
+def random_walks(num_lines, num_points=2000):
+    rng = np.random.default_rng(0)
+    return [np.cumsum(rng.normal(size=(num_points, 2)), axis=0) for _ in range(num_lines)]
+
+
+def sine(num_points, num_osc=50, seed=0):
+    x = np.arange(num_points) / num_points * num_osc * 2.0 * np.pi
+    noise = np.random.default_rng(seed).normal(scale=0.001, size=num_points)
+    return np.column_stack([x, np.sin(x) + noise])
+
+
+def max_error(p_arr, mask):
+    kept = np.flatnonzero(mask)
+    return max(compute_max_distance(p_arr[start], p_arr[end], p_arr[start + 1:end])[0]
+               for start, end in zip(kept[:-1], kept[1:]))
+
+
+def block_windows(num_points, points_per_window):
+    # the windows of RdpStream and rdp_file: (0, ppw), (ppw, 2 * ppw), ... ending on the last point
+    starts = list(range(0, num_points - 1, points_per_window))
+    return [(s, min(s + points_per_window, num_points - 1)) for s in starts]
@@ -0,0 +1,51 @@
+import numpy as np
+import numpy.testing as np_test
+import pytest
+import rdp_quick
+from rdp_quick.cli import main
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _lines():
+    rng = np.random.default_rng(0)
+    return [np.cumsum(rng.normal(size=(num_points, 2)), axis=0) for num_points in (50, 1, 0, 300, 2)]
+
+
+def _interleaved(lines):
+    return pa.array([line.tolist() for line in lines], type=pa.list_(pa.list_(pa.float64(), 2)))
+
+
+def test_rdp_arrow_interleaved():
+    lines = _lines()
+    result = rdp_quick.rdp_arrow(_interleaved(lines), 0.5)
+    assert result.type == pa.list_(pa.list_(pa.float64(), 2))
+    for line, simplified in zip(lines, result.to_pylist()):
+        expected = rdp_quick.rdp_single_initial_window(line, 0.5) if len(line) else line
+        np_test.assert_equal(np.array(simplified).reshape(-1, 2), expected)
+
+
+def test_rdp_arrow_separated_with_nulls_and_slice():
+    lines = _lines()
+    coords_type = pa.struct([("x", pa.float64()), ("y", pa.float64())])
+    rows = [[{"x": x, "y": y} for x, y in line] for line in lines]
+    rows.insert(2, None)
+    array = pa.array(rows, type=pa.large_list(coords_type)).slice(1)
+    result = rdp_quick.rdp_arrow(array, 0.5)
+    assert result.type == array.type
+    assert result.null_count == 1
+    assert result[1].as_py() is None
+    simplified = result[3].as_py()
+    np_test.assert_equal(np.array([[c["x"], c["y"]] for c in simplified]),
+                         rdp_quick.rdp_single_initial_window(lines[3], 0.5))
+
+
+def test_rdp_parquet_and_cli(tmp_path):
+    lines = _lines()
+    table = pa.table({"id": np.arange(len(lines)), "geometry": _interleaved(lines)})
+    pq.write_table(table, tmp_path / "in.parquet", row_group_size=2)
+    assert main([str(tmp_path / "in.parquet"), str(tmp_path / "out.parquet"), "--epsilon", "0.5"]) == 0
+    result = pq.read_table(tmp_path / "out.parquet")
+    assert result.column("id").to_pylist() == list(range(len(lines)))
+    assert result.column("geometry").to_pylist() == rdp_quick.rdp_arrow(table.column("geometry"), 0.5).to_pylist()
@@ -0,0 +1,117 @@
+import json
+import numba
+import numpy as np
+import numpy.testing as np_test
+import pytest
+import rdp_quick
+import rdp_quick.auto
+from rdp_quick import RdpStats, plan_rdp
+from tests.helpers import max_error, sine
+
+
+def _cost_model(seconds_per_level=1e-5, seconds_per_seam=1e-6):
+    return dict(version=rdp_quick.auto._tuning_version_, num_threads=numba.get_num_threads(), dims=[2, 4],
+                seconds_per_evaluation={"depth_first": [2e-9, 4e-9], "breadth_first": [2e-9, 4e-9]},
+                seconds_per_level=seconds_per_level, seconds_per_seam=seconds_per_seam)
+
+
+def test_tune_and_load(tmp_path):
+    path = tmp_path / "tuning.json"
+    cost_model = rdp_quick.tune_cost_model(path, num_points=1 << 12)
+    assert cost_model["num_threads"] == numba.get_num_threads()
+    assert all(cost > 0 for costs in cost_model["seconds_per_evaluation"].values() for cost in costs)
+    assert rdp_quick.load_cost_model(path) == json.loads(path.read_text())
+
+
+def test_load_uses_default_without_tuning_file(tmp_path, monkeypatch):
+    path = tmp_path / "rdp_quick" / "tuning.json"
+    monkeypatch.setenv("RDP_QUICK_TUNING_FILE", str(path))
+    monkeypatch.setattr(rdp_quick.auto, "_cost_model_", None)
+    monkeypatch.setattr(rdp_quick.auto, "_rdp_quick_autotune_", False)
+    monkeypatch.setattr(rdp_quick.auto, "tune_cost_model", lambda tuning_path: pytest.fail("measured without opt in"))
+    cost_model = rdp_quick.load_cost_model()
+    assert cost_model == rdp_quick.auto._default_cost_model(numba.get_num_threads())
+    assert not path.exists()
+
+
+def test_load_tunes_once(tmp_path, monkeypatch):
+    path = tmp_path / "rdp_quick" / "tuning.json"
+    monkeypatch.setenv("RDP_QUICK_TUNING_FILE", str(path))
+    monkeypatch.setattr(rdp_quick.auto, "_cost_model_", None)
+    monkeypatch.setattr(rdp_quick.auto, "_rdp_quick_autotune_", True)
+    calls = list()
+
+    def tune(tuning_path):
+        calls.append(tuning_path)
+        return rdp_quick.tune_cost_model(tuning_path, num_points=1 << 12)
+
+    monkeypatch.setattr(rdp_quick.auto, "tune_cost_model", tune)
+    assert rdp_quick.get_tuning_path() == str(path)
+    first = rdp_quick.load_cost_model()
+    assert calls == [str(path)] and path.exists()
+    # read from the file by a new process
+    monkeypatch.setattr(rdp_quick.auto, "_cost_model_", None)
+    assert rdp_quick.load_cost_model() == first
+    assert len(calls) == 1
+    # measured again when the file was made for another number of threads
+    path.write_text(json.dumps(dict(first, num_threads=first["num_threads"] + 1)))
+    monkeypatch.setattr(rdp_quick.auto, "_cost_model_", None)
+    rdp_quick.load_cost_model()
+    assert len(calls) == 2
+
+
+def test_tune_warns_when_save_fails(tmp_path):
+    (tmp_path / "not_a_directory").write_text("")
+    with pytest.warns(RuntimeWarning):
+        rdp_quick.tune_cost_model(tmp_path / "not_a_directory" / "tuning.json", num_points=1 << 12)
+
+
+def test_default_cost_model_uses_the_threads(tmp_path, monkeypatch):
+    monkeypatch.setenv("RDP_QUICK_TUNING_FILE", str(tmp_path / "tuning.json"))
+    monkeypatch.setattr(rdp_quick.auto, "_rdp_quick_autotune_", False)
+    p_arr = sine(1 << 18)
+    plans = dict()
+    for num_threads in (1, 8):
+        monkeypatch.setattr(numba, "get_num_threads", lambda: num_threads)
+        monkeypatch.setattr(rdp_quick.auto, "_cost_model_", None)
+        plans[num_threads] = plan_rdp(p_arr, 0.01)
+    assert not plans[1]["breadth_first"]
+    assert plans[8]["breadth_first"]
+
+
+def test_plan_small_input():
+    plan = plan_rdp(sine(1000), 0.01, _cost_model())
+    assert plan["points_per_window"] is None and not plan["breadth_first"] and not plan["repair_seams"]
+
+
+def test_plan_pathological():
+    # the radius grows along the whole spiral so the sample from the middle is as bad as the rest
+    t = np.linspace(0.0, 1.0, 1 << 16)
+    angle = t * 2000.0 * np.pi
+    spiral = np.exp(5.0 * t)[:, None] * np.column_stack([np.cos(angle), np.sin(angle)])
+    plan = plan_rdp(spiral, 1e-6, _cost_model())
+    assert plan["pathological"]
+    assert plan["points_per_window"] is None and not plan["breadth_first"]
+
+
+def test_plan_uses_cost_model():
+    p_arr = sine(1 << 20)
+    plan = plan_rdp(p_arr, 0.01, _cost_model())
+    assert plan["points_per_window"] is not None and plan["repair_seams"]
+    assert plan["predicted_seconds"]["one_window_depth_first"] > min(plan["predicted_seconds"].values())
+    # expensive levels favour depth first, expensive seams favour one window
+    assert not plan_rdp(p_arr, 0.01, _cost_model(seconds_per_level=1.0))["breadth_first"]
+    assert plan_rdp(p_arr, 0.01, _cost_model(seconds_per_seam=1.0))["points_per_window"] is None
+
+
+@pytest.mark.parametrize("num_points", [1000, 1 << 18])
+def test_rdp_auto(num_points):
+    p_arr = sine(num_points)
+    stats = RdpStats()
+    result = rdp_quick.rdp_auto(p_arr, 0.01, return_mask=True, stats=stats, cost_model=_cost_model())
+    single = rdp_quick.rdp_single_initial_window(p_arr, 0.01, return_mask=True)
+    assert max_error(p_arr, result) <= 0.01
+    assert result.sum() <= 1.1 * single.sum()
+    assert stats.num_accepted == result.sum()
+    np_test.assert_equal(rdp_quick.rdp_auto(p_arr, 0.01, return_indices=True, cost_model=_cost_model()),
+                         np.flatnonzero(result))
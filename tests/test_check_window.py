@@ -1,6 +1,7 @@
 import numpy as np
 import numpy.testing as np_test
-from rdp_quick.check_window import check_windows, check_window
+from rdp_quick.check_window import check_windows, check_window, check_windows_compiled, check_windows_levels
+from rdp_quick.compute_distance import compute_distance
 
 
 def test_check_window_all_good():
@@ -61,3 +62,79 @@ def test_check_windows():
 
     np_test.assert_equal(p_arr_ok, p_arr_ok_gt)
     assert new_windows_gt == new_windows
+
+
+def test_check_windows_compiled():
+    epsilon = 1.0
+    p_arr = np.array([
+        [0.0, 0.0],
+        [1.0, 10.0],
+        [1.0, 20.0],
+        [2.0, 0.0],
+        [3.0, 0.0],
+        [4.0, 0.0],
+        [5.0, 0.0],
+    ])
+    windows = np.array([[0, 3], [3, 6]], dtype=np.int64)
+    p_arr_ok = np.zeros(len(p_arr)).astype(bool)
+    num_checked = check_windows_compiled(p_arr, epsilon, windows, p_arr_ok)
+
+    p_arr_ok_gt = np.zeros(len(p_arr)).astype(bool)
+    p_arr_ok_gt[np.array([0, 2, 3, 6])] = True
+
+    np_test.assert_equal(p_arr_ok, p_arr_ok_gt)
+    assert num_checked == 4
+
+
+def test_check_windows_compiled_skips_empty_windows():
+    p_arr = np.zeros((6, 2))
+    windows = np.array([[0, 2], [5, 4]], dtype=np.int64)
+    for check_func in (check_windows_compiled, check_windows_levels):
+        p_arr_ok = np.zeros(len(p_arr)).astype(bool)
+        assert check_func(p_arr, 1.0, windows, p_arr_ok) == 1
+        np_test.assert_equal(np.flatnonzero(p_arr_ok), [0, 2])
+    p_arr_ok = np.zeros(0).astype(bool)
+    assert check_windows_compiled(p_arr[:0], 1.0, np.array([[0, -1]], dtype=np.int64), p_arr_ok) == 0
+
+
+def test_check_windows_compiled_matches_check_windows():
+    rng = np.random.default_rng(0)
+    epsilon = 0.05
+    for num_dims in (2, 3):
+        p_arr = np.cumsum(rng.normal(size=(2000, num_dims)), axis=0) * 0.1
+        p_arr[500:520] = p_arr[500]
+
+        p_arr_ok_gt = np.zeros(len(p_arr)).astype(bool)
+        windows = [(0, len(p_arr) - 1)]
+        while len(windows) > 0:
+            windows = check_windows(p_arr, epsilon, windows, p_arr_ok_gt)
+
+        p_arr_ok = np.zeros(len(p_arr)).astype(bool)
+        check_windows_compiled(p_arr, epsilon, np.array([[0, len(p_arr) - 1]], dtype=np.int64), p_arr_ok)
+        np_test.assert_equal(p_arr_ok, p_arr_ok_gt)
+
+
+def test_check_windows_levels_matches_check_windows_compiled():
+    rng = np.random.default_rng(0)
+    epsilon = 0.05
+    for num_dims in (2, 3):
+        p_arr = np.cumsum(rng.normal(size=(5000, num_dims)), axis=0) * 0.1
+        p_arr[500:520] = p_arr[500]
+        windows = np.array([[0, 1000], [1000, len(p_arr) - 1]], dtype=np.int64)
+
+        p_arr_ok_gt = np.zeros(len(p_arr)).astype(bool)
+        num_checked_gt = check_windows_compiled(p_arr, epsilon, windows, p_arr_ok_gt)
+
+        p_arr_ok = np.zeros(len(p_arr)).astype(bool)
+        num_checked = check_windows_levels(p_arr, epsilon, windows, p_arr_ok)
+        np_test.assert_equal(p_arr_ok, p_arr_ok_gt)
+        assert num_checked == num_checked_gt
+
+
+def test_check_window_large_matches_distances():
+    rng = np.random.default_rng(0)
+    p_arr = np.cumsum(rng.normal(size=(20000, 2)), axis=0)
+    distances = compute_distance(p_arr[0], p_arr[-1], p_arr[1:-1])
+    all_good, max_index = check_window(p_arr, 1.0)
+    assert not all_good
+    assert max_index == np.argmax(distances) + 1
@@ -1,6 +1,7 @@
 import numpy as np
 import numpy.testing as np_test
-from rdp_quick.compute_distance import compute_distance
+from rdp_quick import rdp_single_initial_window
+from rdp_quick.compute_distance import compute_distance, compute_max_distance
 
 
 def test_single_point():
@@ -42,3 +43,86 @@ def test_3d():
     distances = compute_distance(p1, p2, p_arr)
     distances_truth = np.array([0.0, 0.0, 0.0, 0.0, 1.0, 1.0])
     np_test.assert_equal(distances, distances_truth)
+
+
+def test_2d_float32_and_int():
+    p_arr = np.array([
+        [0, 0],
+        [1, 0],
+        [3, 0],
+        [1, 1],
+        [4, 1]
+    ])
+    distances_truth = np.array([0.0, 0.0, 0.0, 1.0, 1.0])
+    for dtype in (np.float32, np.int64, np.int32):
+        p_arr_typed = p_arr.astype(dtype)
+        distances = compute_distance(p_arr_typed[0], np.array([2, 0], dtype=dtype), p_arr_typed)
+        assert distances.dtype == np.float64
+        np_test.assert_equal(distances, distances_truth)
+
+
+def test_max_distance_matches_compute_distance():
+    rng = np.random.default_rng(0)
+    for num_dims in (2, 3):
+        p_arr = rng.normal(size=(1000, num_dims))
+        for p1, p2 in ((p_arr[0], p_arr[-1]), (p_arr[0], p_arr[0].copy())):
+            distances = compute_distance(p1, p2, p_arr)
+            val_max, arg_max = compute_max_distance(p1, p2, p_arr)
+            assert arg_max == np.argmax(distances)
+            np_test.assert_allclose(val_max, distances[arg_max], rtol=1e-14)
+
+
+def test_max_distance_no_points():
+    val_max, arg_max = compute_max_distance(np.array([0.0, 0.0]), np.array([1.0, 0.0]), np.zeros((0, 2)))
+    assert val_max < 0.0
+
+
+def test_nd():
+    p1 = np.array([0.0, 0.0, 1.0, 0.0, 5.0])
+    p2 = np.array([2.0, 0.0, 1.0, 0.0, 5.0])
+    p_arr = np.array([
+        [1.0, 0.0, 1.0, 0.0, 5.0],
+        [3.0, 0.0, 1.0, 0.0, 5.0],
+        [1.0, 1.0, 1.0, 0.0, 5.0],
+        [4.0, 0.0, 1.0, 3.0, 9.0],
+    ])
+    distances = compute_distance(p1, p2, p_arr)
+    distances_truth = np.array([0.0, 0.0, 1.0, 5.0])
+    np_test.assert_equal(distances, distances_truth)
+    val_max, arg_max = compute_max_distance(p1, p2, p_arr)
+    assert val_max == 5.0
+    assert arg_max == 3
+
+
+def test_nd_matches_3d():
+    rng = np.random.default_rng(0)
+    p_arr = rng.normal(size=(100, 3))
+    distances_3d = compute_distance(p_arr[0], p_arr[-1], p_arr)
+    p_arr_nd = np.hstack([p_arr, np.ones((100, 2))])
+    distances_nd = compute_distance(p_arr_nd[0], p_arr_nd[-1], p_arr_nd)
+    np_test.assert_allclose(distances_nd, distances_3d, rtol=1e-9, atol=1e-12)
+
+
+def _reference_rdp_mask(p_arr, epsilon):
+    # the distances as the first release computed them, norm(cross) / norm(delta) and the first maximum
+    p_arr = p_arr.astype(np.float64)
+    p_arr_ok = np.zeros(len(p_arr), dtype=bool)
+    windows = [(0, len(p_arr) - 1)]
+    while windows:
+        start, end = windows.pop()
+        delta = p_arr[end] - p_arr[start]
+        distances = np.linalg.norm(np.cross(delta, p_arr[start] - p_arr[start + 1:end]), axis=1) / \
+            np.linalg.norm(delta)
+        if end - start < 2 or not distances.max() > epsilon:
+            p_arr_ok[[start, end]] = True
+        else:
+            split = start + 1 + int(np.argmax(distances))
+            windows += [(split, end), (start, split)]
+    return p_arr_ok
+
+
+def test_max_distance_integer_3d_matches_reference():
+    # rounded random walks have many distances that only differ in the last bit, the kept points must not change
+    for seed in range(3):
+        p_arr = np.round(np.cumsum(np.random.default_rng(seed).normal(size=(20000, 3)), axis=0)).astype(np.int64)
+        np_test.assert_equal(rdp_single_initial_window(p_arr, 3.0, return_mask=True), _reference_rdp_mask(p_arr, 3.0))
@@ -1,6 +1,7 @@
 import numpy as np
 import numpy.testing as np_test
-from rdp_quick.curvature import compute_curvature_2d, compute_curvature_and_build_windows
+from rdp_quick.curvature import compute_curvature_2d, compute_curvature_and_build_windows, compute_curvature_windows
+from scipy.signal import find_peaks
 
 
 def test_compute_curvature_d2_flat():
@@ -28,4 +29,28 @@ def test_compute_curvature_and_build_windows():
     y = np.sin(x) * 2
     windows = compute_curvature_and_build_windows(x, y)
     windows_gt = [(0, 25), (25, 75), (75, 99)]
-    assert windows_gt == windows
\ No newline at end of file
+    assert windows_gt == windows
+
+
+def test_compute_curvature_2d_fused_matches_numpy():
+    rng = np.random.default_rng(0)
+    for num_points in (3, 4, 1000):
+        x = np.cumsum(rng.normal(size=num_points))
+        y = np.cumsum(rng.normal(size=num_points))
+        curvature = compute_curvature_2d(x, y)
+        curvature_gt = compute_curvature_2d(x, y, gradient_nargs={"edge_order": 1})
+        np_test.assert_equal(curvature, curvature_gt)
+
+
+def test_compute_curvature_windows_matches_find_peaks():
+    num_points = 5000
+    x = np.arange(num_points) / num_points * 20.0 * np.pi
+    rng = np.random.default_rng(0)
+    for y in (np.sin(x) * 2, np.round(np.sin(x) * 3), np.cumsum(rng.normal(size=num_points))):
+        curvature = compute_curvature_2d(x, y)
+        for peak_find_nargs in (None, dict(height=0.5), dict(distance=20), dict(distance=3.5, height=(0.1, 10)),
+                                dict(prominence=0.3), dict(prominence=(0.1, None), distance=10, height=0.01)):
+            windows = compute_curvature_windows(x, y, peak_find_nargs=peak_find_nargs)
+            peaks = find_peaks(curvature, **(peak_find_nargs or dict()))[0]
+            points = np.concatenate([[0], peaks, [num_points - 1]])
+            np_test.assert_equal(windows, np.stack([points[:-1], points[1:]], axis=1))
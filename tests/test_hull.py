@@ -0,0 +1,94 @@
+import numpy as np
+import numpy.testing as np_test
+import pytest
+import rdp_quick
+from rdp_quick.check_window import check_windows_compiled
+from rdp_quick.hull import build_hull_tree, check_windows_hull, check_windows_auto
+from rdp_quick.stats import RdpStats
+
+
+def _check(check_func, p_arr, epsilon, windows):
+    p_arr_ok = np.zeros(len(p_arr), dtype=bool)
+    check_func(p_arr, epsilon, np.asarray(windows, dtype=np.int64), p_arr_ok)
+    return p_arr_ok
+
+
+def test_build_hull_tree():
+    p_arr = np.random.default_rng(0).normal(size=(100, 2))
+    chains, chain_start, num_upper, num_lower, level_start = build_hull_tree(p_arr)
+    # 4 leaves of 32 points then 2 nodes then the root
+    np_test.assert_equal(level_start, [0, 4, 6, 7])
+    # the chains are stored without gaps and the chains of a leaf only hold its points
+    assert len(chains) == (num_upper + num_lower).sum()
+    for leaf in range(4):
+        leaf_chains = chains[chain_start[leaf]:chain_start[leaf] + num_upper[leaf] + num_lower[leaf]]
+        assert (leaf_chains // 32 == leaf).all()
+    root_upper = chains[chain_start[6]:chain_start[6] + num_upper[6]]
+    root_lower = chains[chain_start[6] + num_upper[6]:chain_start[6] + num_upper[6] + num_lower[6]]
+    assert root_upper[0] == root_lower[0] == np.argmin(p_arr[:, 0])
+    assert root_upper[-1] == root_lower[-1] == np.argmax(p_arr[:, 0])
+    assert np.argmax(p_arr[:, 1]) in root_upper
+    assert np.argmin(p_arr[:, 1]) in root_lower
+
+
+def test_build_hull_tree_bounds_memory():
+    # every point of an arc is on the hulls of all its nodes, so the top levels are dropped
+    angle = np.linspace(0.0, 0.9 * np.pi, 1 << 16)
+    p_arr = np.stack([np.cos(angle), np.sin(angle)], axis=1)
+    chains, chain_start, num_upper, num_lower, level_start = build_hull_tree(p_arr)
+    assert len(chains) <= rdp_quick.hull._hull_max_chain_points_ * len(p_arr)
+    assert 2 < len(level_start) - 1 < 12
+    assert len(chain_start) == level_start[-1]
+    windows = [(0, len(p_arr) - 1), (10, 60000)]
+    for epsilon in (0.0, 1e-9, 1e-3):
+        for window in windows:
+            np_test.assert_equal(_check(check_windows_hull, p_arr, epsilon, [window]),
+                                 _check(check_windows_compiled, p_arr, epsilon, [window]))
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.int64, np.int32])
+def test_check_windows_hull_matches_check_windows_compiled(dtype):
+    rng = np.random.default_rng(1)
+    for num_points in (3, 200, 3000):
+        # integer steps give many equal distances, the lowest index must still win
+        p_arr = np.cumsum(rng.integers(-2, 3, size=(num_points, 2)), axis=0).astype(dtype)
+        windows = [(0, num_points // 3), (num_points // 3, num_points - 1)]
+        for epsilon in (0.0, 0.5, 2.0):
+            np_test.assert_equal(_check(check_windows_hull, p_arr, epsilon, windows),
+                                 _check(check_windows_compiled, p_arr, epsilon, windows))
+
+
+def test_check_windows_auto_spiral():
+    t = np.linspace(0.0, 1.0, 20000)
+    angle = t * 200.0 * np.pi
+    p_arr = np.stack([t * np.cos(angle), t * np.sin(angle)], axis=1)
+    windows = [(0, len(p_arr) - 1)]
+    expected = _check(check_windows_compiled, p_arr, 1e-6, windows)
+    np_test.assert_equal(_check(check_windows_auto, p_arr, 1e-6, windows), expected)
+    np_test.assert_equal(rdp_quick.rdp_single_initial_window(p_arr, 1e-6, return_mask=True), expected)
+
+
+def test_check_windows_auto_smooth_never_builds_the_tree():
+    # smooth inputs stay under the switch so they cost the same as check_windows_compiled
+    t = np.linspace(0.0, 1.0, 1 << 17)
+    angle = t * 100.0 * np.pi
+    for p_arr in (np.stack([angle, np.sin(angle)], axis=1), np.stack([t * np.cos(angle), t * np.sin(angle)], axis=1)):
+        stats = RdpStats()
+        p_arr_ok = rdp_quick.rdp_single_initial_window(p_arr, 0.01, return_mask=True, stats=stats)
+        np_test.assert_equal(p_arr_ok, _check(check_windows_compiled, p_arr, 0.01, [(0, len(p_arr) - 1)]))
+        assert stats.num_hull_windows == 0
+        assert stats.num_distance_evaluations > 0
+
+
+def test_check_windows_auto_resumes_with_the_hull_tree():
+    t = np.linspace(0.0, 1.0, 20000)
+    # a turn every 20 points, each split only removes a few points
+    angle = t * 2000.0 * np.pi
+    p_arr = np.stack([t * np.cos(angle), t * np.sin(angle)], axis=1)
+    stats = RdpStats()
+    p_arr_ok = rdp_quick.rdp_single_initial_window(p_arr, 1e-6, return_mask=True, stats=stats)
+    np_test.assert_equal(p_arr_ok, _check(check_windows_compiled, p_arr, 1e-6, [(0, len(p_arr) - 1)]))
+    assert stats.num_hull_windows > 0
+    # the windows checked point by point before the switch are kept, not checked again
+    assert stats.num_windows_checked == 2 * (stats.num_accepted - 1) - 1
+    assert sum(stats.windows_per_level) == stats.num_windows_checked
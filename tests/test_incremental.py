@@ -0,0 +1,72 @@
+import numpy as np
+import numpy.testing as np_test
+import pytest
+import rdp_quick
+from rdp_quick import RdpIncremental, RdpStream
+from rdp_quick.check_window import check_windows_compiled
+from tests.helpers import random_walk
+
+
+def _full(incremental):
+    return rdp_quick.rdp_initial_windows(np.array(incremental.points), incremental.epsilon, incremental.windows,
+                                         return_mask=True)
+
+
+@pytest.mark.parametrize("points_per_window", [None, 1, 7, 100])
+def test_append_matches_full_recompute(points_per_window):
+    p_arr = random_walk(1000)
+    incremental = RdpIncremental(0.5, points_per_window)
+    start = 0
+    for size in (1, 1, 3, 50, 1, 200, 744):
+        incremental.append(p_arr[start:start + size])
+        start += size
+        np_test.assert_equal(incremental.result(return_mask=True), _full(incremental))
+    np_test.assert_equal(incremental.points, p_arr)
+
+
+def test_append_matches_stream():
+    p_arr = random_walk(1234)
+    incremental = RdpIncremental(0.5, 100, p_arr[:600])
+    incremental.append(p_arr[600:])
+    stream = RdpStream(0.5, 100)
+    expected = np.concatenate([stream.feed(p_arr), stream.flush()])
+    np_test.assert_equal(incremental.result(), expected)
+
+
+@pytest.mark.parametrize("points_per_window", [None, 100])
+def test_update_matches_full_recompute(points_per_window):
+    rng = np.random.default_rng(1)
+    p_arr = random_walk(1000)
+    incremental = RdpIncremental(0.5, points_per_window, p_arr)
+    for start, size in ((0, 1), (100, 1), (99, 3), (350, 120), (999, 1), (0, 1000)):
+        num_checked = incremental.update(start, rng.normal(size=(size, 2)) * 5.0)
+        np_test.assert_equal(incremental.result(return_mask=True), _full(incremental))
+        if size == 1 and 0 < start < 999 and (points_per_window is None or start % 100 != 0):
+            # only the windows containing the point are checked again
+            p_arr_ok = np.zeros(incremental.num_points, dtype=bool)
+            assert num_checked * 4 < check_windows_compiled(np.array(incremental.points), 0.5,
+                                                            incremental.windows, p_arr_ok)
+    with pytest.raises(IndexError):
+        incremental.update(999, np.zeros((2, 2)))
+
+
+def test_result_indices():
+    p_arr = np.array([[0, 0], [1, 0.5], [2, 0], [3, 2], [4, 0], [5, 0.1], [6, 0]], dtype=np.float64)
+    incremental = RdpIncremental(1.0, p_array=p_arr[:3])
+    incremental.append(p_arr[3:])
+    np_test.assert_equal(incremental.result(return_indices=True), np.array([0, 2, 3, 4, 6]))
+
+
+def test_single_window_edits_match_full_recompute():
+    rng = np.random.default_rng(2)
+    p_arr = random_walk(3000)
+    incremental = RdpIncremental(1.0, p_array=p_arr[:2000])
+    for _ in range(50):
+        if rng.random() < 0.3:
+            new_points = random_walk(int(rng.integers(1, 20)), seed=int(rng.integers(1000)))
+            incremental.append(new_points + incremental.points[-1])
+        else:
+            start = int(rng.integers(incremental.num_points))
+            size = int(rng.integers(1, min(30, incremental.num_points - start) + 1))
+            incremental.update(start, incremental.points[start:start + size] + rng.normal(size=(size, 2)) * 0.3)
+        np_test.assert_equal(incremental.result(return_mask=True), _full(incremental))
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import numpy.testing as np_test
+from rdp_quick.jit import lazy_njit, LazyDispatcher, warmup, _lazy_dispatchers_
+from numba import int64
+
+
+def test_lazy_njit_compiles_on_first_call():
+    @lazy_njit([int64(int64)])
+    def add_one(x):
+        return x + 1
+
+    assert isinstance(add_one, LazyDispatcher)
+    assert not add_one.is_compiled
+    assert add_one(1) == 2
+    assert add_one.is_compiled
+    _lazy_dispatchers_.remove(add_one)
+
+
+def test_warmup():
+    warmup()
+    assert all(dispatcher.is_compiled for dispatcher in _lazy_dispatchers_)
+    assert warmup() == 0
+
+
+def test_import_is_lazy(tmp_path):
+    code = ("import sys, numpy as np, rdp_quick\n"
+            "from rdp_quick.jit import _lazy_dispatchers_\n"
+            "assert not any(d.is_compiled for d in _lazy_dispatchers_)\n"
+            "assert 'scipy.signal' not in sys.modules\n"
+            "rdp_quick.set_cache_dir(sys.argv[1])\n"
+            "out = np.empty(2, dtype=np.int64)\n"
+            "print(rdp_quick.output.mask_to_indices(np.array([True, False, True]), out), out[0], out[1])\n")
+    output = subprocess.run([sys.executable, "-c", code, str(tmp_path)], check=True, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    np_test.assert_equal([int(v) for v in output.split()], [2, 0, 2])
+    assert any(name.endswith(".nbi") for _, _, files in os.walk(tmp_path) for name in files)
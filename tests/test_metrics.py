@@ -0,0 +1,97 @@
+import numpy as np
+import numpy.testing as np_test
+import pytest
+from numba import njit
+import rdp_quick
+from rdp_quick import RdpStats, perpendicular_distance, segment_distance, sed_distance
+from rdp_quick.compute_distance import compute_max_distance
+from tests.helpers import random_walk
+
+
+def _rdp_reference(p_arr, epsilon, metric):
+    ok = np.zeros(len(p_arr), dtype=bool)
+    windows = [(0, len(p_arr) - 1)]
+    while windows:
+        start, end = windows.pop()
+        distances = [metric.py_func(p_arr, start, end, i) for i in range(start + 1, end)]
+        if distances and max(distances) > epsilon:
+            split = start + 1 + int(np.argmax(distances))
+            windows.extend([(split, end), (start, split)])
+        else:
+            ok[start] = ok[end] = True
+    return ok
+
+
+@njit(nogil=True)
+def _vertical_distance(p_array, start, end, i):
+    t = (p_array[i, 0] - p_array[start, 0]) / (p_array[end, 0] - p_array[start, 0])
+    return abs(p_array[i, 1] - (p_array[start, 1] + t * (p_array[end, 1] - p_array[start, 1])))
+
+
+@pytest.mark.parametrize("num_dims", [2, 3, 5, 10])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.int64])
+def test_perpendicular_distance_matches_default(num_dims, dtype):
+    p_arr = (random_walk(3000, num_dims) * 10).astype(dtype)
+    expected = rdp_quick.rdp_num_windows(p_arr, 5.0, 3, return_mask=True)
+    result = rdp_quick.rdp_num_windows(p_arr, 5.0, 3, return_mask=True, metric=perpendicular_distance)
+    np_test.assert_equal(result, expected)
+
+
+@pytest.mark.parametrize("num_dims", [2, 3, 5])
+def test_perpendicular_distance_matches_compute_max_distance(num_dims):
+    p_arr = np.round(random_walk(2000, num_dims) * 10)
+    for start, end in ((0, 1999), (17, 400), (5, 7)):
+        distances = [perpendicular_distance(p_arr, start, end, i) for i in range(start + 1, end)]
+        val_max, arg_max = compute_max_distance(p_arr[start], p_arr[end], p_arr[start + 1:end])
+        assert max(distances) == val_max
+        assert int(np.argmax(distances)) == arg_max
+
+
+def test_segment_distance():
+    p_arr = np.array([[0, 0], [3, 0.5], [1, 0]], dtype=np.float64)
+    np_test.assert_equal(rdp_quick.rdp_single_initial_window(p_arr, 1.0, return_indices=True), [0, 2])
+    result = rdp_quick.rdp_single_initial_window(p_arr, 1.0, return_indices=True, metric=segment_distance)
+    np_test.assert_equal(result, [0, 1, 2])
+
+
+def test_sed_distance():
+    # the middle point is on the line but far from where the object should be at its time
+    p_arr = np.array([[0, 0, 0], [9, 0, 1], [10, 0, 10], [20, 0, 20]], dtype=np.float64)
+    np_test.assert_equal(rdp_quick.rdp_single_initial_window(p_arr[:, :2], 1.0, return_indices=True), [0, 3])
+    result = rdp_quick.rdp_single_initial_window(p_arr, 1.0, return_indices=True, metric=sed_distance)
+    np_test.assert_equal(result, [0, 1, 2, 3])
+
+
+@pytest.mark.parametrize("metric", [segment_distance, sed_distance, _vertical_distance])
+def test_metric_matches_reference(metric):
+    p_arr = random_walk(500)
+    p_arr[:, 0] = np.arange(len(p_arr))
+    result = rdp_quick.rdp_single_initial_window(p_arr, 2.0, return_mask=True, metric=metric)
+    np_test.assert_equal(result, _rdp_reference(p_arr, 2.0, metric))
+
+
+def test_metric_parallel_window():
+    p_arr = random_walk(250000, 3)
+    result = rdp_quick.rdp_single_initial_window(p_arr, 2.0, return_mask=True, metric=sed_distance)
+    windows = np.array([[0, len(p_arr) - 1]], dtype=np.int64)
+    serial = np.zeros(len(p_arr), dtype=bool)
+    rdp_quick.check_windows_metric(p_arr, 2.0, windows, serial, sed_distance, parallel=False)
+    np_test.assert_equal(result, serial)
+
+
+def test_metric_stats():
+    p_arr = random_walk(5000)
+    expected = RdpStats()
+    stats = RdpStats()
+    rdp_quick.rdp_points_per_window(p_arr, 0.5, 1000, stats=expected)
+    rdp_quick.rdp_points_per_window(p_arr, 0.5, 1000, stats=stats, metric=perpendicular_distance)
+    for key in ("num_windows_checked", "windows_per_level", "num_distance_evaluations", "num_accepted"):
+        assert stats.to_dict()[key] == expected.to_dict()[key]
+
+
+def test_metric_errors():
+    p_arr = random_walk(100)
+    with pytest.raises(TypeError):
+        rdp_quick.rdp_single_initial_window(p_arr, 0.5, metric=lambda p_array, start, end, i: 0.0)
+    with pytest.raises(ValueError):
+        rdp_quick.rdp_single_initial_window(p_arr, 0.5, breadth_first=True, metric=sed_distance)
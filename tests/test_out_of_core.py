@@ -0,0 +1,32 @@
+import numpy as np
+import numpy.testing as np_test
+from rdp_quick import rdp_initial_windows
+from rdp_quick.out_of_core import rdp_file
+from tests.helpers import block_windows
+
+
+def test_rdp_file_npy(tmp_path):
+    epsilon = 0.5
+    points_per_window = 64
+    rng = np.random.default_rng(0)
+    p_arr = np.cumsum(rng.normal(size=(5000, 2)), axis=0)
+    np.save(tmp_path / "points.npy", p_arr)
+    gt = rdp_initial_windows(p_arr, epsilon, block_windows(len(p_arr), points_per_window))
+
+    num_ok = rdp_file(tmp_path / "points.npy", epsilon, points_per_window, tmp_path / "out.npy", chunk_points=333)
+    assert num_ok == len(gt)
+    np_test.assert_equal(np.load(tmp_path / "out.npy"), gt)
+
+
+def test_rdp_file_raw_indices(tmp_path):
+    epsilon = 0.5
+    points_per_window = 100
+    rng = np.random.default_rng(1)
+    p_arr = np.cumsum(rng.normal(size=(3001, 3)), axis=0)
+    p_arr.tofile(tmp_path / "points.bin")
+    gt = rdp_initial_windows(p_arr, epsilon, block_windows(len(p_arr), points_per_window), return_indices=True)
+
+    num_ok = rdp_file(tmp_path / "points.bin", epsilon, points_per_window, tmp_path / "out.bin",
+                      return_indices=True, chunk_points=1000, num_columns=3)
+    assert num_ok == len(gt)
+    np_test.assert_equal(np.fromfile(tmp_path / "out.bin", dtype=np.int64), gt)
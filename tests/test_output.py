@@ -0,0 +1,40 @@
+import numpy as np
+import numpy.testing as np_test
+import pytest
+from rdp_quick.output import mask_to_indices, get_mask_buffer, build_output
+
+
+def test_mask_to_indices():
+    p_arr_ok = np.array([True, False, False, True, True, False])
+    out = np.full(6, -1, dtype=np.int64)
+    num_ok = mask_to_indices(p_arr_ok, out)
+    assert num_ok == 3
+    np_test.assert_equal(out[:num_ok], np.array([0, 3, 4]))
+
+
+def test_get_mask_buffer_uses_out():
+    out = np.ones(4, dtype=bool)
+    p_arr_ok = get_mask_buffer(4, True, False, out)
+    assert p_arr_ok is out
+    assert not np.any(out)
+
+
+def test_get_mask_buffer_mask_and_indices():
+    with pytest.raises(ValueError):
+        get_mask_buffer(4, True, True, None)
+
+
+def test_build_output_points_into_out():
+    p_arr = np.arange(10.0).reshape(5, 2)
+    p_arr_ok = np.array([True, False, True, False, True])
+    out = np.zeros((5, 2))
+    result = build_output(p_arr, p_arr_ok, False, False, out)
+    assert np.shares_memory(result, out)
+    np_test.assert_equal(result, p_arr[[0, 2, 4]])
+
+
+def test_build_output_indices_out_too_small():
+    p_arr = np.arange(10.0).reshape(5, 2)
+    p_arr_ok = np.array([True, False, True, False, True])
+    with pytest.raises(ValueError):
+        build_output(p_arr, p_arr_ok, False, True, np.zeros(2, dtype=np.int64))
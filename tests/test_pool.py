@@ -0,0 +1,44 @@
+import asyncio
+import concurrent.futures
+import numpy as np
+import numpy.testing as np_test
+import rdp_quick
+from rdp_quick.check_window import check_windows_serial, check_windows_compiled
+from tests.helpers import random_walks
+
+
+def test_check_windows_serial_matches_check_windows_compiled():
+    p_arr = random_walks(1, 5000)[0]
+    windows = np.array([[0, 2000], [2000, 4999]], dtype=np.int64)
+    p_arr_ok_serial = np.zeros(len(p_arr), dtype=bool)
+    p_arr_ok = np.zeros(len(p_arr), dtype=bool)
+    num_checked = check_windows_serial(p_arr, 0.5, windows, p_arr_ok_serial)
+    assert num_checked == check_windows_compiled(p_arr, 0.5, windows, p_arr_ok)
+    np_test.assert_equal(p_arr_ok_serial, p_arr_ok)
+
+
+def test_rdp_map():
+    p_arrs = random_walks(8)
+    results = rdp_quick.rdp_map(p_arrs, 0.5, return_indices=True)
+    for p_arr, result in zip(p_arrs, results):
+        np_test.assert_equal(result, rdp_quick.rdp_single_initial_window(p_arr, 0.5, return_indices=True))
+
+
+def test_rdp_threadsafe_from_many_threads():
+    p_arrs = random_walks(16)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda p_arr: rdp_quick.rdp_threadsafe(p_arr, 0.5), p_arrs))
+    for p_arr, result in zip(p_arrs, results):
+        np_test.assert_equal(result, rdp_quick.rdp_single_initial_window(p_arr, 0.5))
+
+
+def test_rdp_async():
+    p_arrs = random_walks(4)
+
+    async def run():
+        return await asyncio.gather(*[rdp_quick.rdp_async(p_arr, 0.5, return_mask=True) for p_arr in p_arrs])
+
+    results = asyncio.run(run())
+    for p_arr, result in zip(p_arrs, results):
+        np_test.assert_equal(result, rdp_quick.rdp_single_initial_window(p_arr, 0.5, return_mask=True))
+    rdp_quick.shutdown_executor()
@@ -1,6 +1,9 @@
 import numpy as np
 import numpy.testing as np_test
-from rdp_quick import rdp_single_initial_window, get_initial_windows
+from rdp_quick import rdp_single_initial_window, get_initial_windows, rdp_ragged, rdp_num_windows, rdp_target_count, \
+    rdp_significance, rdp_from_significance, rdp_initial_windows
+import pytest
+from rdp_quick.compute_distance import compute_max_distance
 
 
 def test_rdp_straight():
@@ -50,6 +53,9 @@ def test_rdp_top_hat():
     p_arr_selected_gt = p_arr[[0, 2, 3, 5, 6, -1]]
     np_test.assert_equal(p_arr_selected, p_arr_selected_gt)
 
+    p_arr_selected = rdp_single_initial_window(p_arr, epsilon, breadth_first=True)
+    np_test.assert_equal(p_arr_selected, p_arr_selected_gt)
+
 
 def test_get_initial_windows():
     initial_windows = get_initial_windows(30, 3, 10)
@@ -59,3 +65,125 @@ def test_get_initial_windows():
         (20, 29),
     ]
     assert initial_windows == initial_windows_gt
+    assert get_initial_windows(3, 4, 1) == [(0, 1), (1, 2), (2, 2), (2, 2)]
+    assert get_initial_windows(0, 4, 0) == []
+
+
+@pytest.mark.parametrize("breadth_first", [False, True])
+def test_rdp_empty(breadth_first):
+    p_arr = np.empty((0, 2))
+    np_test.assert_equal(rdp_single_initial_window(p_arr, 1.0, breadth_first=breadth_first), p_arr)
+    np_test.assert_equal(rdp_num_windows(p_arr, 1.0, 4, breadth_first=breadth_first), p_arr)
+    assert rdp_initial_windows(p_arr, 1.0, [(0, -1)], return_indices=True, breadth_first=breadth_first).shape == (0,)
+    np_test.assert_equal(rdp_num_windows(np.zeros((3, 2)), 1.0, 4, return_indices=True, breadth_first=breadth_first),
+                         [0, 1, 2])
+
+
+def test_rdp_ragged():
+    epsilon = 1.0
+    rng = np.random.default_rng(0)
+    lines = [np.cumsum(rng.normal(size=(num_points, 2)), axis=0) for num_points in (50, 0, 1, 2, 300, 7)]
+    offsets = np.append(0, np.cumsum([len(line) for line in lines]))
+    p_arr_selected, offsets_selected = rdp_ragged(np.concatenate(lines), epsilon, offsets)
+
+    assert len(offsets_selected) == len(offsets)
+    assert offsets_selected[-1] == len(p_arr_selected)
+    for li, line in enumerate(lines):
+        line_selected = p_arr_selected[offsets_selected[li]:offsets_selected[li + 1]]
+        line_selected_gt = rdp_single_initial_window(line, epsilon) if len(line) > 0 else line
+        np_test.assert_equal(line_selected, line_selected_gt)
+
+
+def test_rdp_ragged_bad_offsets():
+    p_arr = np.zeros((5, 2))
+    with pytest.raises(ValueError):
+        rdp_ragged(p_arr, 1.0, np.array([0, 3, 4]))
+
+
+def test_rdp_return_mask_and_indices():
+    epsilon = 1.0
+    p_arr = np.array([
+        [0.0, 0.0],
+        [1.0, 10.0],
+        [2.0, 20.0],
+        [3.0, 30.0],
+        [4.0, 20.0],
+        [5.0, 10.0],
+        [6.0, 0.0],
+    ])
+    indices_gt = np.array([0, 3, 6])
+    p_arr_ok = rdp_single_initial_window(p_arr, epsilon, return_mask=True)
+    np_test.assert_equal(np.flatnonzero(p_arr_ok), indices_gt)
+
+    indices = rdp_single_initial_window(p_arr, epsilon, return_indices=True)
+    np_test.assert_equal(indices, indices_gt)
+
+    out = np.zeros(len(p_arr), dtype=np.int64)
+    indices = rdp_num_windows(p_arr, epsilon, 2, return_indices=True, out=out)
+    assert np.shares_memory(indices, out)
+    np_test.assert_equal(indices, np.array([0, 3, 4, 6]))
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.int64, np.int32])
+def test_rdp_dtypes(dtype):
+    epsilon = 1.0
+    p_arr = np.array([
+        [0.0, 0.0],
+        [1.0, 0.0],
+        [2.0, 0.0],
+        [3.0, 30.0],
+        [4.0, 30.0],
+        [5.0, 30.0],
+        [6.0, 0.0],
+        [7.0, 0.0],
+        [8.0, 0.0],
+    ]).astype(dtype)
+    p_arr_selected = rdp_single_initial_window(p_arr, epsilon)
+    assert p_arr_selected.dtype == dtype
+    np_test.assert_equal(p_arr_selected, p_arr[[0, 2, 3, 5, 6, -1]])
+
+
+def test_rdp_target_count():
+    p_arr = np.array([
+        [0.0, 0.0],
+        [1.0, 0.0],
+        [2.0, 0.0],
+        [3.0, 30.0],
+        [4.0, 30.0],
+        [5.0, 30.0],
+        [6.0, 0.0],
+        [7.0, 0.0],
+        [8.0, 0.0],
+    ])
+    p_arr_selected, epsilon = rdp_target_count(p_arr, 6)
+    np_test.assert_equal(p_arr_selected, p_arr[[0, 2, 3, 5, 6, -1]])
+    assert epsilon == 0.0
+
+    indices, epsilon = rdp_target_count(p_arr, 4, return_indices=True)
+    assert len(indices) == 4
+    assert epsilon > 1.0
+
+
+def test_rdp_target_count_matches_epsilon():
+    rng = np.random.default_rng(0)
+    p_arr = np.cumsum(rng.normal(size=(2000, 2)), axis=0)
+    for num_points in (2, 17, 300, 2000, 5000):
+        indices, epsilon = rdp_target_count(p_arr, num_points, return_indices=True)
+        assert len(indices) == min(num_points, len(p_arr))
+        # every point is within the implied epsilon of the down sampled line
+        for start, end in zip(indices[:-1], indices[1:]):
+            val_max, _ = compute_max_distance(p_arr[start], p_arr[end], p_arr[start + 1:end])
+            assert val_max <= epsilon
+
+
+def test_rdp_significance():
+    rng = np.random.default_rng(0)
+    p_arr = np.cumsum(rng.normal(size=(3000, 2)), axis=0)
+    p_arr[1000:1010] = p_arr[1000]
+    windows = [(0, 1000), (1000, len(p_arr) - 1)]
+    significance = rdp_significance(p_arr, windows)
+    assert np.isinf(significance[[0, 1000, -1]]).all()
+    for epsilon in (0.0, 0.1, 1.0, 5.0, 100.0):
+        p_arr_selected = rdp_from_significance(p_arr, significance, epsilon)
+        p_arr_selected_gt = rdp_initial_windows(p_arr, epsilon, windows)
+        np_test.assert_equal(p_arr_selected, p_arr_selected_gt)
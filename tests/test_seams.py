@@ -0,0 +1,53 @@
+import numpy as np
+import numpy.testing as np_test
+import pytest
+import rdp_quick
+from rdp_quick import RdpStats, repair_window_seams
+from tests.helpers import max_error, sine
+
+
+@pytest.mark.parametrize("points_per_window", [200, 1000, 10000])
+@pytest.mark.parametrize("epsilon", [0.01, 0.1])
+def test_repair_seams(points_per_window, epsilon):
+    p_arr = sine(100000)
+    single = rdp_quick.rdp_single_initial_window(p_arr, epsilon, return_mask=True)
+    windowed = rdp_quick.rdp_points_per_window(p_arr, epsilon, points_per_window, return_mask=True)
+    repaired = rdp_quick.rdp_points_per_window(p_arr, epsilon, points_per_window, return_mask=True,
+                                               repair_seams=True)
+    assert repaired.sum() < windowed.sum()
+    assert repaired.sum() <= 1.1 * single.sum()
+    assert repaired[0] and repaired[-1]
+    assert max_error(p_arr, repaired) <= epsilon
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.int64, np.int32])
+def test_repair_seams_dtypes(dtype):
+    p_arr = (sine(20000) * 1000).astype(dtype)
+    windowed = rdp_quick.rdp_num_windows(p_arr, 5.0, 50, return_mask=True)
+    repaired = rdp_quick.rdp_num_windows(p_arr, 5.0, 50, return_mask=True, repair_seams=True)
+    assert repaired.sum() < windowed.sum()
+    assert max_error(p_arr, repaired) <= 5.0
+
+
+def test_repair_seams_only_inside_windows():
+    p_arr = sine(1000)
+    windows = np.array([[0, 100], [100, 200], [300, 400], [400, 500]], dtype=np.int64)
+    p_arr_ok = np.zeros(len(p_arr), dtype=bool)
+    p_arr_ok[200:301] = True
+    rdp_quick.check_windows_compiled(p_arr, 0.5, windows, p_arr_ok)
+    num_removed = repair_window_seams(p_arr, 0.5, windows, p_arr_ok)
+    assert num_removed == 2
+    assert not p_arr_ok[100] and not p_arr_ok[400]
+    assert p_arr_ok[200:301].all()
+    assert not p_arr_ok[501:].any()
+
+
+def test_repair_seams_stats():
+    p_arr = sine(20000)
+    stats = RdpStats()
+    repaired = rdp_quick.rdp_points_per_window(p_arr, 0.1, 500, return_mask=True, repair_seams=True, stats=stats)
+    np_test.assert_equal(repaired, rdp_quick.rdp_points_per_window(p_arr, 0.1, 500, return_mask=True,
+                                                                   repair_seams=True))
+    windowed = rdp_quick.rdp_points_per_window(p_arr, 0.1, 500, return_mask=True)
+    assert stats.num_seam_points_removed == windowed.sum() - repaired.sum()
+    assert stats.num_accepted == repaired.sum()
@@ -0,0 +1,63 @@
+import time
+import numpy as np
+import numpy.testing as np_test
+import pytest
+import rdp_quick
+from rdp_quick import RdpStats
+from tests.helpers import random_walk
+
+
+def test_stats_single_window():
+    p_arr = np.array([[0, 0], [1, 0.5], [2, 0], [3, 2], [4, 0], [5, 0.1], [6, 0]], dtype=np.float64)
+    stats = RdpStats()
+    result = rdp_quick.rdp_single_initial_window(p_arr, 1.0, return_indices=True, stats=stats)
+    np_test.assert_equal(result, np.array([0, 2, 3, 4, 6]))
+    assert stats.num_points == 7
+    assert stats.num_dims == 2
+    assert stats.num_initial_windows == 1
+    assert stats.windows_per_level == [1, 2, 4]
+    assert stats.num_levels == 3
+    assert stats.num_windows_checked == 7
+    assert stats.largest_window == 7
+    # 5 inner points, then 2 and 2, then 0, 1, 0 and 1
+    assert stats.num_distance_evaluations == 11
+    assert stats.num_accepted == 5
+    assert stats.total_seconds >= 0.0
+
+
+def test_stats_breadth_first_matches():
+    p_arr = random_walk(5000)
+    depth_first = RdpStats()
+    breadth_first = RdpStats()
+    result_depth = rdp_quick.rdp_num_windows(p_arr, 0.5, 4, stats=depth_first)
+    result_breadth = rdp_quick.rdp_num_windows(p_arr, 0.5, 4, breadth_first=True, stats=breadth_first)
+    np_test.assert_equal(result_depth, result_breadth)
+    np_test.assert_equal(result_depth, rdp_quick.rdp_num_windows(p_arr, 0.5, 4))
+    for key in ("num_initial_windows", "num_windows_checked", "windows_per_level", "num_distance_evaluations",
+                "largest_window", "num_accepted"):
+        assert depth_first.to_dict()[key] == breadth_first.to_dict()[key]
+    assert sum(depth_first.windows_per_level) == depth_first.num_windows_checked
+    assert depth_first.num_accepted == len(result_depth)
+
+
+def test_stats_callback():
+    reports = list()
+    stats = RdpStats(callback=reports.append)
+    rdp_quick.rdp_windows_from_curvature(random_walk(1000), 0.5, stats=stats)
+    rdp_quick.rdp_points_per_window(random_walk(1000), 0.5, 100, stats=stats)
+    assert len(reports) == 2
+    assert reports[1]["num_initial_windows"] == 10
+    assert reports[1] == stats.to_dict()
+
+
+def test_stats_start_again_after_an_error():
+    stats = RdpStats()
+    p_arr = random_walk(1000)
+    # raised by rdp_initial_windows after rdp_points_per_window started timing
+    with pytest.raises(ValueError):
+        rdp_quick.rdp_points_per_window(p_arr, 0.5, 100, breadth_first=True, metric=rdp_quick.segment_distance,
+                                        stats=stats)
+    time.sleep(0.2)
+    rdp_quick.rdp_points_per_window(p_arr, 0.5, 100, stats=stats)
+    assert stats.planning_seconds < 0.1
+    assert stats.num_points == 1000
@@ -0,0 +1,41 @@
+import numpy as np
+import numpy.testing as np_test
+from rdp_quick import rdp_initial_windows
+from rdp_quick.stream import RdpStream
+from tests.helpers import block_windows
+
+
+def test_stream_matches_windows():
+    epsilon = 0.5
+    points_per_window = 37
+    rng = np.random.default_rng(0)
+    p_arr = np.cumsum(rng.normal(size=(1000, 2)), axis=0)
+    gt = rdp_initial_windows(p_arr, epsilon, block_windows(len(p_arr), points_per_window))
+
+    stream = RdpStream(epsilon, points_per_window)
+    chunks = np.array_split(p_arr, [5, 6, 200, 201, 640])
+    p_arr_selected = np.concatenate(list(stream.simplify(chunks)))
+    np_test.assert_equal(p_arr_selected, gt)
+    assert stream.num_pending == 0
+
+
+def test_stream_indices_and_bounded_tail():
+    epsilon = 0.5
+    points_per_window = 50
+    rng = np.random.default_rng(1)
+    p_arr = np.cumsum(rng.normal(size=(503, 3)), axis=0)
+    gt = rdp_initial_windows(p_arr, epsilon, block_windows(len(p_arr), points_per_window), return_indices=True)
+
+    stream = RdpStream(epsilon, points_per_window, return_indices=True)
+    indices = list()
+    for chunk in np.array_split(p_arr, 20):
+        indices.append(stream.feed(chunk))
+        assert stream.num_pending <= points_per_window
+    indices.append(stream.flush())
+    np_test.assert_equal(np.concatenate(indices), gt)
+
+
+def test_stream_single_point():
+    stream = RdpStream(1.0, 10)
+    assert len(stream.feed(np.array([[1.0, 2.0]]))) == 0
+    np_test.assert_equal(stream.flush(), np.array([[1.0, 2.0]]))